@@ -6,10 +6,8 @@ def load_config():
     Carga y valida la configuración desde el archivo .env
     Retorna un diccionario con la configuración
     """
-    # Asegurar que se cargan las variables de entorno
-    os.environ.clear()
+    # Cargar .env sin borrar el entorno: las variables ya definidas tienen prioridad
     load_dotenv()
-    print(os.getenv("EMBEDDING_MODEL"))
     # Configuración de OpenAI/LLM
     config = {
         # OpenAI o API compatible
@@ -18,17 +16,111 @@ def load_config():
         "LLM_MODEL": os.getenv("LLM_MODEL", "llama-3.3-70b-instruct"),
         "LLM_TEMPERATURE": float(os.getenv("LLM_TEMPERATUR", "0.3")),
         "EMBEDDING_MODEL": os.getenv("EMBEDDING_MODEL", "jina-embeddings-v2-base-en"),
+        "EMBEDDING_PROVIDER": os.getenv("EMBEDDING_PROVIDER", "openai"),  # "openai" (API compatible) o "local"
+        
+        # Embeddings por lotes
+        "EMBEDDING_BATCH_SIZE": int(os.getenv("EMBEDDING_BATCH_SIZE", "256")),  # Textos por petición
+        "EMBEDDING_BATCH_MAX_TOKENS": int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "60000")),  # Tokens por petición
+        "EMBEDDING_MAX_INPUT_TOKENS": int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "8000")),  # Tokens por texto
+        
+        # Micro-lotes de embeddings de consulta: esperar hasta N ms o M textos y pedirlos juntos
+        "EMBEDDING_MICROBATCH_ENABLED": os.getenv("EMBEDDING_MICROBATCH_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "EMBEDDING_MICROBATCH_MAX_WAIT_MS": float(os.getenv("EMBEDDING_MICROBATCH_MAX_WAIT_MS", "5")),
+        "EMBEDDING_MICROBATCH_MAX_SIZE": int(os.getenv("EMBEDDING_MICROBATCH_MAX_SIZE", "32")),
+        
+        # Embeddings locales (SentenceTransformer)
+        "LOCAL_EMBEDDING_MODEL": os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+        "LOCAL_EMBEDDING_BATCH_SIZE": int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32")),
+        "LOCAL_EMBEDDING_BACKEND": os.getenv("LOCAL_EMBEDDING_BACKEND", "torch"),  # "torch" o "onnx" (ONNX Runtime en CPU)
+        "ONNX_MODEL_DIR": os.getenv("ONNX_MODEL_DIR", ".cache/onnx"),  # Modelos exportados a ONNX
+        "ONNX_QUANTIZE": os.getenv("ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes"),  # Cuantización dinámica int8
+        "ONNX_INTRA_OP_THREADS": int(os.getenv("ONNX_INTRA_OP_THREADS", "0")),  # 0 = valor por defecto de ONNX Runtime
+        "ONNX_INTER_OP_THREADS": int(os.getenv("ONNX_INTER_OP_THREADS", "0")),
+        "EMBEDDING_WORKERS": int(os.getenv("EMBEDDING_WORKERS", "0")),  # 0 = un proceso por núcleo
+        "EMBEDDING_POOL_MIN_DOCS": int(os.getenv("EMBEDDING_POOL_MIN_DOCS", "2000")),  # Mínimo de textos para usar el pool
+        
+        # Caché de embeddings en disco (ruta vacía para desactivarla)
+        "EMBEDDING_CACHE_PATH": os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite"),
+        "EMBEDDING_CACHE_MAX_ENTRIES": int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),
+        
+        # Fragmentación de documentos (tamaño en tokens; 0 desactiva la fragmentación)
+        "CHUNK_SIZE": int(os.getenv("CHUNK_SIZE", "200")),
+        "CHUNK_OVERLAP": int(os.getenv("CHUNK_OVERLAP", "40")),
+        "CHUNK_SEARCH_FACTOR": int(os.getenv("CHUNK_SEARCH_FACTOR", "4")),  # Fragmentos buscados por documento pedido
+        "MAX_PASSAGES_PER_DOC": int(os.getenv("MAX_PASSAGES_PER_DOC", "3")),
+        "CONTEXT_TOKEN_BUDGET": int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),  # Tokens máximos del contexto del LLM
+        
+        # Búsqueda híbrida: vectores densos + BM25 (vectores dispersos de Qdrant) fusionados con RRF.
+        # Desactivada por defecto: con ella, `score` es la puntuación RRF y no la similitud coseno
+        "HYBRID_SEARCH_ENABLED": os.getenv("HYBRID_SEARCH_ENABLED", "false").lower() in ("1", "true", "yes"),
+        "RRF_K": int(os.getenv("RRF_K", "60")),
+        "BM25_K1": float(os.getenv("BM25_K1", "1.2")),
+        "BM25_B": float(os.getenv("BM25_B", "0.75")),
+        "BM25_AVG_DOC_LEN": float(os.getenv("BM25_AVG_DOC_LEN", "150")),  # Términos por fragmento
+        
+        # Indexación (publicaciones por lote)
+        "INDEX_BATCH_SIZE": int(os.getenv("INDEX_BATCH_SIZE", "256")),
+        "INDEX_QUEUE_SIZE": int(os.getenv("INDEX_QUEUE_SIZE", "4")),  # Lotes en espera entre etapas
+        "INDEX_EXTRACT_WORKERS": int(os.getenv("INDEX_EXTRACT_WORKERS", "1")),
+        "INDEX_EMBED_WORKERS": int(os.getenv("INDEX_EMBED_WORKERS", "2")),
+        "INDEX_UPSERT_WORKERS": int(os.getenv("INDEX_UPSERT_WORKERS", "1")),
+        
+        # Trabajos de indexación persistentes (/index/*): estado y puntos de control en SQLite
+        "INDEX_JOBS_PATH": os.getenv("INDEX_JOBS_PATH", ".cache/index_jobs.sqlite"),  # Vacío = solo en memoria
+        "INDEX_JOB_WORKERS": int(os.getenv("INDEX_JOB_WORKERS", "1")),  # Trabajos simultáneos
         
         # API de publicaciones
         "API_ENDPOINT": os.getenv("API_ENDPOINT"),
+        "API_PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "100")),
+        "API_PAGE_PARAM": os.getenv("API_PAGE_PARAM", "page"),
+        "API_LIMIT_PARAM": os.getenv("API_LIMIT_PARAM", "limit"),
+        "API_FIRST_PAGE": int(os.getenv("API_FIRST_PAGE", "0")),
+        "API_CONCURRENCY": int(os.getenv("API_CONCURRENCY", "4")),  # Páginas descargadas a la vez
+        "API_MAX_RETRIES": int(os.getenv("API_MAX_RETRIES", "5")),
+        "API_BACKOFF_BASE": float(os.getenv("API_BACKOFF_BASE", "0.5")),  # Segundos
+        "API_BACKOFF_MAX": float(os.getenv("API_BACKOFF_MAX", "30")),
+        "API_TIMEOUT": float(os.getenv("API_TIMEOUT", "30")),
+        
+        # Reordenación de candidatos con un cross-encoder local (sentence-transformers)
+        "RERANK_ENABLED": os.getenv("RERANK_ENABLED", "false").lower() in ("1", "true", "yes"),
+        "RERANK_MODEL": os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"),
+        "RERANK_CANDIDATES_FACTOR": int(os.getenv("RERANK_CANDIDATES_FACTOR", "4")),  # Candidatos por documento pedido
+        "RERANK_BUDGET_MS": float(os.getenv("RERANK_BUDGET_MS", "300")),  # Si se supera, orden de la búsqueda vectorial
+        "RERANK_CACHE_SIZE": int(os.getenv("RERANK_CACHE_SIZE", "10000")),
+        "RERANK_MAX_PENDING": int(os.getenv("RERANK_MAX_PENDING", "2")),  # Puntuaciones en curso o en cola; con más, orden vectorial
+        
+        # Caché semántica de respuestas
+        "SEMANTIC_CACHE_ENABLED": os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "SEMANTIC_CACHE_THRESHOLD": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),  # Similitud coseno mínima
+        "SEMANTIC_CACHE_TTL": float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),  # Segundos
+        "SEMANTIC_CACHE_MAX_ENTRIES": int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+        
+        # Agrupar consultas idénticas en curso en una sola ejecución
+        "QUERY_COALESCING_ENABLED": os.getenv("QUERY_COALESCING_ENABLED", "true").lower() in ("1", "true", "yes"),
+        
+        # Consultas por lotes (/query/batch)
+        "QUERY_BATCH_MAX_SIZE": int(os.getenv("QUERY_BATCH_MAX_SIZE", "1000")),  # Consultas por petición
+        "QUERY_BATCH_LLM_CONCURRENCY": int(os.getenv("QUERY_BATCH_LLM_CONCURRENCY", "8")),  # Llamadas al LLM simultáneas
+        
+        # Backend del índice vectorial: "qdrant" o "numpy" (en proceso, sin servidor)
+        "CONTEXT_BACKEND": os.getenv("CONTEXT_BACKEND", "qdrant"),
+        "NUMPY_INDEX_PATH": os.getenv("NUMPY_INDEX_PATH", ""),  # Directorio del índice en disco; vacío = solo memoria
         
         # Qdrant
         "QDRANT_HOST": os.getenv("QDRANT_HOST", "localhost"),
         "QDRANT_PORT": int(os.getenv("QDRANT_PORT", "6333")),
+        "QDRANT_GRPC_PORT": int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        "QDRANT_PREFER_GRPC": os.getenv("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes"),
         "COLLECTION_NAME": os.getenv("COLLECTION_NAME", "publications"),
+        "COLLECTION_PROFILE": os.getenv("COLLECTION_PROFILE", "default"),  # Ver src/utils/collection_profiles.py
+        "QDRANT_INDEXING_THRESHOLD": int(os.getenv("QDRANT_INDEXING_THRESHOLD", "10000")),  # KB sin indexar por segmento
+        
+        # Inserción en Qdrant
+        "UPSERT_BATCH_SIZE": int(os.getenv("UPSERT_BATCH_SIZE", "256")),  # Puntos por petición
+        "UPSERT_PARALLEL": int(os.getenv("UPSERT_PARALLEL", "4")),  # Peticiones simultáneas
         
         # Vectores
-        "VECTOR_SIZE": 1536,  # Tamaño para el modelo text-embedding-ada-002
+        "VECTOR_SIZE": int(os.getenv("VECTOR_SIZE", "0")) or None,  # Sin fijar: la dimensión del modelo de embeddings
 
         # proxy
         "USER_PROXY": os.getenv("USER_PROXY", "benmanu"),
@@ -4,6 +4,7 @@ import requests
 import os
 # Importar configuración
 from src.config import load_config
+from src.utils.json_stream import iter_json_records, iter_batches
 import json
 import random
 
@@ -44,26 +45,32 @@ def main():
     # Ruta al archivo JSON
     archivo_json = 'data/publications.json'
 
-    # Abrir y leer el archivo JSON
-    with open(archivo_json, 'r', encoding='utf-8') as archivo:
-        publications = json.load(archivo)
+    # Leer el archivo JSON en streaming e indexar por lotes para que la
+    # memoria no dependa del tamaño del volcado
+    # (el índice HNSW se construye una sola vez al terminar la carga)
+    muestra = []
+    total = 0
+    with pipeline.bulk_load():
+        for lote in iter_batches(iter_json_records(archivo_json), config["INDEX_BATCH_SIZE"]):
+            # Seleccionar una muestra aleatoria de 5 publicaciones (muestreo por reservorio)
+            for pub in lote:
+                total += 1
+                if len(muestra) < 5:
+                    muestra.append(pub)
+                else:
+                    j = random.randrange(total)
+                    if j < 5:
+                        muestra[j] = pub
 
+            # Extraer contenido relevante
+            processed_documents = [pipeline.extract_relevant_content(pub) for pub in lote]
 
-    # Seleccionar una muestra aleatoria de 5 publicaciones
-    muestra = random.sample(publications, 5)
+            # Indexar documentos en Qdrant
+            pipeline.index_documents(processed_documents)
 
     # Guardar la muestra en un nuevo archivo JSON
     with open('muestra_publicaciones.json', 'w', encoding='utf-8') as archivo_salida:
         json.dump(muestra, archivo_salida, ensure_ascii=False, indent=4)
-
-    # Extraer contenido relevante
-    processed_documents = []
-    for pub in publications:
-        doc = pipeline.extract_relevant_content(pub)
-        processed_documents.append(doc)
-    
-    # Indexar documentos en Qdrant
-    pipeline.index_documents(processed_documents)
     
     # Realizar algunas consultas de ejemplo
     ejemplos_consultas = [
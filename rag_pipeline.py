@@ -8,16 +8,20 @@ import numpy as np
 from openai import OpenAI
 
 # Para la base de datos vectorial Qdrant
-from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
 # Importar configuración
 from src.config import load_config
-from transformers.utils import logging
-from sentence_transformers import SentenceTransformer
-from tqdm import tqdm
+from src.utils.local_embeddings import EncoderPool, encode_batch
+from src.utils.embedding_providers import LocalEmbeddingProvider
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.json_stream import iter_json_records
+from src.utils.fetcher import PublicationFetcher
+from src.utils.qdrant_io import create_qdrant_client, upsert_points, bulk_load_mode
+from src.utils.collection_profiles import get_profile, collection_params, search_params
+from src.utils.context_packer import pack_context
 import time
-import torch
+import atexit
 
 # Cargar configuración
 config = load_config()
@@ -32,6 +36,9 @@ COLLECTION_NAME = config["COLLECTION_NAME"]
 EMBEDDING_MODEL = config["EMBEDDING_MODEL"]
 LLM_MODEL = config["LLM_MODEL"]
 LLM_TEMPERATURE = config["LLM_TEMPERATURE"]
+LOCAL_EMBEDDING_BATCH_SIZE = config["LOCAL_EMBEDDING_BATCH_SIZE"]
+EMBEDDING_WORKERS = config["EMBEDDING_WORKERS"] or os.cpu_count() or 1
+EMBEDDING_POOL_MIN_DOCS = config["EMBEDDING_POOL_MIN_DOCS"]
 #VECTOR_SIZE = config["VECTOR_SIZE"]
 
 # Configurar cliente OpenAI con base URL opcional
@@ -41,44 +48,87 @@ if OPENAI_API_BASE:
 
 # Inicializar clientes
 openai_client = OpenAI(**openai_client_kwargs)
-qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+qdrant_client = create_qdrant_client(config)
 
-# Cargar un modelo preentrenado de embeddings
-# Función para simular el progreso de la carga
-def load_model_with_progress(model_name):
-    print(f"Cargando el modelo: {model_name}")
-    # Verificar si hay una GPU disponible
-    device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    print(f"Usando dispositivo: {device}")
-    logging.set_verbosity_info()
-    # Creamos una barra de progreso
-    progress_bar = tqdm(total=100, desc="Cargando modelo", unit="%")
-    
-    # Como no podemos modificar directamente el proceso de carga del modelo,
-    # vamos a simular las actualizaciones de progreso
-    for i in range(0, 101, 10):
-        # Actualizar la barra de progreso
-        progress_bar.update(10)
-        
-        # Si estamos en el 100%, cargamos el modelo
-        if i == 100:
-            model = SentenceTransformer(model_name, device=device, trust_remote_code=True)
-    
-    progress_bar.close()
-    return model
+# Modelo local de embeddings (LOCAL_EMBEDDING_MODEL, con PyTorch u ONNX Runtime según
+# LOCAL_EMBEDDING_BACKEND): se carga la primera vez que se necesita (o en warm_up), no al
+# importar el módulo. Es el mismo proveedor que usa el servicio con EMBEDDING_PROVIDER=local
+local_embeddings = LocalEmbeddingProvider.from_config(config)
+LOCAL_MODEL_NAME = local_embeddings.model_name
+
+def get_model():
+    """Devolver el modelo de embeddings, cargándolo la primera vez"""
+    return local_embeddings.model
+
+def local_model_id() -> str:
+    """Identificador del modelo local para la caché de embeddings (int8 no da los mismos vectores)"""
+    return local_embeddings.model_id
+
+def get_vector_size() -> int:
+    """Dimensión de los embeddings del modelo local"""
+    return local_embeddings.dimension
 
-# Cargar el modelo con progreso simulado
-model = load_model_with_progress('sentence-transformers/all-MiniLM-L6-v2') #jinaai/jina-embeddings-v3  -  sentence-transformers/all-MiniLM-L6-v2
-VECTOR_SIZE = model.get_sentence_embedding_dimension()
-print("VECTOR_SIZE: "+str(VECTOR_SIZE))
 # Función para generar embeddings
 def generate_embeddings(text):
-    embeddings = model.encode(text)  # Genera los embeddings
+    embeddings = get_model().encode(text)  # Genera los embeddings
     return embeddings
 
+# Pool de procesos para ingestas grandes (se crea la primera vez que se necesita)
+_encoder_pool = None
+
+def get_encoder_pool():
+    global _encoder_pool
+    if _encoder_pool is None:
+        print(f"Iniciando pool de codificación con {EMBEDDING_WORKERS} procesos")
+        _encoder_pool = EncoderPool(LOCAL_MODEL_NAME, workers=EMBEDDING_WORKERS)
+        atexit.register(_encoder_pool.close)
+    return _encoder_pool
+
+# Función para generar embeddings de varios textos, en el orden de entrada
+def generate_embeddings_batch(texts, batch_size=LOCAL_EMBEDDING_BATCH_SIZE):
+    # Para ingestas grandes repartimos la inferencia entre todos los núcleos
+    # (ONNX Runtime ya usa todos los núcleos, y el pool daría vectores de PyTorch)
+    use_pool = local_embeddings.backend != "onnx"
+    if use_pool and EMBEDDING_WORKERS > 1 and len(texts) >= EMBEDDING_POOL_MIN_DOCS:
+        return get_encoder_pool().encode(texts, batch_size=batch_size)
+    return encode_batch(get_model(), texts, batch_size=batch_size)
+
+# Campos del payload que se leen en las búsquedas y al cargar documentos completos
+SEARCH_FIELDS = ["title", "summary", "metadata"]
+DOCUMENT_FIELDS = ["title", "summary", "body", "metadata"]
+
 class RAGPipeline:
     def __init__(self):
+        self.profile = get_profile(config["COLLECTION_PROFILE"])
         self._setup_qdrant()
+        self.fetcher = PublicationFetcher.from_config(config)
+        
+        # Caché persistente de embeddings para no recalcular textos sin cambios
+        self.embedding_cache = None
+        if config["EMBEDDING_CACHE_PATH"]:
+            self.embedding_cache = EmbeddingCache(
+                config["EMBEDDING_CACHE_PATH"],
+                model_name=local_model_id(),
+                vector_size=get_vector_size(),
+                max_entries=config["EMBEDDING_CACHE_MAX_ENTRIES"]
+            )
+    
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Cargar el modelo con una vectorización de prueba y comprobar la
+        conexión con Qdrant. Devuelve el tiempo de cada paso en milisegundos.
+        """
+        timings = {}
+        
+        start = time.perf_counter()
+        get_model().encode("warm-up")
+        timings["model_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        start = time.perf_counter()
+        qdrant_client.get_collection(COLLECTION_NAME)
+        timings["qdrant_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        return timings
     
     def _setup_qdrant(self):
         """Configurar la colección en Qdrant si no existe."""
@@ -89,26 +139,21 @@ class RAGPipeline:
             print(f"Creando colección {COLLECTION_NAME}...")
             qdrant_client.create_collection(
                 collection_name=COLLECTION_NAME,
-                vectors_config=models.VectorParams(
-                    size=VECTOR_SIZE, 
-                    distance=models.Distance.COSINE
-                ),
                 optimizers_config=models.OptimizersConfigDiff(
-                    indexing_threshold=10000  # Umbral para indexación
-                )
+                    indexing_threshold=config["QDRANT_INDEXING_THRESHOLD"]  # Umbral para indexación
+                ),
+                # Cuantización, HNSW y almacenamiento en disco según COLLECTION_PROFILE
+                **collection_params(self.profile, get_vector_size())
             )
             print(f"Colección {COLLECTION_NAME} creada correctamente")
     
     def fetch_publications(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Obtener publicaciones desde la API."""
         print("Descargando publicaciones desde la API...")
-        response = requests.get(f"{API_ENDPOINT}?limit={limit}")
-        if response.status_code == 200:
-            publications = response.json()
-            print(f"Se descargaron {len(publications)} publicaciones")
-            return publications
-        else:
-            raise Exception(f"Error al obtener publicaciones: {response.status_code}")
+        # Descarga paginada y concurrente con reintentos; lanza FetchError si falla
+        publications = self.fetcher.fetch_all(limit)
+        print(f"Se descargaron {len(publications)} publicaciones")
+        return publications
     
     def extract_relevant_content(self, publication: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -185,23 +230,53 @@ class RAGPipeline:
     def create_embedding(self, text: str) -> List[float]:
         """Crear un embedding para el texto usando OpenAI."""
         if not text.strip():
-            return np.zeros(VECTOR_SIZE).tolist()  # Vector de ceros para texto vacío
+            return np.zeros(get_vector_size()).tolist()  # Vector de ceros para texto vacío
             
         try:
             #response = openai_client.embeddings.create(
               #  input=text,
                # model=EMBEDDING_MODEL
             #)
-            print("generating embedings")
-            return generate_embeddings(text=text)
+            return generate_embeddings(text=text).tolist()
             #return response.data[0].embedding
         except Exception as e:
             print(f"Error generando embedding: {e}")
-            return np.zeros(VECTOR_SIZE).tolist()  # Vector de ceros en caso de error
+            return np.zeros(get_vector_size()).tolist()  # Vector de ceros en caso de error
     
-    def create_document_embedding(self, document: Dict[str, Any]) -> List[float]:
-        """Crear embedding para un documento completo concatenando campos importantes."""
-        # Concatenar título, resumen y cuerpo para crear un texto representativo
+    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Crear embeddings para varios textos por lotes, conservando el orden de entrada."""
+        embeddings = [np.zeros(get_vector_size()).tolist() for _ in texts]  # Vector de ceros para texto vacío
+        
+        pending = [i for i, text in enumerate(texts) if text.strip()]
+        
+        # Consultar la caché en bloque y codificar solo los textos que faltan
+        if self.embedding_cache is not None and pending:
+            cached = self.embedding_cache.get_many([texts[i] for i in pending])
+            missing = []
+            for i, vector in zip(pending, cached):
+                if vector is None:
+                    missing.append(i)
+                else:
+                    embeddings[i] = vector
+            pending = missing
+        
+        if not pending:
+            return embeddings
+        
+        try:
+            vectors = generate_embeddings_batch([texts[i] for i in pending])
+            for i, vector in zip(pending, vectors):
+                embeddings[i] = vector.tolist()
+            
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many([texts[i] for i in pending], [embeddings[i] for i in pending])
+        except Exception as e:
+            print(f"Error generando embeddings por lotes: {e}")
+        
+        return embeddings
+    
+    def _document_text(self, document: Dict[str, Any]) -> str:
+        """Concatenar título, resumen y cuerpo para crear un texto representativo."""
         combined_text = document["title"]
         
         if document["summary"]:
@@ -210,18 +285,22 @@ class RAGPipeline:
         if document["body"]:
             combined_text += " " + document["body"]
         
-        return self.create_embedding(combined_text)
+        return combined_text
+    
+    def create_document_embedding(self, document: Dict[str, Any]) -> List[float]:
+        """Crear embedding para un documento completo concatenando campos importantes."""
+        return self.create_embedding(self._document_text(document))
     
     def index_documents(self, documents: List[Dict[str, Any]]) -> None:
         """Indexar documentos en Qdrant."""
         print(f"Indexando {len(documents)} documentos en Qdrant...")
         
+        # Crear los embeddings de todos los documentos por lotes
+        embeddings = self.create_embeddings([self._document_text(doc) for doc in documents])
+        
         points = []
         
-        for doc in documents:
-            # Crear embedding para el documento
-            embedding = self.create_document_embedding(doc)
-            
+        for doc, embedding in zip(documents, embeddings):
             # Preparar punto para Qdrant
             point = models.PointStruct(
                 id=doc["id"] if isinstance(doc["id"], str) else str(doc["id"]),
@@ -236,30 +315,43 @@ class RAGPipeline:
             
             points.append(point)
         
-        # Realizar la inserción por lotes
+        # Realizar la inserción en lotes con varias peticiones en curso
         if points:
-            qdrant_client.upsert(
-                collection_name=COLLECTION_NAME,
-                points=points
+            upsert_points(
+                qdrant_client,
+                COLLECTION_NAME,
+                points,
+                batch_size=config["UPSERT_BATCH_SIZE"],
+                parallel=config["UPSERT_PARALLEL"]
             )
             print(f"Indexación completada: {len(points)} documentos añadidos a Qdrant")
     
-    def rag_query(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def bulk_load(self):
+        """Posponer la indexación HNSW durante una carga masiva (bloque `with`)"""
+        return bulk_load_mode(qdrant_client, COLLECTION_NAME, default_threshold=config["QDRANT_INDEXING_THRESHOLD"])
+    
+    def rag_query(self, query: str, limit: int = 5, fields: List[str] = None) -> List[Dict[str, Any]]:
         """
         Realizar una consulta RAG:
         1. Vectorizar la consulta
         2. Buscar documentos similares en Qdrant
         3. Devolver los documentos relevantes
+        Solo se leen del payload los campos `fields` (por defecto todos
+        menos el cuerpo, que se puede cargar después con get_documents).
         """
+        fields = list(fields or SEARCH_FIELDS)
+        
         # Crear embedding para la consulta
         query_embedding = self.create_embedding(query)
         
         # Buscar documentos similares en Qdrant
-        search_result = qdrant_client.search(
+        search_result = qdrant_client.query_points(
             collection_name=COLLECTION_NAME,
-            query_vector=query_embedding,
-            limit=limit
-        )
+            query=query_embedding,
+            limit=limit,
+            with_payload=fields,
+            search_params=search_params(self.profile)
+        ).points
         
         # Preparar respuesta
         results = []
@@ -267,16 +359,33 @@ class RAGPipeline:
             # Extraer información del punto
             doc = {
                 "id": scored_point.id,
-                "score": scored_point.score,  # Puntuación de similitud
-                "title": scored_point.payload.get("title", ""),
-                "summary": scored_point.payload.get("summary", ""),
-                "body": scored_point.payload.get("body", ""),
-                "metadata": scored_point.payload.get("metadata", {})
+                "score": scored_point.score  # Puntuación de similitud
             }
+            for field in fields:
+                doc[field] = scored_point.payload.get(field, {} if field == "metadata" else "")
             results.append(doc)
         
         return results
     
+    def get_documents(self, doc_ids: List[str], fields: List[str] = None) -> List[Dict[str, Any]]:
+        """Cargar varios documentos por ID en una sola lectura (retrieve), en el orden pedido"""
+        fields = list(fields or DOCUMENT_FIELDS)
+        points = qdrant_client.retrieve(
+            collection_name=COLLECTION_NAME,
+            ids=doc_ids,
+            with_payload=fields,
+            with_vectors=False
+        )
+        
+        found = {}
+        for point in points:
+            doc = {"id": point.id}
+            for field in fields:
+                doc[field] = point.payload.get(field, {} if field == "metadata" else "")
+            found[str(point.id)] = doc
+        
+        return [found[str(doc_id)] for doc_id in doc_ids if str(doc_id) in found]
+    
     def run_rag_query_with_llm(self, query: str, limit: int = 3) -> str:
         """
         Ejecutar una consulta RAG completa con respuesta del LLM:
@@ -284,28 +393,20 @@ class RAGPipeline:
         2. Enviar documentos + consulta al LLM
         3. Obtener respuesta generada
         """
-        # Recuperar documentos relevantes
-        relevant_docs = self.rag_query(query, limit=limit)
+        # Recuperar documentos relevantes (con el cuerpo, que se usa como contexto)
+        relevant_docs = self.rag_query(query, limit=limit, fields=DOCUMENT_FIELDS)
         
         if not relevant_docs:
             return "No se encontraron documentos relevantes para tu consulta."
         
-        # Preparar contexto para el LLM
-        context = "Información relevante:\n\n"
-        
-        for i, doc in enumerate(relevant_docs, 1):
-            context += f"Documento {i}:\n"
-            context += f"Título: {doc['title']}\n"
-            
-            if doc['summary']:
-                context += f"Resumen: {doc['summary']}\n"
-            
-            # Incluir solo los primeros 1000 caracteres del cuerpo para no sobrecargar el contexto
-            if doc['body']:
-                truncated_body = doc['body'][:1000] + "..." if len(doc['body']) > 1000 else doc['body']
-                context += f"Contenido: {truncated_body}\n"
-            
-            context += "\n---\n\n"
+        # Empaquetar los pasajes más relevantes (sin HTML) dentro del presupuesto de tokens
+        context, context_stats = pack_context(
+            relevant_docs,
+            config["CONTEXT_TOKEN_BUDGET"],
+            window_words=config["CHUNK_SIZE"]
+        )
+        print(f"Contexto: {context_stats['tokens_used']}/{context_stats['token_budget']} tokens, "
+              f"{context_stats['passages']} pasajes de {context_stats['documents']} documentos")
         
         # Construir prompt para OpenAI
         prompt = f"""Basándote en la siguiente información, responde a esta consulta de forma clara y concisa:
@@ -335,11 +436,8 @@ Respuesta:"""
 
 # Función de ejemplo para procesar un archivo local (como el ejemplo proporcionado)
 def process_local_json_file(file_path: str) -> List[Dict[str, Any]]:
-    """Procesar un archivo JSON local como ejemplo."""
-    with open(file_path, 'r') as file:
-        # Para el ejemplo proporcionado, parece ser un único documento en JSON
-        publication = json.load(file)
-        return [publication]
+    """Procesar un archivo JSON local como ejemplo (array, JSON Lines u objeto único)."""
+    return list(iter_json_records(file_path))
 
 # Función principal
 def main():
@@ -0,0 +1,151 @@
+"""
+Benchmark de perfiles de colección: recall@k frente a búsqueda exacta,
+latencia p50/p99 y memoria residente para cada perfil de
+src/utils/collection_profiles.py.
+
+Necesita una instancia de Qdrant (por defecto localhost:6333). La memoria
+residente se lee de la métrica `memory_resident_bytes` del endpoint /metrics
+de Qdrant tras cargar cada colección (o del propio proceso con --memory).
+Con --memory se usa Qdrant en memoria: solo sirve para comprobar el script,
+porque el modo local ignora la cuantización, el HNSW y el almacenamiento en
+disco y siempre busca de forma exacta.
+
+Uso:
+    python scripts/bench_collection_profiles.py --points 100000 --dim 768
+    python scripts/bench_collection_profiles.py --profiles default scalar binary_on_disk --hnsw-ef 64
+    python scripts/bench_collection_profiles.py --memory --points 2000
+"""
+
+import argparse
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import requests
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.collection_profiles import PROFILES, get_profile, collection_params, search_params
+from src.utils.qdrant_io import upsert_points
+
+
+def build_vectors(count: int, dim: int, queries: int):
+    """Vectores agrupados en torno a centros (más parecidos a embeddings reales que el ruido uniforme)"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(1, count // 100), dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + rng.normal(0, 0.5, (count, dim)).astype(np.float32)
+    targets = centers[rng.integers(0, len(centers), queries)] + rng.normal(0, 0.5, (queries, dim)).astype(np.float32)
+    return vectors, targets
+
+
+def wait_until_indexed(client: QdrantClient, collection_name: str, timeout: float = 900.0) -> None:
+    """Esperar a que el optimizador termine de construir el índice y la cuantización"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def resident_memory(args) -> float:
+    """Memoria residente en MB del servidor de Qdrant (o de este proceso con --memory)"""
+    if args.memory:
+        with open("/proc/self/status") as status:
+            match = re.search(r"VmRSS:\s+(\d+) kB", status.read())
+        return int(match.group(1)) / 1024 if match else float("nan")
+
+    try:
+        response = requests.get(f"http://{args.host}:{args.port}/metrics", timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"No se pudo leer /metrics de Qdrant: {e}")
+        return float("nan")
+    match = re.search(r"^memory_resident_bytes\s+([0-9.e+]+)", response.text, re.MULTILINE)
+    return float(match.group(1)) / (1024 * 1024) if match else float("nan")
+
+
+def search(client, collection_name, queries, k, params):
+    """Ids devueltos y latencia de cada consulta"""
+    results, latencies = [], []
+    for query_vector in queries:
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=collection_name,
+            query=query_vector,
+            limit=k,
+            search_params=params,
+            with_payload=False
+        ).points
+        latencies.append(time.perf_counter() - start)
+        results.append([point.id for point in points])
+    return results, latencies
+
+
+def run(client, args, name, vectors, queries):
+    profile = get_profile(name)
+    collection_name = f"bench_profile_{name}_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=collection_name,
+        **collection_params(profile, args.dim)
+    )
+    try:
+        points = [
+            models.PointStruct(id=i + 1, vector=vectors[i].tolist(), payload={"parent_id": str(i)})
+            for i in range(len(vectors))
+        ]
+        upsert_points(client, collection_name, points, batch_size=args.batch_size, parallel=args.parallel)
+        wait_until_indexed(client, collection_name)
+        memory = resident_memory(args)
+
+        # Referencia: búsqueda exacta sobre los vectores originales
+        truth, _ = search(client, collection_name, queries, args.k, models.SearchParams(exact=True))
+
+        params = search_params(profile, hnsw_ef=args.hnsw_ef)
+        search(client, collection_name, queries[:10], args.k, params)  # Calentamiento
+        found, latencies = search(client, collection_name, queries, args.k, params)
+
+        recall = np.mean([
+            len(set(expected) & set(result)) / max(1, len(expected))
+            for expected, result in zip(truth, found)
+        ])
+        return recall, latencies, memory
+    finally:
+        client.delete_collection(collection_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--memory", action="store_true", help="Usar Qdrant en memoria")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=None, help="hnsw_ef por petición (por defecto el del perfil)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    client = QdrantClient(":memory:") if args.memory else QdrantClient(host=args.host, port=args.port)
+    vectors, queries = build_vectors(args.points, args.dim, args.queries)
+    queries = queries.tolist()
+
+    print(f"Puntos: {args.points}  dimensión: {args.dim}  consultas: {args.queries}  k: {args.k}")
+    print(f"{'perfil':<16}{'recall@k':>10}{'p50 (ms)':>11}{'p99 (ms)':>11}{'RSS (MB)':>11}")
+    for name in args.profiles:
+        recall, latencies, memory = run(client, args, name, vectors, queries)
+        p50, p99 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 99))
+        print(f"{name:<16}{recall:>10.3f}{p50:>11.2f}{p99:>11.2f}{memory:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de generación de embeddings: petición por documento frente a lotes.
+
+Usa un servidor local que imita el endpoint de embeddings de OpenAI con una
+latencia fija por petición, de modo que se mide el coste de los viajes de
+red y no el del modelo.
+
+Uso:
+    python scripts/bench_embeddings.py --docs 2000 --latency 0.02
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from openai import OpenAI
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.mcp_architecture import ModelComponent
+from tests.stubs import StubOpenAIServer
+
+
+def build_documents(count: int):
+    return [
+        {
+            "id": str(i),
+            "title": f"Publicación de prueba {i}",
+            "summary": "Resumen de la publicación de prueba",
+            "body": "<p>" + ("Contenido de la publicación sobre economía circular. " * 40) + "</p>",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="Número de documentos")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latencia por petición (s)")
+    parser.add_argument("--vector-size", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-max-tokens", type=int, default=60000)
+    args = parser.parse_args()
+
+    documents = build_documents(args.docs)
+
+    with StubOpenAIServer(vector_size=args.vector_size, latency=args.latency) as server:
+        client = OpenAI(api_key="stub", base_url=server.base_url)
+        model = ModelComponent(client, {
+            "EMBEDDING_MODEL": "stub-embeddings",
+            "VECTOR_SIZE": args.vector_size,
+            "EMBEDDING_BATCH_SIZE": args.batch_size,
+            "EMBEDDING_BATCH_MAX_TOKENS": args.batch_max_tokens,
+            "EMBEDDING_MAX_INPUT_TOKENS": 8000,
+        })
+
+        start = time.perf_counter()
+        single = [model.create_document_embedding(doc) for doc in documents]
+        single_elapsed = time.perf_counter() - start
+        single_requests = server.embedding_requests
+
+        start = time.perf_counter()
+        batched = model.create_document_embeddings(documents)
+        batched_elapsed = time.perf_counter() - start
+        batched_requests = server.embedding_requests - single_requests
+
+    assert single == batched, "Los embeddings por lotes no coinciden con los individuales"
+
+    print(f"Documentos: {args.docs}  latencia por petición: {args.latency * 1000:.0f} ms")
+    print(f"{'modo':<12}{'peticiones':>12}{'tiempo (s)':>12}{'docs/s':>12}")
+    print(f"{'por doc':<12}{single_requests:>12}{single_elapsed:>12.2f}{args.docs / single_elapsed:>12.1f}")
+    print(f"{'por lotes':<12}{batched_requests:>12}{batched_elapsed:>12.2f}{args.docs / batched_elapsed:>12.1f}")
+    print(f"Aceleración: x{single_elapsed / batched_elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark de búsqueda híbrida: solo densa, solo BM25 y ambas fusionadas con
+RRF, sobre consultas por nombre exacto de informe (sigla + código).
+
+Cada documento tiene un título con un código único. El vector denso de cada
+consulta es el del documento buscado con ruido (`--noise`), para simular un
+embedding que capta el tema pero no distingue el nombre exacto. Se mide el
+acierto en el top-k (hit@k), el MRR y la latencia p50/p99 de cada modo, de
+modo que se ve la aportación y el coste de cada lado.
+
+Uso:
+    python scripts/bench_hybrid_search.py --memory --docs 2000
+    python scripts/bench_hybrid_search.py --host localhost --docs 20000 --noise 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.mcp_architecture import ContextComponent, hybrid_search_requests, fuse_search_results, group_chunks
+
+ACRONYMS = ["CEPAL", "ODS", "PNUD", "OCDE", "BID", "FAO", "OIT", "UNESCO"]
+
+
+def build_documents(count: int, rng):
+    documents = []
+    for i in range(count):
+        code = f"{ACRONYMS[i % len(ACRONYMS)]}-{rng.integers(100, 999)}{chr(65 + i % 26)}{i}"
+        documents.append({
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "title": f"Informe {code} de seguimiento regional",
+            "summary": "Seguimiento de indicadores de desarrollo sostenible",
+            "body": "",
+            "metadata": {},
+            "code": code,
+        })
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--memory", action="store_true", help="Usar Qdrant en memoria")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--noise", type=float, default=2.5, help="Ruido del vector denso de la consulta")
+    args = parser.parse_args()
+
+    config = {
+        "COLLECTION_NAME": "bench_hybrid_search",
+        "VECTOR_SIZE": args.dim,
+        "QDRANT_INDEXING_THRESHOLD": 10000,
+        "UPSERT_BATCH_SIZE": 256,
+        "UPSERT_PARALLEL": 4,
+        "CHUNK_SEARCH_FACTOR": 4,
+        "MAX_PASSAGES_PER_DOC": 3,
+        "HYBRID_SEARCH_ENABLED": True,
+        "RRF_K": 60,
+    }
+
+    client = QdrantClient(":memory:") if args.memory else QdrantClient(host=args.host, port=args.port)
+    if client.collection_exists(config["COLLECTION_NAME"]):
+        client.delete_collection(config["COLLECTION_NAME"])
+
+    context = ContextComponent(client, config)
+    rng = np.random.default_rng(0)
+    documents = build_documents(args.docs, rng)
+    vectors = rng.standard_normal((args.docs, args.dim), dtype=np.float32)
+
+    name = config["COLLECTION_NAME"]
+    chunk_limit = args.limit * config["CHUNK_SEARCH_FACTOR"]
+    results = {"densa": ([], []), "BM25": ([], []), "híbrida": ([], [])}
+
+    try:
+        context.store_documents(documents, vectors.tolist())
+
+        targets = rng.integers(0, args.docs, args.queries)
+        for target in targets:
+            query_text = f"informe {documents[target]['code']}"
+            query_vector = (vectors[target] + rng.normal(0, args.noise, args.dim)).tolist()
+            sparse_vector = context.sparse_encoder.encode_query(query_text)
+            dense_request, sparse_request = hybrid_search_requests(query_vector, sparse_vector, chunk_limit, None, None)
+
+            start = time.perf_counter()
+            dense = client.query_points(name, query=dense_request.query, limit=chunk_limit,
+                                        with_payload=dense_request.with_payload).points
+            dense_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            sparse = client.query_points(name, query=sparse_request.query, using=sparse_request.using,
+                                         limit=chunk_limit, with_payload=sparse_request.with_payload).points
+            sparse_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hybrid = context.retrieve_documents(query_vector, args.limit, query_text=query_text)
+            hybrid_time = time.perf_counter() - start
+
+            ranked = {
+                "densa": (group_chunks(dense, args.limit, 3), dense_time),
+                "BM25": (fuse_search_results([], sparse, args.limit, 3), sparse_time),
+                "híbrida": (hybrid, hybrid_time),
+            }
+            for mode, (docs, elapsed) in ranked.items():
+                ids = [doc["id"] for doc in docs]
+                rank = ids.index(documents[target]["id"]) + 1 if documents[target]["id"] in ids else 0
+                results[mode][0].append(1.0 / rank if rank else 0.0)
+                results[mode][1].append(elapsed)
+    finally:
+        client.delete_collection(name)
+
+    print(f"Documentos: {args.docs}  consultas: {args.queries}  top-k: {args.limit}  ruido denso: {args.noise}")
+    print(f"{'modo':<10}{'hit@k':>8}{'MRR':>8}{'p50 (ms)':>11}{'p99 (ms)':>11}")
+    for mode, (reciprocal_ranks, latencies) in results.items():
+        hit = np.mean([rr > 0 for rr in reciprocal_ranks])
+        p50, p99 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 99))
+        print(f"{mode:<10}{hit:>8.3f}{np.mean(reciprocal_ranks):>8.3f}{p50:>11.2f}{p99:>11.2f}")
+    print(f"Aportación por documento devuelto (híbrida): {context.hybrid_stats.stats()['documents']}")
+
+
+if __name__ == "__main__":
+    main()
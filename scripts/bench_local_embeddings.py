@@ -0,0 +1,82 @@
+"""
+Benchmark de codificación local con SentenceTransformer.
+
+Compara docs/s de tres caminos sobre los documentos de data/publications.json:
+1. Bucle actual: una llamada a model.encode por documento
+2. Lotes en un único proceso (encode_batch)
+3. Pool multiproceso (EncoderPool), un proceso por núcleo
+
+Uso:
+    python scripts/bench_local_embeddings.py --repeat 10 --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.local_embeddings import EncoderPool, encode_batch
+
+
+def load_texts(path: Path, repeat: int):
+    with open(path, "r", encoding="utf-8") as file:
+        publications = json.load(file)
+
+    texts = []
+    for pub in publications:
+        title = pub["title"][0]["value"] if pub.get("title") else ""
+        body = pub["body"][0].get("processed", "") if pub.get("body") else ""
+        texts.append(f"{title} {body}")
+    return texts * repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--data", default=str(project_root / "data" / "publications.json"))
+    parser.add_argument("--repeat", type=int, default=5, help="Veces que se repite el corpus")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    texts = load_texts(Path(args.data), args.repeat)
+    model = SentenceTransformer(args.model, device="cpu")
+    results = []
+
+    start = time.perf_counter()
+    loop_vectors = np.vstack([model.encode(text) for text in texts])
+    results.append(("bucle", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    batch_vectors = encode_batch(model, texts, batch_size=args.batch_size)
+    results.append(("lotes", time.perf_counter() - start))
+
+    with EncoderPool(args.model, workers=args.workers) as pool:
+        # Calentamiento: cargar el modelo en todos los procesos
+        pool.encode(texts[:args.workers], batch_size=1, chunk_size=1)
+
+        start = time.perf_counter()
+        pool_vectors = pool.encode(texts, batch_size=args.batch_size)
+        results.append((f"pool x{args.workers}", time.perf_counter() - start))
+
+    # Los tres caminos deben devolver los mismos vectores en el mismo orden
+    assert np.allclose(loop_vectors, batch_vectors, atol=1e-4)
+    assert np.allclose(loop_vectors, pool_vectors, atol=1e-4)
+
+    print(f"Textos: {len(texts)}  núcleos: {os.cpu_count()}")
+    print(f"{'modo':<12}{'tiempo (s)':>12}{'docs/s':>12}")
+    for name, elapsed in results:
+        print(f"{name:<12}{elapsed:>12.2f}{len(texts) / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark de micro-lotes para embeddings de consulta con un modelo local
+(SentenceTransformer).
+
+Simula `--concurrency` clientes que piden embeddings de consultas sin pausa
+y compara dos estrategias:
+
+- individual: cada petición codifica su texto con un pase de lote 1 en un
+  hilo (los pases compiten por la CPU)
+- microlote: MicroBatcher reúne las peticiones durante `--max-wait-ms` (o
+  hasta `--max-batch` textos) y las codifica en un solo pase
+
+Para cada nivel de concurrencia informa del rendimiento (peticiones/s) y
+de la latencia p50/p99 por petición.
+
+Uso:
+    python scripts/bench_microbatch.py --concurrency 1 4 16 64 --requests 512
+    python scripts/bench_microbatch.py --model sentence-transformers/all-MiniLM-L6-v2 --max-wait-ms 2 --max-batch 64
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.local_embeddings import encode_batch
+from src.utils.micro_batcher import MicroBatcher
+
+WORDS = ("agua potable saneamiento rural calidad informe anual presupuesto municipal "
+         "educación salud pública energía renovable transporte vivienda empleo").split()
+
+
+def sample_queries(count: int, seed: int):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(4, 12))) for _ in range(count)]
+
+
+async def run_clients(embed, queries, concurrency):
+    """Clientes en bucle cerrado: cada uno envía su siguiente consulta al recibir la respuesta"""
+    latencies = []
+    queue = list(queries)
+
+    async def client():
+        while queue:
+            text = queue.pop()
+            start = time.perf_counter()
+            await embed(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=512, help="Peticiones por nivel y estrategia")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = SentenceTransformer(args.model, device="cpu")
+    queries = sample_queries(args.requests, args.seed)
+    # Calentar el modelo antes de medir
+    encode_batch(model, queries[:8])
+
+    async def individual(text):
+        return (await asyncio.to_thread(encode_batch, model, [text], 1))[0]
+
+    async def bench(concurrency):
+        batcher = MicroBatcher(
+            lambda texts: asyncio.to_thread(encode_batch, model, texts, len(texts)),
+            max_wait_ms=args.max_wait_ms,
+            max_batch_size=args.max_batch
+        )
+        results = {
+            "individual": await run_clients(individual, queries, concurrency),
+            "microlote": await run_clients(batcher.submit, queries, concurrency)
+        }
+        return results, batcher.stats()
+
+    print(f"Modelo: {args.model}  peticiones: {args.requests}  "
+          f"espera máx.: {args.max_wait_ms} ms  lote máx.: {args.max_batch}")
+    print(f"{'concurrencia':>12}  {'estrategia':<11}{'peticiones/s':>13}{'p50 (ms)':>10}{'p99 (ms)':>10}{'lote medio':>12}")
+    for concurrency in args.concurrency:
+        results, stats = asyncio.run(bench(concurrency))
+        for name, (seconds, latencies) in results.items():
+            p50, p99 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 99))
+            batch = stats["avg_batch_size"] if name == "microlote" else 1.0
+            print(f"{concurrency:>12}  {name:<11}{len(latencies) / seconds:>13.1f}{p50:>10.2f}{p99:>10.2f}{batch:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark de los embeddings locales: PyTorch (SentenceTransformer) frente a
+ONNX Runtime fp32 e int8.
+
+Para cada backend mide:
+
+- latencia de una consulta (un texto por llamada): p50 y p99
+- rendimiento por lotes: textos por segundo con `--batch-size`
+- paridad: similitud coseno mínima y media frente a los vectores de PyTorch
+
+El modelo se exporta a ONNX la primera vez en `--onnx-dir` (por defecto
+ONNX_MODEL_DIR). Con --threads se fija intra_op_num_threads de ONNX Runtime
+y torch.set_num_threads para PyTorch, de modo que la comparación sea con
+los mismos núcleos.
+
+Uso:
+    python scripts/bench_onnx_embeddings.py --queries 200 --texts 2000
+    python scripts/bench_onnx_embeddings.py --model sentence-transformers/all-MiniLM-L6-v2 --threads 1 --inter-threads 1
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import load_config
+from src.utils.onnx_embeddings import load_onnx_encoder
+
+# Modelo local de rag_pipeline (LOCAL_MODEL_NAME)
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+WORDS = ("agua potable saneamiento rural calidad informe anual presupuesto municipal "
+         "educación salud pública energía renovable transporte vivienda empleo").split()
+
+
+def sample_texts(count: int, seed: int, min_words: int = 3, max_words: int = 60):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words))) for _ in range(count)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(encode, queries, texts, batch_size):
+    """Latencias de consultas sueltas (ms) y textos por segundo en lotes"""
+    encode(queries[:2])  # calentamiento
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        encode(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    encode(texts, batch_size=batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+    return latencies, throughput
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--onnx-dir", default=config["ONNX_MODEL_DIR"])
+    parser.add_argument("--queries", type=int, default=200, help="Consultas sueltas para medir la latencia")
+    parser.add_argument("--texts", type=int, default=2000, help="Textos para medir el rendimiento por lotes")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="Hilos intra-op (0: los decide cada backend)")
+    parser.add_argument("--inter-threads", type=int, default=0, help="Hilos inter-op de ONNX Runtime")
+    parser.add_argument("--skip-torch", action="store_true", help="Medir solo ONNX Runtime (sin paridad)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    queries = sample_texts(args.queries, args.seed, max_words=12)
+    texts = sample_texts(args.texts, args.seed + 1)
+    parity_texts = queries[:50] + texts[:50]
+
+    backends = {}
+    if not args.skip_torch:
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        backends["torch"] = SentenceTransformer(args.model, device="cpu")
+    for name, quantize in (("onnx fp32", False), ("onnx int8", True)):
+        backends[name] = load_onnx_encoder(args.model, args.onnx_dir, quantize=quantize,
+                                           intra_op_threads=args.threads, inter_op_threads=args.inter_threads)
+
+    print(f"Modelo: {args.model}  consultas: {len(queries)}  textos: {len(texts)}  "
+          f"lote: {args.batch_size}  hilos: {args.threads or 'auto'}/{args.inter_threads or 'auto'}")
+    print(f"{'backend':<11}{'p50 (ms)':>10}{'p99 (ms)':>10}{'textos/s':>11}{'cos mín':>10}{'cos media':>11}")
+
+    reference = None
+    if "torch" in backends:
+        reference = backends["torch"].encode(parity_texts, convert_to_numpy=True, normalize_embeddings=True)
+
+    for name, model in backends.items():
+        latencies, throughput = measure(model.encode, queries, texts, args.batch_size)
+        parity = ""
+        if reference is not None:
+            vectors = model.encode(parity_texts)
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            similarities = (vectors * reference).sum(axis=1)
+            parity = f"{similarities.min():>10.5f}{similarities.mean():>11.5f}"
+        print(f"{name:<11}{statistics.median(latencies):>10.2f}{percentile(latencies, 0.99):>10.2f}"
+              f"{throughput:>11.1f}{parity}")
+
+
+if __name__ == "__main__":
+    main()
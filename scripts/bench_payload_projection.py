@@ -0,0 +1,131 @@
+"""
+Benchmark de proyección del payload en las búsquedas: leer el payload
+completo (con el cuerpo HTML de cada documento) frente a leer solo los campos
+que necesita la consulta.
+
+Mide el tamaño del payload devuelto por Qdrant y la latencia de la búsqueda
+de fragmentos que hace retrieve_documents. Con --memory se usa Qdrant en
+memoria (sin red, y el modo local filtra el payload en Python, por lo que no
+refleja la latencia real); contra un servidor la diferencia incluye la
+serialización y la transferencia por red.
+
+Uso:
+    python scripts/bench_payload_projection.py --memory --docs 500
+    python scripts/bench_payload_projection.py --host localhost --docs 2000 --body-kb 50
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.mcp_architecture import ContextComponent, ProtocolComponent, search_payload_fields
+
+
+def build_documents(count: int, body_kb: int):
+    paragraph = "<p>" + "Contenido de la publicación sobre economía circular y políticas públicas. " * 12 + "</p>\n"
+    repeats = max(1, body_kb * 1024 // len(paragraph))
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "title": f"Publicación de prueba {i}",
+            "summary": "Resumen de la publicación de prueba",
+            "body": paragraph * repeats,
+            "metadata": {"type": "report", "url": f"https://example.org/{i}"},
+        }
+        for i in range(count)
+    ]
+
+
+def measure(client, collection_name, queries, limit, with_payload):
+    """Latencia de la búsqueda y bytes de payload devueltos por Qdrant por consulta"""
+    latencies, sizes = [], []
+    for query_vector in queries:
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=collection_name,
+            query=query_vector,
+            limit=limit,
+            with_payload=with_payload
+        ).points
+        latencies.append(time.perf_counter() - start)
+        sizes.append(sum(len(json.dumps(point.payload, ensure_ascii=False).encode("utf-8")) for point in points))
+    return latencies, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--memory", action="store_true", help="Usar Qdrant en memoria")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--body-kb", type=int, default=30, help="Tamaño del cuerpo HTML de cada documento")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    config = {
+        "COLLECTION_NAME": "bench_payload_projection",
+        "VECTOR_SIZE": args.dim,
+        "QDRANT_INDEXING_THRESHOLD": 10000,
+        "UPSERT_BATCH_SIZE": 256,
+        "UPSERT_PARALLEL": 4,
+        "CHUNK_SIZE": 200,
+        "CHUNK_OVERLAP": 40,
+        "CHUNK_SEARCH_FACTOR": 4,
+        "MAX_PASSAGES_PER_DOC": 3,
+    }
+
+    client = QdrantClient(":memory:") if args.memory else QdrantClient(host=args.host, port=args.port)
+    if client.collection_exists(config["COLLECTION_NAME"]):
+        client.delete_collection(config["COLLECTION_NAME"])
+
+    context = ContextComponent(client, config)
+    protocol = ProtocolComponent(config)
+    rng = np.random.default_rng(0)
+
+    try:
+        chunks = [chunk for doc in build_documents(args.docs, args.body_kb) for chunk in protocol.chunk_document(doc)]
+        vectors = rng.standard_normal((len(chunks), args.dim), dtype=np.float32).tolist()
+        context.store_chunks(chunks, vectors)
+
+        # Consultas cercanas a fragmentos reales, incluidos primeros fragmentos (con el cuerpo)
+        targets = rng.integers(0, len(chunks), args.queries)
+        queries = (np.asarray(vectors, dtype=np.float32)[targets]
+                   + rng.normal(0, 0.3, (args.queries, args.dim))).tolist()
+
+        # Mismo número de fragmentos que pide retrieve_documents
+        limit = args.limit * config["CHUNK_SEARCH_FACTOR"]
+        name = config["COLLECTION_NAME"]
+
+        # Calentamiento
+        measure(client, name, queries[:5], limit, True)
+
+        full_latencies, full_sizes = measure(client, name, queries, limit, True)
+        lean_latencies, lean_sizes = measure(client, name, queries, limit, search_payload_fields())
+    finally:
+        client.delete_collection(config["COLLECTION_NAME"])
+
+    def p(values, q):
+        return float(np.percentile(values, q)) * 1000
+
+    print(f"Documentos: {args.docs} ({len(chunks)} fragmentos)  cuerpo: {args.body_kb} KB  consultas: {args.queries}")
+    print(f"{'payload':<12}{'KB/consulta':>14}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for label, latencies, sizes in (("completo", full_latencies, full_sizes), ("proyectado", lean_latencies, lean_sizes)):
+        print(f"{label:<12}{statistics.mean(sizes) / 1024:>14.1f}{p(latencies, 50):>12.2f}{p(latencies, 99):>12.2f}")
+    print(f"Reducción de tamaño: x{statistics.mean(full_sizes) / statistics.mean(lean_sizes):.1f}  "
+          f"latencia p50: x{p(full_latencies, 50) / p(lean_latencies, 50):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark de inserción en Qdrant: una sola petición frente a lotes en
+paralelo, con y sin el modo de carga masiva (indexación HNSW diferida).
+
+Necesita una instancia de Qdrant (por defecto localhost:6333), por ejemplo:
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+
+Cada modo escribe en una colección temporal que se elimina al terminar.
+Con --memory se usa Qdrant en memoria (solo para comprobar el script: el
+modo local no construye índices HNSW).
+
+Uso:
+    python scripts/bench_qdrant_upsert.py --points 50000 --dim 768
+    python scripts/bench_qdrant_upsert.py --grpc --batch-size 512 --parallel 8
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.qdrant_io import upsert_points, bulk_load_mode
+
+
+def build_points(count: int, dim: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return [
+        models.PointStruct(
+            id=str(uuid.UUID(int=i + 1)),
+            vector=vectors[i].tolist(),
+            payload={"parent_id": str(i), "chunk_index": 0, "title": f"Publicación {i}"}
+        )
+        for i in range(count)
+    ]
+
+
+def wait_until_indexed(client: QdrantClient, collection_name: str, timeout: float = 600.0) -> None:
+    """Esperar a que el optimizador termine de construir el índice"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.2)
+
+
+def run(client, points, dim, batch_size, parallel, bulk, threshold):
+    collection_name = f"bench_upsert_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=threshold)
+    )
+    try:
+        start = time.perf_counter()
+        if bulk:
+            with bulk_load_mode(client, collection_name, default_threshold=threshold):
+                upsert_points(client, collection_name, points, batch_size=batch_size, parallel=parallel)
+        else:
+            upsert_points(client, collection_name, points, batch_size=batch_size, parallel=parallel)
+        upsert_elapsed = time.perf_counter() - start
+
+        # Incluir la construcción del índice: en modo masivo se hace al final
+        wait_until_indexed(client, collection_name)
+        total_elapsed = time.perf_counter() - start
+        return upsert_elapsed, total_elapsed
+    finally:
+        client.delete_collection(collection_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--grpc", action="store_true", help="Usar gRPC en lugar de HTTP")
+    parser.add_argument("--memory", action="store_true", help="Usar Qdrant en memoria")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--indexing-threshold", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.memory:
+        client = QdrantClient(":memory:")
+    else:
+        client = QdrantClient(host=args.host, port=args.port, grpc_port=args.grpc_port, prefer_grpc=args.grpc)
+
+    points = build_points(args.points, args.dim)
+
+    modes = [
+        ("una petición", len(points), 1, False),
+        ("lotes", args.batch_size, 1, False),
+        ("lotes paralelos", args.batch_size, args.parallel, False),
+        ("carga masiva", args.batch_size, args.parallel, True),
+    ]
+
+    transport = "memoria" if args.memory else ("gRPC" if args.grpc else "HTTP")
+    print(f"Puntos: {args.points}  dimensión: {args.dim}  transporte: {transport}")
+    print(f"{'modo':<18}{'inserción (s)':>15}{'con índice (s)':>16}{'puntos/s':>12}")
+    for name, batch_size, parallel, bulk in modes:
+        upsert_elapsed, total_elapsed = run(
+            client, points, args.dim, batch_size, parallel, bulk, args.indexing_threshold
+        )
+        print(f"{name:<18}{upsert_elapsed:>15.2f}{total_elapsed:>16.2f}{args.points / total_elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
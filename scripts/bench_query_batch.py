@@ -0,0 +1,96 @@
+"""
+Benchmark de /query/batch frente a llamadas secuenciales a /query.
+
+Envía las mismas `--queries` consultas a un servidor de la API en marcha de
+dos formas y mide el tiempo total:
+
+- secuencial: una petición /query por consulta, una detrás de otra (como
+  los trabajos de evaluación actuales)
+- lotes: peticiones /query/batch de `--batch-size` consultas (embeddings y
+  búsquedas por lotes, LLM con QUERY_BATCH_LLM_CONCURRENCY llamadas
+  simultáneas)
+
+Conviene desactivar la caché semántica en el servidor
+(SEMANTIC_CACHE_ENABLED=false) para que la segunda pasada no reutilice las
+respuestas de la primera. Las consultas salen de un JSON con una lista de
+textos o, sin --queries-file, se generan combinando palabras al azar.
+
+Uso:
+    python scripts/bench_query_batch.py --url http://localhost:8000 --queries 1000
+    python scripts/bench_query_batch.py --queries-file consultas.json --batch-size 250 --skip-sequential
+"""
+
+import argparse
+import json
+import random
+import time
+
+import requests
+
+WORDS = ("agua potable saneamiento rural calidad informe anual presupuesto municipal "
+         "educación salud pública energía renovable transporte vivienda empleo").split()
+
+
+def sample_queries(count: int, seed: int):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(3, 8))) for _ in range(count)]
+
+
+def run_sequential(session, url, queries, limit):
+    errors = 0
+    start = time.perf_counter()
+    for query in queries:
+        response = session.post(f"{url}/query", json={"query": query, "limit": limit, "include_documents": False})
+        errors += response.status_code != 200
+    return time.perf_counter() - start, errors
+
+
+def run_batches(session, url, queries, limit, batch_size):
+    errors = 0
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        response = session.post(f"{url}/query/batch", json={
+            "queries": queries[offset:offset + batch_size], "limit": limit, "include_documents": False
+        })
+        if response.status_code != 200:
+            errors += len(queries[offset:offset + batch_size])
+            continue
+        errors += sum(result["error"] is not None for result in response.json()["results"])
+    return time.perf_counter() - start, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--queries-file", default=None)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Consultas por petición /query/batch")
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--skip-sequential", action="store_true", help="Medir solo /query/batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.queries_file:
+        with open(args.queries_file, encoding="utf-8") as queries_file:
+            queries = json.load(queries_file)[:args.queries]
+    else:
+        queries = sample_queries(args.queries, args.seed)
+
+    session = requests.Session()
+    print(f"Consultas: {len(queries)}  lote: {args.batch_size}  límite: {args.limit}")
+    print(f"{'modo':<12}{'total (s)':>11}{'ms/consulta':>13}{'errores':>9}")
+
+    sequential = None
+    if not args.skip_sequential:
+        sequential, errors = run_sequential(session, args.url, queries, args.limit)
+        print(f"{'secuencial':<12}{sequential:>11.2f}{sequential / len(queries) * 1000:>13.1f}{errors:>9}")
+
+    batched, errors = run_batches(session, args.url, queries, args.limit, args.batch_size)
+    print(f"{'lotes':<12}{batched:>11.2f}{batched / len(queries) * 1000:>13.1f}{errors:>9}")
+
+    if sequential:
+        print(f"Aceleración: {sequential / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
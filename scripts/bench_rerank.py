@@ -0,0 +1,123 @@
+"""
+Benchmark de la reordenación con cross-encoder: tamaño del prompt frente a
+calidad del contexto.
+
+Sin reordenación se envían al LLM los `--baseline-limit` primeros documentos
+de la búsqueda vectorial. Con reordenación se recuperan `--factor` veces más
+candidatos y el cross-encoder se queda con los `n` mejores, para n = 1..límite.
+Como medida de calidad se usa la tasa de acierto: la fracción de consultas
+cuyo documento relevante llega al prompt. Se informa del menor n que iguala
+la tasa de acierto sin reordenación y de la reducción de tokens del prompt.
+
+Usa el servicio configurado (embeddings de OpenAI y el backend de
+CONTEXT_BACKEND, con la colección ya indexada) y el modelo RERANK_MODEL.
+Las consultas salen de un JSON con [{"query": ..., "relevant": [ids]}] o,
+sin --queries-file, del resumen (o título) de documentos al azar.
+
+Uso:
+    python scripts/bench_rerank.py --queries 100 --baseline-limit 5 --factor 4
+    python scripts/bench_rerank.py --queries-file consultas.json --model cross-encoder/ms-marco-MiniLM-L-6-v2
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService, build_llm_messages
+from src.utils.reranker import Reranker
+from src.utils.tokens import estimate_tokens
+
+
+def prompt_tokens(query, documents):
+    return sum(estimate_tokens(message["content"]) for message in build_llm_messages(query, documents))
+
+
+def sample_queries(service, count, seed):
+    """Consultas a partir del resumen (o título) de documentos al azar"""
+    doc_ids = service.context.list_document_ids()
+    random.Random(seed).shuffle(doc_ids)
+    queries = []
+    for doc in service.context.get_documents(doc_ids[:count], ["title", "summary"]):
+        text = (doc.get("summary") or doc.get("title") or "").split(".")[0]
+        if text:
+            queries.append({"query": text[:300], "relevant": [doc["id"]]})
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--queries-file", default=None)
+    parser.add_argument("--baseline-limit", type=int, default=5)
+    parser.add_argument("--factor", type=int, default=4, help="Candidatos por documento enviado")
+    parser.add_argument("--model", default=None, help="Cross-encoder (por defecto RERANK_MODEL)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = load_config()
+    config["RERANK_ENABLED"] = False
+    config["SEMANTIC_CACHE_ENABLED"] = False
+    service = MCPRagService(config)
+    reranker = Reranker(args.model or config["RERANK_MODEL"], budget_ms=None, cache_size=0)
+    reranker.warm_up()
+
+    if args.queries_file:
+        with open(args.queries_file, encoding="utf-8") as queries_file:
+            queries = json.load(queries_file)[:args.queries]
+    else:
+        queries = sample_queries(service, args.queries, args.seed)
+
+    limits = range(1, args.baseline_limit + 1)
+    baseline_hits, baseline_tokens = [], []
+    hits = {n: [] for n in limits}
+    tokens = {n: [] for n in limits}
+    rerank_latencies = []
+
+    for item in queries:
+        query, relevant = item["query"], {str(doc_id) for doc_id in item["relevant"]}
+        query_vector = service.model.create_embedding(query)
+        candidates = service.context.retrieve_documents(
+            query_vector, args.baseline_limit * args.factor, query_text=query
+        )
+
+        baseline = candidates[:args.baseline_limit]
+        baseline_hits.append(any(doc["id"] in relevant for doc in baseline))
+        baseline_tokens.append(prompt_tokens(query, baseline))
+
+        start = time.perf_counter()
+        ranked = reranker.rerank(query, [dict(doc) for doc in candidates], args.baseline_limit)
+        rerank_latencies.append(time.perf_counter() - start)
+
+        for n in limits:
+            hits[n].append(any(doc["id"] in relevant for doc in ranked[:n]))
+            tokens[n].append(prompt_tokens(query, ranked[:n]))
+
+    baseline_rate = statistics.mean(baseline_hits)
+    baseline_mean = statistics.mean(baseline_tokens)
+    print(f"Consultas: {len(queries)}  candidatos: {args.baseline_limit * args.factor}  "
+          f"reordenación p50: {statistics.median(rerank_latencies) * 1000:.1f} ms")
+    print(f"{'contexto':<22}{'acierto':>9}{'tokens prompt':>15}")
+    print(f"{f'vectorial top-{args.baseline_limit}':<22}{baseline_rate:>9.3f}{baseline_mean:>15.0f}")
+    for n in limits:
+        print(f"{f'reordenado top-{n}':<22}{statistics.mean(hits[n]):>9.3f}{statistics.mean(tokens[n]):>15.0f}")
+
+    equal = [n for n in limits if statistics.mean(hits[n]) >= baseline_rate]
+    if equal:
+        n = equal[0]
+        print(f"Con igual acierto: top-{n} reordenado, "
+              f"{(1 - statistics.mean(tokens[n]) / baseline_mean) * 100:.0f}% menos tokens de prompt")
+    else:
+        print("Ningún tamaño reordenado iguala el acierto sin reordenación")
+
+
+if __name__ == "__main__":
+    main()
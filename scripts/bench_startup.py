@@ -0,0 +1,109 @@
+"""
+Benchmark del arranque del servicio: tiempo de importación y tiempo hasta
+la primera consulta.
+
+Cada medida se hace en un proceso nuevo:
+
+- importación: `import src.api` (y con --pipeline, `import rag_pipeline`)
+- servidor: se lanza uvicorn con la API y se mide el tiempo hasta que el
+  puerto responde (/health) y hasta la primera respuesta 200 de /query
+
+Para comparar antes y después del arranque diferido, ejecutar el script
+sobre otra copia del repositorio con --repo, por ejemplo un worktree de una
+versión anterior:
+
+    git worktree add /tmp/rag-antes <commit>
+    python scripts/bench_startup.py --repo /tmp/rag-antes
+
+Usa la configuración de .env / entorno del repositorio medido (Qdrant y el
+servicio de embeddings deben estar disponibles para la consulta).
+
+Uso:
+    python scripts/bench_startup.py --runs 3
+    python scripts/bench_startup.py --repo /tmp/rag-antes --pipeline --port 8011
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+project_root = Path(__file__).parent.parent
+
+
+def import_seconds(repo: Path, module: str) -> float:
+    """Tiempo de importar `module` en un intérprete nuevo"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=repo, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def server_seconds(repo: Path, port: int, query: str, timeout: float):
+    """Lanzar la API y medir el tiempo hasta /health y hasta la primera consulta respondida"""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=repo, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ)
+    )
+    health = first_query = None
+    try:
+        while time.perf_counter() - start < timeout and first_query is None:
+            try:
+                if health is None and requests.get(f"{url}/health", timeout=1).status_code == 200:
+                    health = time.perf_counter() - start
+                if health is not None:
+                    response = requests.post(f"{url}/query", json={"query": query, "limit": 1}, timeout=60)
+                    if response.status_code == 200:
+                        first_query = time.perf_counter() - start
+            except requests.ConnectionError:
+                pass
+            if first_query is None:
+                time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait()
+    return health, first_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repo", default=str(project_root), help="Copia del repositorio a medir")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--query", default="informe anual")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--pipeline", action="store_true", help="Medir también la importación de rag_pipeline")
+    args = parser.parse_args()
+
+    repo = Path(args.repo).resolve()
+    modules = ["src.api"] + (["rag_pipeline"] if args.pipeline else [])
+
+    print(f"Repositorio: {repo}  ejecuciones: {args.runs}")
+    for module in modules:
+        times = [import_seconds(repo, module) for _ in range(args.runs)]
+        print(f"import {module:<22}{statistics.median(times):>8.2f} s (mediana)")
+
+    health_times, query_times = [], []
+    for _ in range(args.runs):
+        health, first_query = server_seconds(repo, args.port, args.query, args.timeout)
+        if health is not None:
+            health_times.append(health)
+        if first_query is not None:
+            query_times.append(first_query)
+
+    if health_times:
+        print(f"{'hasta /health':<29}{statistics.median(health_times):>8.2f} s (mediana)")
+    if query_times:
+        print(f"{'hasta la primera consulta':<29}{statistics.median(query_times):>8.2f} s (mediana)")
+    else:
+        print("Ninguna consulta respondió dentro del tiempo límite")
+
+
+if __name__ == "__main__":
+    main()
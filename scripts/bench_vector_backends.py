@@ -0,0 +1,143 @@
+"""
+Benchmark de backends del índice vectorial: NumpyVectorIndex en proceso
+frente a Qdrant, con 10k/100k/1M vectores.
+
+Para cada tamaño mide la carga, la latencia p50/p99 de una búsqueda top-k y
+el recall@k de Qdrant (HNSW) respecto a la búsqueda exacta del índice NumPy.
+La latencia de Qdrant incluye el viaje de red, que es lo que se ahorra el
+backend en proceso.
+
+Necesita una instancia de Qdrant (por defecto localhost:6333). Con --memory
+se usa Qdrant en memoria (sin HNSW y muy lento con muchos vectores: solo
+para comprobar el script con tamaños pequeños). Con --skip-qdrant solo se
+mide el índice NumPy.
+
+Uso:
+    python scripts/bench_vector_backends.py --sizes 10000 100000 1000000 --dim 384
+    python scripts/bench_vector_backends.py --sizes 10000 --memory
+    python scripts/bench_vector_backends.py --sizes 1000000 --skip-qdrant --mmap /tmp/numpy_index
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.vector_index import NumpyVectorIndex
+from src.utils.qdrant_io import upsert_points
+
+COLLECTION_NAME = "bench_vector_backends"
+
+
+def build_vectors(count: int, dim: int, queries: int, rng):
+    """Vectores agrupados en torno a centros, y consultas cercanas a ellos"""
+    centers = rng.standard_normal((max(1, count // 100), dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)]
+    vectors += rng.normal(0, 0.5, (count, dim)).astype(np.float32)
+    targets = centers[rng.integers(0, len(centers), queries)]
+    targets += rng.normal(0, 0.5, (queries, dim)).astype(np.float32)
+    return vectors, targets
+
+
+def percentiles(latencies):
+    return tuple(float(np.percentile(latencies, q)) * 1000 for q in (50, 99))
+
+
+def bench_numpy(vectors, queries, k, path):
+    payloads = [{"parent_id": str(i), "chunk_index": 0} for i in range(len(vectors))]
+    index = NumpyVectorIndex(vectors.shape[1], path=path)
+
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), 10000):
+        batch = slice(offset, offset + 10000)
+        index.upsert(list(range(offset + 1, offset + 1 + len(vectors[batch]))), vectors[batch], payloads[batch])
+    index.flush()
+    load_seconds = time.perf_counter() - start
+
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append([point_id for point_id, _, _ in index.search(query, k)])
+        latencies.append(time.perf_counter() - start)
+    return load_seconds, latencies, results
+
+
+def bench_qdrant(client, vectors, queries, k):
+    if client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+    client.create_collection(
+        collection_name=COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=vectors.shape[1], distance=models.Distance.COSINE)
+    )
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), 10000):
+            points = [
+                models.PointStruct(id=offset + i + 1, vector=vector.tolist(),
+                                   payload={"parent_id": str(offset + i), "chunk_index": 0})
+                for i, vector in enumerate(vectors[offset:offset + 10000])
+            ]
+            upsert_points(client, COLLECTION_NAME, points, batch_size=256, parallel=4)
+        # Incluir la construcción del índice HNSW
+        while client.get_collection(COLLECTION_NAME).status != models.CollectionStatus.GREEN:
+            time.sleep(0.5)
+        load_seconds = time.perf_counter() - start
+
+        results, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            points = client.query_points(COLLECTION_NAME, query=query.tolist(), limit=k, with_payload=False).points
+            latencies.append(time.perf_counter() - start)
+            results.append([point.id for point in points])
+        return load_seconds, latencies, results
+    finally:
+        client.delete_collection(COLLECTION_NAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--memory", action="store_true", help="Usar Qdrant en memoria")
+    parser.add_argument("--skip-qdrant", action="store_true", help="Medir solo el índice NumPy")
+    parser.add_argument("--mmap", default=None, help="Directorio para el índice NumPy mapeado en disco")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    client = None
+    if not args.skip_qdrant:
+        client = QdrantClient(":memory:") if args.memory else QdrantClient(host=args.host, port=args.port)
+
+    print(f"Dimensión: {args.dim}  consultas: {args.queries}  k: {args.k}")
+    print(f"{'vectores':>10}  {'backend':<8}{'carga (s)':>11}{'p50 (ms)':>11}{'p99 (ms)':>11}{'recall@k':>10}")
+    for size in args.sizes:
+        rng = np.random.default_rng(size)
+        vectors, queries = build_vectors(size, args.dim, args.queries, rng)
+
+        if args.mmap:
+            shutil.rmtree(args.mmap, ignore_errors=True)
+        load_seconds, latencies, exact = bench_numpy(vectors, queries, args.k, args.mmap)
+        p50, p99 = percentiles(latencies)
+        print(f"{size:>10}  {'numpy':<8}{load_seconds:>11.2f}{p50:>11.2f}{p99:>11.2f}{1.0:>10.3f}")
+
+        if client is not None:
+            load_seconds, latencies, found = bench_qdrant(client, vectors, queries, args.k)
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(exact, found)])
+            p50, p99 = percentiles(latencies)
+            print(f"{size:>10}  {'qdrant':<8}{load_seconds:>11.2f}{p50:>11.2f}{p99:>11.2f}{recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,188 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import json
 import os
+import time
 
-from mcp_architecture import MCPRagService
+from src.mcp_architecture import MCPRagService, AsyncMCPRagService
+from src.utils.embedding_providers import LocalEmbeddingProvider
+from src.utils.index_jobs import IndexJobManager
 
-# Inicialización del servicio
-rag_service = MCPRagService()
+# Servicios: el síncrono crea la colección e indexa (en los trabajos de
+# indexación, ver index_jobs); el asíncrono atiende las consultas. Con el backend en proceso
+# (CONTEXT_BACKEND=numpy) ambos comparten el mismo índice. Se crean al
+# arrancar la aplicación, no al importar el módulo (ver lifespan)
+rag_service: Optional[MCPRagService] = None
+async_rag_service: Optional[AsyncMCPRagService] = None
+
+# Trabajos de indexación (/index/*): cola persistente con su propio pool de hilos
+index_jobs: Optional[IndexJobManager] = None
+
+# Estado del arranque que informa /ready
+startup_state: Dict[str, Any] = {"ready": False, "error": None, "timings": {}}
+
+def _create_services() -> None:
+    """
+    Crear los servicios (conecta con Qdrant y prepara la colección) y
+    arrancar el pool de trabajos de indexación, que reanuda los pendientes
+    """
+    global rag_service, async_rag_service, index_jobs
+    rag_service = MCPRagService()
+    # El modelo de embeddings local se comparte; con la API remota, el servicio
+    # asíncrono crea su proveedor con el cliente asíncrono
+    embedding_provider = rag_service.model.embedding_provider
+    async_rag_service = AsyncMCPRagService(
+        rag_service.config,
+        answer_cache=rag_service.answer_cache,
+        reranker=rag_service.reranker,
+        context=rag_service.context if rag_service.qdrant_client is None else None,
+        embedding_provider=embedding_provider if isinstance(embedding_provider, LocalEmbeddingProvider) else None
+    )
+    index_jobs = IndexJobManager.from_config(rag_service.config, rag_service.run_index_job).start()
+
+async def _start_services() -> None:
+    """Crear los servicios y calentarlos; /ready responde 200 al terminar"""
+    start = time.perf_counter()
+    try:
+        await run_in_threadpool(_create_services)
+        startup_state["timings"]["services_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        startup_state["timings"].update(await async_rag_service.warm_up())
+        startup_state["timings"]["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        startup_state["ready"] = True
+    except Exception as e:
+        print(f"Error al iniciar los servicios: {e}")
+        startup_state["error"] = str(e)
+
+def require_ready() -> None:
+    """Dependencia de los endpoints que usan los servicios: 503 hasta que estén listos"""
+    if not startup_state["ready"]:
+        raise HTTPException(status_code=503, detail=startup_state["error"] or "El servicio se está iniciando")
 
 # Modelos Pydantic para validación
 class QueryRequest(BaseModel):
     query: str
     limit: int = 3
     include_documents: bool = True
+    # Ajustes de búsqueda por petición (sustituyen a los del perfil de la colección)
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    limit: int = 3
+    include_documents: bool = True
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
 
 class IndexFileRequest(BaseModel):
     file_path: str
+    # Eliminar los documentos almacenados que no estén en el archivo
+    delete_missing: bool = False
 
 class IndexApiRequest(BaseModel):
     limit: int = 100
+    # Eliminar los documentos almacenados que no estén entre las `limit` publicaciones
+    delete_missing: bool = False
 
 class Document(BaseModel):
     id: str
     title: str
     summary: Optional[str] = None
+    # Similitud coseno; con HYBRID_SEARCH_ENABLED, puntuación RRF de la fusión
     score: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
+    # Posición en la búsqueda densa y en la BM25 (búsqueda híbrida)
+    sources: Optional[Dict[str, Optional[int]]] = None
+    # Puntuación del cross-encoder (con reordenación)
+    rerank_score: Optional[float] = None
+
+class DocumentDetail(BaseModel):
+    id: str
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    body: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 class QueryResponse(BaseModel):
     query: str
     answer: str
     documents: Optional[List[Document]] = None
+    cached: bool = False
+
+class BatchQueryItem(BaseModel):
+    query: str
+    answer: Optional[str] = None
+    documents: Optional[List[Document]] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryItem]
 
 class StatusResponse(BaseModel):
     status: str
     details: Optional[str] = None
 
+class IndexJobSubmitted(StatusResponse):
+    job_id: str
+
+class IndexJobProgress(BaseModel):
+    docs_seen: int = 0
+    docs_embedded: int = 0
+    docs_upserted: int = 0
+    docs_added: int = 0
+    docs_updated: int = 0
+    docs_unchanged: int = 0
+    docs_deleted: int = 0
+    total: Optional[int] = None
+    checkpoint_batches: int = 0
+    elapsed_seconds: Optional[float] = None
+    rate_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+class IndexJob(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    progress: IndexJobProgress
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la aplicación: los servicios se crean y calientan en
+    segundo plano para que el puerto quede abierto enseguida (/health
+    responde desde el principio y /ready cuando terminan); al parar se
+    cierran los clientes asíncronos.
+    """
+    startup_state.update({"ready": False, "error": None, "timings": {}})
+    startup = asyncio.create_task(_start_services())
+    yield
+    if not startup.done():
+        startup.cancel()
+    if index_jobs is not None:
+        # Los trabajos en curso se detienen en el siguiente lote y continúan al volver a arrancar
+        await run_in_threadpool(index_jobs.stop, 30.0)
+    if async_rag_service is not None:
+        await async_rag_service.close()
+
 # Aplicación FastAPI
 app = FastAPI(
     title="MCP-RAG API Service",
     description="API para el servicio RAG basado en Model-Context-Protocol",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para permitir acceso desde frontend
@@ -56,7 +195,7 @@ app.add_middleware(
 )
 
 # Endpoints
-@app.post("/query", response_model=QueryResponse)
+@app.post("/query", response_model=QueryResponse, dependencies=[Depends(require_ready)])
 async def query(request: QueryRequest):
     """
     Realiza una consulta RAG y devuelve la respuesta generada.
@@ -66,7 +205,9 @@ async def query(request: QueryRequest):
     - **include_documents**: Si se incluyen los documentos en la respuesta (default: true)
     """
     try:
-        result = rag_service.query(request.query, request.limit)
+        result = await async_rag_service.query(
+            request.query, request.limit, hnsw_ef=request.hnsw_ef, exact=request.exact
+        )
         
         # Si no se solicitan documentos, no los incluimos en la respuesta
         if not request.include_documents:
@@ -76,57 +217,237 @@ async def query(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en la consulta: {str(e)}")
 
-@app.post("/index/file", response_model=StatusResponse)
-async def index_file(request: IndexFileRequest, background_tasks: BackgroundTasks):
+@app.post("/query/batch", response_model=BatchQueryResponse, dependencies=[Depends(require_ready)])
+async def query_batch(request: BatchQueryRequest):
+    """
+    Realiza varias consultas RAG en una sola petición: los embeddings y las
+    búsquedas se hacen por lotes y las llamadas al LLM en paralelo (con
+    concurrencia limitada). Devuelve un resultado por consulta, en el mismo
+    orden; si falla una consulta, su resultado incluye el error.
+    
+    - **queries**: Lista de consultas (máximo QUERY_BATCH_MAX_SIZE)
+    - **limit**: Número máximo de documentos a recuperar por consulta (default: 3)
+    - **include_documents**: Si se incluyen los documentos en la respuesta (default: true)
     """
-    Indexa publicaciones desde un archivo local.
+    max_size = rag_service.config["QUERY_BATCH_MAX_SIZE"]
+    if len(request.queries) > max_size:
+        raise HTTPException(status_code=400, detail=f"Demasiadas consultas: máximo {max_size} por petición")
+    
+    try:
+        # Operación bloqueante (lotes y grupo de hilos propio): se ejecuta en un hilo
+        results = await run_in_threadpool(
+            rag_service.query_batch, request.queries, request.limit,
+            hnsw_ef=request.hnsw_ef, exact=request.exact
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en la consulta: {str(e)}")
+    
+    if not request.include_documents:
+        for result in results:
+            result["documents"] = []
+    return {"results": results}
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Formatear un evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/query/stream", dependencies=[Depends(require_ready)])
+async def query_stream(request: QueryRequest):
+    """
+    Realiza una consulta RAG y envía el resultado como Server-Sent Events:
+    
+    - **documents**: documentos recuperados (primer evento)
+    - **token**: fragmentos de la respuesta según los genera el LLM
+    - **error**: error al vectorizar, buscar o generar la respuesta, si lo hay
+    - **done**: tiempos de cada fase en milisegundos (último evento)
+    """
+    async def events():
+        try:
+            async for item in async_rag_service.query_stream(
+                request.query, request.limit, hnsw_ef=request.hnsw_ef, exact=request.exact
+            ):
+                data = item["data"]
+                if item["event"] == "documents":
+                    # Mismos campos que en /query
+                    documents = data["documents"] if request.include_documents else []
+                    data = {
+                        "query": data["query"],
+                        "documents": [Document(**doc).model_dump() for doc in documents]
+                    }
+                yield _sse_event(item["event"], data)
+        except Exception as e:
+            # La respuesta ya empezó con 200: el error se comunica como evento
+            print(f"Error en la consulta en streaming: {e}")
+            yield _sse_event("error", {"detail": f"Error al procesar la consulta: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/documents/{doc_id}", response_model=DocumentDetail, response_model_exclude_none=True,
+         dependencies=[Depends(require_ready)])
+async def get_document(doc_id: str, fields: Optional[str] = None):
+    """
+    Carga un documento completo bajo demanda (las búsquedas no devuelven el cuerpo).
+    
+    - **doc_id**: ID del documento
+    - **fields**: campos a devolver separados por comas (default: title,summary,body,metadata)
+    """
+    # El ID siempre se devuelve
+    selected = [field.strip() for field in (fields or "").split(",") if field.strip() and field.strip() != "id"]
+    unknown = set(selected) - set(DocumentDetail.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    
+    try:
+        document = await async_rag_service.get_document(doc_id, selected or None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al recuperar el documento: {str(e)}")
+    
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Documento no encontrado: {doc_id}")
+    return document
+
+@app.post("/index/file", response_model=IndexJobSubmitted, dependencies=[Depends(require_ready)])
+async def index_file(request: IndexFileRequest):
+    """
+    Indexa publicaciones desde un archivo local en un trabajo de indexación
+    (ver /index/jobs/{job_id}).
+    
+    Solo se vectorizan los documentos nuevos o con otra revisión.
     
     - **file_path**: Ruta al archivo JSON con los datos
+    - **delete_missing**: Eliminar los documentos que ya no están en el archivo (default: false)
     """
     if not os.path.exists(request.file_path):
         raise HTTPException(status_code=404, detail=f"Archivo no encontrado: {request.file_path}")
     
     try:
-        # Ejecutar la indexación en segundo plano para no bloquear la respuesta
-        background_tasks.add_task(rag_service.index_publication_from_file, request.file_path)
-        return {"status": "success", "details": f"Indexación de {request.file_path} iniciada en segundo plano"}
+        # Ruta absoluta y tamaño de lote fijos: el trabajo puede reanudarse tras un reinicio
+        job = index_jobs.submit("file", {
+            "file_path": os.path.abspath(request.file_path),
+            "batch_size": rag_service.config["INDEX_BATCH_SIZE"],
+            "delete_missing": request.delete_missing
+        })
+        return {"status": "success", "job_id": job["id"],
+                "details": f"Indexación de {request.file_path} encolada como trabajo {job['id']}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al indexar archivo: {str(e)}")
 
-@app.post("/index/api", response_model=StatusResponse)
-async def index_api(request: IndexApiRequest, background_tasks: BackgroundTasks):
+@app.post("/index/api", response_model=IndexJobSubmitted, dependencies=[Depends(require_ready)])
+async def index_api(request: IndexApiRequest):
     """
-    Indexa publicaciones desde la API configurada.
+    Indexa publicaciones desde la API configurada en un trabajo de
+    indexación (ver /index/jobs/{job_id}).
+    
+    Solo se vectorizan los documentos nuevos o con otra revisión.
     
     - **limit**: Número máximo de publicaciones a indexar (default: 100)
+    - **delete_missing**: Eliminar los documentos que no están entre esas publicaciones (default: false)
     """
     try:
-        # Ejecutar la indexación en segundo plano
-        background_tasks.add_task(rag_service.index_publications_from_api, request.limit)
-        return {"status": "success", "details": f"Indexación de {request.limit} publicaciones iniciada en segundo plano"}
+        job = index_jobs.submit("api", {"limit": request.limit, "delete_missing": request.delete_missing})
+        return {"status": "success", "job_id": job["id"],
+                "details": f"Indexación de {request.limit} publicaciones encolada como trabajo {job['id']}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al indexar desde API: {str(e)}")
 
-@app.post("/reset", response_model=StatusResponse)
+@app.get("/index/jobs", response_model=List[IndexJob], dependencies=[Depends(require_ready)])
+async def list_index_jobs(limit: int = 20):
+    """Trabajos de indexación más recientes"""
+    return await run_in_threadpool(index_jobs.list, limit)
+
+@app.get("/index/jobs/{job_id}", response_model=IndexJob, dependencies=[Depends(require_ready)])
+async def get_index_job(job_id: str):
+    """
+    Estado y progreso de un trabajo de indexación: documentos leídos,
+    vectorizados y almacenados, lotes confirmados, ritmo y tiempo estimado.
+    """
+    job = await run_in_threadpool(index_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Trabajo no encontrado: {job_id}")
+    return job
+
+@app.post("/index/jobs/{job_id}/cancel", response_model=IndexJob, dependencies=[Depends(require_ready)])
+async def cancel_index_job(job_id: str):
+    """
+    Cancela un trabajo de indexación: si está en cola no se ejecuta y si
+    está en curso se detiene en el siguiente lote (lo ya almacenado se
+    conserva). Un trabajo terminado no cambia.
+    """
+    job = await run_in_threadpool(index_jobs.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Trabajo no encontrado: {job_id}")
+    return job
+
+@app.post("/reset", response_model=StatusResponse, dependencies=[Depends(require_ready)])
 async def reset_database():
     """
     Resetea la base de datos vectorial.
     """
     try:
-        success = rag_service.reset_database()
+        # Operación bloqueante: se ejecuta en un hilo para no detener otras peticiones
+        success = await run_in_threadpool(rag_service.reset_database)
         if not success:
             raise Exception("Error interno al resetear la base de datos")
         return {"status": "success", "details": "Base de datos reiniciada correctamente"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al resetear la base de datos: {str(e)}")
 
+@app.get("/metrics", dependencies=[Depends(require_ready)])
+async def metrics():
+    """
+    Métricas de las cachés del servicio (aciertos, tasa de aciertos,
+    latencia ahorrada, desalojos...), de la búsqueda híbrida (aportación
+    de cada búsqueda y latencia por fase), de la reordenación, del
+    contexto enviado al LLM (tokens usados frente al presupuesto), de la
+    agrupación de consultas idénticas en curso y de los micro-lotes de
+    embeddings.
+    """
+    result = {"hybrid_search": async_rag_service.context.hybrid_stats.stats()}
+    result["context"] = {
+        "token_budget": rag_service.config["CONTEXT_TOKEN_BUDGET"],
+        "sync": rag_service.model.context_stats.stats(),
+        "async": async_rag_service.model.context_stats.stats()
+    }
+    if async_rag_service.model.embedding_batcher is not None:
+        result["embedding_batching"] = async_rag_service.model.embedding_batcher.stats()
+    if async_rag_service.single_flight is not None:
+        result["coalescing"] = async_rag_service.single_flight.stats()
+    if rag_service.reranker is not None:
+        result["rerank"] = rag_service.reranker.stats()
+    if rag_service.answer_cache is not None:
+        result["semantic_cache"] = rag_service.answer_cache.stats()
+    if rag_service.model.embedding_cache is not None:
+        result["embedding_cache"] = rag_service.model.embedding_cache.stats()
+    return result
+
 @app.get("/health", response_model=StatusResponse)
 async def health_check():
     """
-    Endpoint para verificar el estado del servicio.
+    Endpoint para verificar que el proceso está vivo (responde aunque los
+    servicios sigan iniciándose).
     """
     return {"status": "ok"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Endpoint para verificar que el servicio puede atender consultas: 200
+    cuando los servicios están creados y calentados (con el tiempo de cada
+    paso del arranque), 503 mientras se inician o si el arranque falló.
+    """
+    if startup_state["ready"]:
+        return {"status": "ready", "timings": startup_state["timings"]}
+    
+    status = "error" if startup_state["error"] else "starting"
+    return JSONResponse(
+        status_code=503,
+        content={"status": status, "details": startup_state["error"], "timings": startup_state["timings"]}
+    )
+
 # Punto de entrada para ejecutar la aplicación
 if __name__ == "__main__":
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
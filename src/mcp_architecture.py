@@ -8,19 +8,244 @@ El MCP separa las responsabilidades en tres componentes:
 3. Protocol: Maneja la comunicación entre componentes y servicios externos
 """
 
+import os
 import json
+import time
+import uuid
+import asyncio
+import itertools
 import requests
-from typing import List, Dict, Any, Optional, Union
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Iterable, Iterator, AsyncIterator
 import numpy as np
-from openai import OpenAI
-from qdrant_client import QdrantClient
+from openai import OpenAI, AsyncOpenAI
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 
 from config import load_config
+from src.utils.tokens import token_batches, truncate_to_tokens
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.chunking import strip_html, split_into_windows, chunk_point_id
+from src.utils.json_stream import iter_json_records, iter_batches
+from src.utils.fetcher import PublicationFetcher, FetchError
+from src.utils.pipeline import StagedPipeline, Stage
+from src.utils.semantic_cache import SemanticCache
+from src.utils.collection_profiles import get_profile, collection_params, search_params
+from src.utils.sparse import (SPARSE_VECTOR_NAME, BM25Encoder, HybridSearchStats,
+                              sparse_vectors_config, reciprocal_rank_fusion)
+from src.utils.qdrant_io import create_qdrant_client, create_async_qdrant_client, upsert_points, bulk_load_mode
+from src.utils.vector_index import NumpyVectorIndex
+from src.utils.reranker import Reranker
+from src.utils.context_packer import pack_context, ContextPackingStats
+from src.utils.single_flight import SingleFlight, normalize_query
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.embedding_providers import EmbeddingProvider, create_embedding_provider, resolve_vector_size
+from src.utils.index_jobs import JobProgress
 
 # Cargar configuración
 config = load_config()
 
+# ========================
+# FUNCIONES COMPARTIDAS (síncrono y asíncrono)
+# ========================
+def build_llm_prompt(query: str,
+                     context_docs: List[Dict[str, Any]],
+                     token_budget: Optional[int] = None,
+                     window_words: Optional[int] = None) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    Construir los mensajes del LLM a partir de la consulta y los documentos
+    recuperados. El contexto se empaqueta dentro de `token_budget` tokens,
+    dividiendo los cuerpos sin fragmentos en ventanas de `window_words`
+    palabras (los componentes pasan CONTEXT_TOKEN_BUDGET y CHUNK_SIZE de su
+    configuración; sin ellos se usa la global). Devuelve también las
+    estadísticas del contexto.
+    """
+    context, context_stats = pack_context(
+        context_docs,
+        token_budget or config["CONTEXT_TOKEN_BUDGET"],
+        window_words=window_words or config["CHUNK_SIZE"]
+    )
+    
+    # Construir prompt para OpenAI
+    prompt = f"""Basándote en la siguiente información, responde a esta consulta de forma clara y concisa:
+
+Consulta: {query}
+
+{context}
+
+Respuesta:"""
+    
+    messages = [
+        {"role": "system", "content": "Eres un asistente especializado que responde preguntas basándose únicamente en la información proporcionada."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, context_stats
+
+
+def build_llm_messages(query: str,
+                       context_docs: List[Dict[str, Any]],
+                       token_budget: Optional[int] = None) -> List[Dict[str, str]]:
+    """Construir los mensajes del LLM a partir de la consulta y los documentos recuperados"""
+    return build_llm_prompt(query, context_docs, token_budget)[0]
+
+# Campos del payload que necesita la búsqueda; el cuerpo completo se carga aparte
+SEARCH_FIELDS = ["parent_id", "chunk_index", "text", "title", "summary", "metadata"]
+
+# Campos de un documento completo
+DOCUMENT_FIELDS = ["title", "summary", "body", "metadata"]
+
+def search_payload_fields(fields: Optional[List[str]] = None) -> List[str]:
+    """Campos pedidos en una búsqueda más los necesarios para agrupar fragmentos"""
+    fields = list(fields or SEARCH_FIELDS)
+    for key in ("parent_id", "chunk_index", "text"):
+        if key not in fields:
+            fields.append(key)
+    return fields
+
+def _legacy_point_id(doc_id: str) -> Optional[Union[int, str]]:
+    """ID de punto de un documento almacenado sin fragmentar (UUID o entero), si es válido"""
+    doc_id = str(doc_id)
+    if doc_id.isdigit():
+        return int(doc_id)
+    try:
+        return str(uuid.UUID(doc_id))
+    except ValueError:
+        return None
+
+def document_point_ids(doc_ids: List[str]) -> List[Union[int, str]]:
+    """
+    IDs de los puntos que guardan el documento completo: el primer fragmento
+    (ID determinista) o, en documentos sin fragmentar, el propio documento
+    """
+    point_ids = [chunk_point_id(str(doc_id), 0) for doc_id in doc_ids]
+    point_ids += [pid for pid in (_legacy_point_id(doc_id) for doc_id in doc_ids) if pid is not None]
+    return point_ids
+
+def points_to_documents(points, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Convertir los puntos recuperados en documentos, en el orden de `doc_ids`"""
+    defaults = {"title": "", "summary": "", "body": "", "metadata": {}}
+    found = {}
+    
+    for point in points:
+        payload = point.payload or {}
+        doc_id = str(payload.get("parent_id", point.id))
+        # Preferir el punto con formato actual si también queda uno antiguo
+        if doc_id in found and "parent_id" not in payload:
+            continue
+        doc = {"id": doc_id}
+        for field in fields or DOCUMENT_FIELDS:
+            doc[field] = payload.get(field, defaults.get(field))
+        found[doc_id] = doc
+    
+    return [found[str(doc_id)] for doc_id in doc_ids if str(doc_id) in found]
+
+def group_chunks(scored_points, limit: int, max_passages: int) -> List[Dict[str, Any]]:
+    """Agrupar fragmentos puntuados (ordenados por puntuación) en documentos"""
+    documents: Dict[str, Dict[str, Any]] = {}
+    
+    for scored_point in scored_points:
+        payload = scored_point.payload or {}
+        parent_id = payload.get("parent_id", scored_point.id)
+        
+        doc = documents.get(parent_id)
+        if doc is None:
+            if len(documents) >= limit:
+                continue
+            doc = {
+                "id": parent_id,
+                "score": scored_point.score,
+                "title": payload.get("title", ""),
+                "summary": payload.get("summary", ""),
+                "metadata": payload.get("metadata", {}),
+                "passages": []
+            }
+            # El cuerpo solo está si la búsqueda lo pidió
+            if "body" in payload:
+                doc["body"] = payload["body"]
+            documents[parent_id] = doc
+        
+        # Los puntos sin fragmentar no tienen pasaje propio
+        passage = payload.get("text")
+        if passage and len(doc["passages"]) < max_passages:
+            doc["passages"].append({
+                "text": passage,
+                "chunk_index": payload.get("chunk_index", 0),
+                "score": scored_point.score
+            })
+    
+    return list(documents.values())
+
+def has_sparse_vectors(collection_info) -> bool:
+    """Si la colección tiene el vector disperso de la búsqueda léxica"""
+    return SPARSE_VECTOR_NAME in (collection_info.config.params.sparse_vectors or {})
+
+def collection_vector_size(collection_info) -> Optional[int]:
+    """Dimensión del vector denso (sin nombre) de una colección existente"""
+    vectors = collection_info.config.params.vectors
+    if isinstance(vectors, dict):
+        vectors = vectors.get("")
+    return vectors.size if vectors is not None else None
+
+def check_collection_vector_size(collection_info, collection_name: str, vector_size: int) -> None:
+    """Lanzar ValueError si la colección se indexó con otra dimensión que la del modelo de embeddings"""
+    size = collection_vector_size(collection_info)
+    if size is not None and size != vector_size:
+        raise ValueError(f"La colección {collection_name} tiene vectores de dimensión {size} y el modelo "
+                         f"de embeddings produce {vector_size}: reindexar la colección o cambiar de modelo")
+
+def sparse_text(payload: Dict[str, Any]) -> str:
+    """Texto que se indexa para la búsqueda léxica de un punto"""
+    parts = [payload.get("title", "")]
+    if payload.get("chunk_index", 0) == 0:
+        parts.append(payload.get("summary", ""))
+    # Los puntos sin fragmentar no tienen texto propio: se usa el cuerpo
+    parts.append(payload.get("text") or strip_html(payload.get("body", "")))
+    return " ".join(part for part in parts if part)
+
+def hybrid_search_requests(query_vector: List[float],
+                           sparse_vector: Optional[models.SparseVector],
+                           limit: int,
+                           fields: Optional[List[str]],
+                           params: Optional[models.SearchParams]) -> List[models.QueryRequest]:
+    """Peticiones densa y (si hay términos) dispersa para query_batch_points"""
+    requests = [models.QueryRequest(
+        query=query_vector,
+        limit=limit,
+        with_payload=search_payload_fields(fields),
+        params=params
+    )]
+    if sparse_vector is not None and sparse_vector.indices:
+        requests.append(models.QueryRequest(
+            query=sparse_vector,
+            using=SPARSE_VECTOR_NAME,
+            limit=limit,
+            with_payload=search_payload_fields(fields)
+        ))
+    return requests
+
+def fuse_search_results(dense_points, sparse_points, limit: int, max_passages: int,
+                        rrf_k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Fusionar los fragmentos de ambas búsquedas con RRF y agruparlos por
+    documento. Cada documento indica en `sources` la mejor posición de sus
+    fragmentos en cada búsqueda (None si esa búsqueda no lo encontró).
+    """
+    fused = reciprocal_rank_fusion({"dense": dense_points, "sparse": sparse_points}, k=rrf_k)
+    documents = group_chunks([entry["point"] for entry in fused], limit, max_passages)
+    
+    sources: Dict[str, Dict[str, Optional[int]]] = {}
+    for entry in fused:
+        parent_id = (entry["point"].payload or {}).get("parent_id", entry["point"].id)
+        doc_sources = sources.setdefault(parent_id, {"dense": None, "sparse": None})
+        for source, rank in entry["ranks"].items():
+            if doc_sources[source] is None or rank < doc_sources[source]:
+                doc_sources[source] = rank
+    for doc in documents:
+        doc["sources"] = sources[doc["id"]]
+    
+    return documents
+
 # ========================
 # COMPONENT: MODEL
 # ========================
@@ -30,27 +255,94 @@ class ModelComponent:
     como generación de embeddings y respuestas del LLM
     """
     
-    def __init__(self, openai_client, config):
+    def __init__(self, openai_client, config, embedding_provider: Optional[EmbeddingProvider] = None):
         self.openai_client = openai_client
         self.config = config
+        self.context_stats = ContextPackingStats()
+        
+        # Proveedor de embeddings (EMBEDDING_PROVIDER): modelo local o API remota
+        self.embedding_provider = embedding_provider or create_embedding_provider(
+            self.config, openai_client=openai_client
+        )
+        self.vector_size = resolve_vector_size(self.embedding_provider, self.config.get("VECTOR_SIZE"))
+        
+        # Caché persistente de embeddings (opcional)
+        self.embedding_cache = None
+        if self.config.get("EMBEDDING_CACHE_PATH"):
+            self.embedding_cache = EmbeddingCache(
+                self.config["EMBEDDING_CACHE_PATH"],
+                model_name=self.embedding_provider.model_id,
+                vector_size=self.vector_size,
+                max_entries=self.config["EMBEDDING_CACHE_MAX_ENTRIES"]
+            )
     
     def create_embedding(self, text: str) -> List[float]:
         """Crear un embedding para el texto usando el modelo configurado"""
         if not text.strip():
-            return np.zeros(self.config["VECTOR_SIZE"]).tolist()
+            return np.zeros(self.vector_size).tolist()
             
         try:
-            response = self.openai_client.embeddings.create(
-                input=text,
-                model=self.config["EMBEDDING_MODEL"]
-            )
-            return response.data[0].embedding
+            return self.embedding_provider.embed([text])[0]
         except Exception as e:
             print(f"Error generando embedding: {e}")
-            return np.zeros(self.config["VECTOR_SIZE"]).tolist()
+            return np.zeros(self.vector_size).tolist()
     
-    def create_document_embedding(self, document: Dict[str, Any]) -> List[float]:
-        """Crear embedding para un documento completo"""
+    def create_embeddings(self, texts: List[str], fill_failed: bool = True) -> List[Optional[List[float]]]:
+        """
+        Crear embeddings para varios textos en el menor número de peticiones.
+        Los textos se agrupan en lotes limitados por número de elementos y
+        por tokens estimados; el resultado conserva el orden de entrada.
+        Los textos vacíos o que no se pudieron vectorizar reciben un vector
+        de ceros, o None si `fill_failed` es False.
+        """
+        zero_vector = np.zeros(self.vector_size).tolist()
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        
+        # Los textos vacíos no se envían al modelo
+        pending = [i for i, text in enumerate(texts) if text.strip()]
+        
+        # Consultar la caché en bloque y pedir al modelo solo los fallos
+        if self.embedding_cache is not None and pending:
+            cached = self.embedding_cache.get_many([texts[i] for i in pending])
+            for i, vector in zip(pending, cached):
+                embeddings[i] = vector
+            pending = [i for i in pending if embeddings[i] is None]
+        
+        computed = self._request_embeddings([(i, texts[i]) for i in pending])
+        for i, vector in computed.items():
+            embeddings[i] = vector
+        
+        # Solo se guardan los embeddings calculados con éxito
+        if self.embedding_cache is not None and computed:
+            self.embedding_cache.put_many([texts[i] for i in computed], list(computed.values()))
+        
+        if not fill_failed:
+            return embeddings
+        return [embedding if embedding is not None else zero_vector for embedding in embeddings]
+    
+    def _request_embeddings(self, items: List[tuple]) -> Dict[int, List[float]]:
+        """
+        Pedir al modelo los embeddings de pares (índice, texto) en lotes
+        limitados por tokens. Devuelve solo los que se calcularon con éxito.
+        """
+        max_batch_tokens = self.config["EMBEDDING_BATCH_MAX_TOKENS"]
+        max_input_tokens = min(self.config["EMBEDDING_MAX_INPUT_TOKENS"], max_batch_tokens)
+        
+        items = [(i, truncate_to_tokens(text, max_input_tokens)) for i, text in items]
+        results = {}
+        
+        for batch in token_batches(items, max_batch_tokens, self.config["EMBEDDING_BATCH_SIZE"]):
+            try:
+                vectors = self.embedding_provider.embed([text for _, text in batch])
+                for (i, _), vector in zip(batch, vectors):
+                    results[i] = vector
+            except Exception as e:
+                print(f"Error generando embeddings por lotes: {e}")
+        
+        return results
+    
+    def _document_text(self, document: Dict[str, Any]) -> str:
+        """Construir el texto representativo de un documento"""
         combined_text = document["title"]
         
         if document.get("summary"):
@@ -59,49 +351,47 @@ class ModelComponent:
         if document.get("body"):
             combined_text += " " + document["body"]
         
-        return self.create_embedding(combined_text)
+        return combined_text
+    
+    def create_document_embedding(self, document: Dict[str, Any]) -> List[float]:
+        """Crear embedding para un documento completo"""
+        return self.create_embedding(self._document_text(document))
+    
+    def create_document_embeddings(self, documents: List[Dict[str, Any]]) -> List[List[float]]:
+        """Crear embeddings para varios documentos usando peticiones por lotes"""
+        return self.create_embeddings([self._document_text(doc) for doc in documents])
+    
+    def create_chunk_embeddings(self, chunks: List[Dict[str, Any]]) -> List[List[float]]:
+        """Crear embeddings para fragmentos: el título da contexto a cada pasaje"""
+        texts = []
+        for chunk in chunks:
+            text = chunk["title"]
+            if chunk["chunk_index"] == 0 and chunk.get("summary"):
+                text += " " + chunk["summary"]
+            texts.append(text + " " + chunk["text"])
+        
+        return self.create_embeddings(texts)
+    
+    def complete(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
+        """Llamar al LLM con el contexto recuperado (los errores se propagan)"""
+        messages, context_stats = build_llm_prompt(
+            query, context_docs, self.config.get("CONTEXT_TOKEN_BUDGET"), self.config.get("CHUNK_SIZE")
+        )
+        self.context_stats.record(context_stats)
+        response = self.openai_client.chat.completions.create(
+            model=self.config["LLM_MODEL"],
+            messages=messages,
+            temperature=self.config["LLM_TEMPERATURE"]
+        )
+        
+        return response.choices[0].message.content
     
     def generate_response(self, 
                          query: str, 
                          context_docs: List[Dict[str, Any]]) -> str:
         """Generar respuesta del LLM basada en el contexto recuperado"""
-        # Preparar contexto para el LLM
-        context = "Información relevante:\n\n"
-        
-        for i, doc in enumerate(context_docs, 1):
-            context += f"Documento {i}:\n"
-            context += f"Título: {doc['title']}\n"
-            
-            if doc.get('summary'):
-                context += f"Resumen: {doc['summary']}\n"
-            
-            if doc.get('body'):
-                truncated_body = doc['body'][:1000] + "..." if len(doc['body']) > 1000 else doc['body']
-                context += f"Contenido: {truncated_body}\n"
-            
-            context += "\n---\n\n"
-        
-        # Construir prompt para OpenAI
-        prompt = f"""Basándote en la siguiente información, responde a esta consulta de forma clara y concisa:
-
-Consulta: {query}
-
-{context}
-
-Respuesta:"""
-        
-        # Llamar al LLM para generar respuesta
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config["LLM_MODEL"],
-                messages=[
-                    {"role": "system", "content": "Eres un asistente especializado que responde preguntas basándose únicamente en la información proporcionada."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config["LLM_TEMPERATURE"]
-            )
-            
-            return response.choices[0].message.content
+            return self.complete(query, context_docs)
         except Exception as e:
             print(f"Error al generar respuesta con LLM: {e}")
             return f"Error al procesar la consulta: {str(e)}"
@@ -109,15 +399,163 @@ Respuesta:"""
 # ========================
 # COMPONENT: CONTEXT
 # ========================
-class ContextComponent:
+class BaseContextComponent:
     """
     Componente Context: Responsable de gestionar los datos y el estado,
-    incluyendo el almacenamiento y recuperación de vectores y documentos
+    incluyendo el almacenamiento y recuperación de vectores y documentos.
+    
+    Interfaz común de los backends (Qdrant o índice NumPy en proceso, ver
+    create_context_component). Cada backend implementa el almacenamiento y
+    la búsqueda; aquí están los avisos de escritura, los payloads y la carga
+    diferida de cuerpos.
     """
     
+    # Número de IDs por petición en las operaciones por lotes
+    BATCH_SIZE = 1000
+    
+    def __init__(self, config):
+        self.config = config
+        
+        # Búsqueda léxica BM25 junto a la densa (solo si el backend la admite)
+        self.hybrid = False
+        self.hybrid_stats = HybridSearchStats()
+        
+        # Funciones a las que se avisa tras cada escritura (p. ej. invalidar cachés)
+        self._write_listeners = []
+    
+    def add_write_listener(self, listener) -> None:
+        """Registrar una función sin argumentos que se llama tras cada escritura"""
+        self._write_listeners.append(listener)
+    
+    def _notify_write(self) -> None:
+        for listener in self._write_listeners:
+            listener()
+    
+    @staticmethod
+    def document_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload de un documento sin fragmentar: el documento es su único fragmento"""
+        return {
+            "parent_id": doc["id"] if isinstance(doc["id"], str) else str(doc["id"]),
+            "chunk_index": 0,
+            "chunk_count": 1,
+            "title": doc["title"],
+            "summary": doc.get("summary", ""),
+            "body": doc.get("body", ""),
+            "metadata": doc.get("metadata", {}),
+            "revision": doc.get("revision", {})
+        }
+    
+    @staticmethod
+    def chunk_payload(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload de un fragmento; el cuerpo completo solo va en el primero"""
+        payload = {
+            "parent_id": chunk["parent_id"],
+            "chunk_index": chunk["chunk_index"],
+            "chunk_count": chunk["chunk_count"],
+            "text": chunk["text"],
+            "title": chunk["title"],
+            "summary": chunk.get("summary", ""),
+            "metadata": chunk.get("metadata", {}),
+            "revision": chunk.get("revision", {})
+        }
+        if chunk["chunk_index"] == 0:
+            payload["body"] = chunk.get("body", "")
+        return payload
+    
+    def _load_missing_bodies(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Documentos sin pasajes (sin fragmentar): cargar su cuerpo en una sola lectura"""
+        missing = [doc for doc in documents if not doc["passages"] and "body" not in doc]
+        if missing:
+            bodies = {doc["id"]: doc["body"] for doc in self.get_documents([doc["id"] for doc in missing], ["body"])}
+            for doc in missing:
+                doc["body"] = bodies.get(doc["id"], "")
+        return documents
+    
+    def get_document_by_id(self, doc_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Recuperar un documento específico por su ID"""
+        try:
+            documents = self.get_documents([doc_id], fields)
+            return documents[0] if documents else None
+        except Exception as e:
+            print(f"Error recuperando documento {doc_id}: {e}")
+            return None
+    
+    def bulk_load(self):
+        """Contexto para cargas masivas (el backend puede diferir trabajo hasta el final)"""
+        raise NotImplementedError
+    
+    def store_document(self, doc_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        """Almacenar un documento en la base de datos vectorial"""
+        raise NotImplementedError
+    
+    def store_documents(self, documents: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        """Almacenar múltiples documentos en lote (un punto por documento)"""
+        raise NotImplementedError
+    
+    def store_chunks(self, chunks: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        """Almacenar fragmentos y eliminar los sobrantes de versiones anteriores"""
+        raise NotImplementedError
+    
+    def retrieve_documents(self, query_vector: List[float], limit: int = 5,
+                           fields: Optional[List[str]] = None, hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None, query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recuperar documentos agrupando por documento los fragmentos más similares"""
+        raise NotImplementedError
+    
+    def retrieve_documents_batch(self, query_vectors: List[List[float]], limit: int = 5,
+                                 fields: Optional[List[str]] = None, hnsw_ef: Optional[int] = None,
+                                 exact: Optional[bool] = None,
+                                 query_texts: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Recuperar los documentos de varias consultas (por defecto, una búsqueda por consulta)"""
+        query_texts = query_texts or [None] * len(query_vectors)
+        return [
+            self.retrieve_documents(query_vector, limit, fields=fields, hnsw_ef=hnsw_ef, exact=exact, query_text=query_text)
+            for query_vector, query_text in zip(query_vectors, query_texts)
+        ]
+    
+    def get_documents(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Recuperar varios documentos por ID en el orden pedido"""
+        raise NotImplementedError
+    
+    def get_revisions(self, doc_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Revisión almacenada de varios documentos (None si no tienen)"""
+        raise NotImplementedError
+    
+    def list_document_ids(self) -> List[str]:
+        """Listar los IDs de todos los documentos"""
+        raise NotImplementedError
+    
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """Eliminar varios documentos con todos sus fragmentos"""
+        raise NotImplementedError
+    
+    def delete_document(self, doc_id: str) -> bool:
+        """Eliminar un documento"""
+        raise NotImplementedError
+    
+    def ping(self) -> None:
+        """Comprobar que el índice responde (los errores se propagan)"""
+        # Los backends en proceso no tienen conexión que comprobar
+    
+    def clear_collection(self) -> bool:
+        """Eliminar todos los documentos"""
+        raise NotImplementedError
+
+
+class ContextComponent(BaseContextComponent):
+    """Backend del componente Context sobre Qdrant"""
+    
     def __init__(self, qdrant_client, config):
+        super().__init__(config)
         self.qdrant_client = qdrant_client
-        self.config = config
+        
+        # Perfil de la colección (cuantización, HNSW, almacenamiento en disco)
+        self.profile = get_profile(self.config.get("COLLECTION_PROFILE", "default"))
+        
+        # La búsqueda híbrida se activa en _setup_collection solo si la
+        # colección tiene el vector disperso
+        self.sparse_encoder = BM25Encoder.from_config(self.config)
+        
         self._setup_collection()
     
     def _setup_collection(self):
@@ -125,25 +563,75 @@ class ContextComponent:
         collections = self.qdrant_client.get_collections().collections
         collection_names = [collection.name for collection in collections]
         
+        hybrid_enabled = self.config.get("HYBRID_SEARCH_ENABLED", False)
+        
         if self.config["COLLECTION_NAME"] not in collection_names:
-            print(f"Creando colección {self.config['COLLECTION_NAME']}...")
+            print(f"Creando colección {self.config['COLLECTION_NAME']} "
+                  f"(perfil {self.config.get('COLLECTION_PROFILE', 'default')})...")
             self.qdrant_client.create_collection(
                 collection_name=self.config["COLLECTION_NAME"],
-                vectors_config=models.VectorParams(
-                    size=self.config["VECTOR_SIZE"], 
-                    distance=models.Distance.COSINE
-                ),
                 optimizers_config=models.OptimizersConfigDiff(
-                    indexing_threshold=10000
-                )
+                    indexing_threshold=self.config["QDRANT_INDEXING_THRESHOLD"]
+                ),
+                sparse_vectors_config=sparse_vectors_config() if hybrid_enabled else None,
+                **collection_params(self.profile, self.config["VECTOR_SIZE"])
+            )
+            
+            # Índices de payload para agrupar y filtrar fragmentos por documento
+            self.qdrant_client.create_payload_index(
+                collection_name=self.config["COLLECTION_NAME"],
+                field_name="parent_id",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
+            self.qdrant_client.create_payload_index(
+                collection_name=self.config["COLLECTION_NAME"],
+                field_name="chunk_index",
+                field_schema=models.PayloadSchemaType.INTEGER
             )
             print(f"Colección {self.config['COLLECTION_NAME']} creada correctamente")
+        
+        collection_info = self.qdrant_client.get_collection(self.config["COLLECTION_NAME"])
+        check_collection_vector_size(collection_info, self.config["COLLECTION_NAME"], self.config["VECTOR_SIZE"])
+        
+        if hybrid_enabled:
+            self.hybrid = has_sparse_vectors(collection_info)
+            if not self.hybrid:
+                print(f"La colección {self.config['COLLECTION_NAME']} no tiene vector disperso "
+                      f"'{SPARSE_VECTOR_NAME}': se usa solo la búsqueda densa (reindexar para activarla)")
+    
+    def _point_vector(self, vector: List[float], payload: Dict[str, Any]):
+        """Vector denso del punto y, con búsqueda híbrida, su vector disperso BM25"""
+        if not self.hybrid:
+            return vector
+        return {"": vector, SPARSE_VECTOR_NAME: self.sparse_encoder.encode_document(sparse_text(payload))}
+    
+    def _upsert(self, points: List[models.PointStruct]) -> None:
+        """Insertar puntos en lotes con varias peticiones en curso"""
+        upsert_points(
+            self.qdrant_client,
+            self.config["COLLECTION_NAME"],
+            points,
+            batch_size=self.config["UPSERT_BATCH_SIZE"],
+            parallel=self.config["UPSERT_PARALLEL"]
+        )
+        self._notify_write()
+    
+    def bulk_load(self):
+        """
+        Modo de carga masiva: la indexación HNSW se pospone hasta que
+        termina el bloque `with` y después se restaura la configuración.
+        """
+        return bulk_load_mode(
+            self.qdrant_client,
+            self.config["COLLECTION_NAME"],
+            default_threshold=self.config["QDRANT_INDEXING_THRESHOLD"]
+        )
     
     def store_document(self, doc_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
         """Almacenar un documento en la base de datos vectorial"""
         point = models.PointStruct(
             id=doc_id,
-            vector=vector,
+            vector=self._point_vector(vector, payload),
             payload=payload
         )
         
@@ -151,98 +639,316 @@ class ContextComponent:
             collection_name=self.config["COLLECTION_NAME"],
             points=[point]
         )
+        self._notify_write()
     
     def store_documents(self, documents: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
-        """Almacenar múltiples documentos en lote"""
+        """Almacenar múltiples documentos en lote (un punto por documento)"""
         if not documents or not vectors or len(documents) != len(vectors):
             raise ValueError("La lista de documentos y vectores debe tener la misma longitud")
         
         points = []
         for i, doc in enumerate(documents):
-            doc_id = doc["id"] if isinstance(doc["id"], str) else str(doc["id"])
-            
-            # Preparar payload para almacenamiento
-            payload = {
-                "title": doc["title"],
-                "summary": doc.get("summary", ""),
-                "body": doc.get("body", ""),
-                "metadata": doc.get("metadata", {})
-            }
+            payload = self.document_payload(doc)
             
             point = models.PointStruct(
-                id=doc_id,
-                vector=vectors[i],
+                id=payload["parent_id"],
+                vector=self._point_vector(vectors[i], payload),
                 payload=payload
             )
             
             points.append(point)
         
         # Realizar la inserción por lotes
-        if points:
-            self.qdrant_client.upsert(
-                collection_name=self.config["COLLECTION_NAME"],
-                points=points
+        self._upsert(points)
+    
+    def store_chunks(self, chunks: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        """
+        Almacenar fragmentos de documentos, un punto por fragmento.
+        El cuerpo completo se guarda solo en el primer fragmento de cada
+        documento. Los fragmentos sobrantes de versiones anteriores de los
+        mismos documentos se eliminan, también el punto del documento sin
+        fragmentar de las colecciones anteriores (ID del documento, sin
+        parent_id en el payload).
+        """
+        if not chunks or not vectors or len(chunks) != len(vectors):
+            raise ValueError("La lista de fragmentos y vectores debe tener la misma longitud")
+        
+        points = []
+        for chunk, vector in zip(chunks, vectors):
+            payload = self.chunk_payload(chunk)
+            points.append(models.PointStruct(id=chunk["id"], vector=self._point_vector(vector, payload), payload=payload))
+        
+        self._upsert(points)
+        
+        # Eliminar fragmentos de estos documentos que no forman parte de la versión actual
+        parent_ids = list({chunk["parent_id"] for chunk in chunks})
+        stale = [models.FieldCondition(key="parent_id", match=models.MatchAny(any=parent_ids))]
+        legacy_ids = [pid for pid in (_legacy_point_id(parent_id) for parent_id in parent_ids) if pid is not None]
+        if legacy_ids:
+            stale.append(models.HasIdCondition(has_id=legacy_ids))
+        self.qdrant_client.delete(
+            collection_name=self.config["COLLECTION_NAME"],
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    should=stale,
+                    must_not=[models.HasIdCondition(has_id=[point.id for point in points])]
+                )
             )
+        )
+    
+    def retrieve_documents(self,
+                           query_vector: List[float],
+                           limit: int = 5,
+                           fields: Optional[List[str]] = None,
+                           hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None,
+                           query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Recuperar documentos basados en similitud vectorial.
+        Se buscan fragmentos y se agrupan por documento: la puntuación del
+        documento es la de su mejor fragmento y se devuelven sus pasajes
+        más relevantes. Solo se leen del payload los campos `fields`
+        (por defecto SEARCH_FIELDS, sin el cuerpo completo). `hnsw_ef` y
+        `exact` sustituyen a los parámetros de búsqueda del perfil.
+        Con búsqueda híbrida y `query_text`, se busca también por BM25 y
+        los rankings se fusionan con RRF (ver fuse_search_results).
+        """
+        chunk_limit = limit * max(1, self.config["CHUNK_SEARCH_FACTOR"])
+        params = search_params(self.profile, hnsw_ef, exact)
+        
+        if self.hybrid and query_text:
+            documents = self._hybrid_search(query_vector, query_text, limit, chunk_limit, fields, params)
+        else:
+            search_result = self.qdrant_client.query_points(
+                collection_name=self.config["COLLECTION_NAME"],
+                query=query_vector,
+                limit=chunk_limit,
+                with_payload=search_payload_fields(fields),
+                search_params=params
+            ).points
+            documents = self._group_chunks(search_result, limit)
+        
+        return self._load_missing_bodies(documents)
     
-    def retrieve_documents(self, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Recuperar documentos basados en similitud vectorial"""
-        search_result = self.qdrant_client.search(
+    def retrieve_documents_batch(self,
+                                 query_vectors: List[List[float]],
+                                 limit: int = 5,
+                                 fields: Optional[List[str]] = None,
+                                 hnsw_ef: Optional[int] = None,
+                                 exact: Optional[bool] = None,
+                                 query_texts: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Versión por lotes de retrieve_documents: las búsquedas de todas las
+        consultas (densas y, con búsqueda híbrida, BM25) se envían en una
+        sola petición query_batch_points. Devuelve los documentos de cada
+        consulta en el orden de entrada.
+        """
+        if not query_vectors:
+            return []
+        
+        chunk_limit = limit * max(1, self.config["CHUNK_SEARCH_FACTOR"])
+        params = search_params(self.profile, hnsw_ef, exact)
+        query_texts = query_texts or [None] * len(query_vectors)
+        
+        # Posición y número de peticiones de cada consulta dentro del lote
+        start = time.perf_counter()
+        requests, spans = [], []
+        for query_vector, query_text in zip(query_vectors, query_texts):
+            sparse_vector = self.sparse_encoder.encode_query(query_text) if self.hybrid and query_text else None
+            query_requests = hybrid_search_requests(query_vector, sparse_vector, chunk_limit, fields, params)
+            spans.append((len(requests), len(query_requests)))
+            requests.extend(query_requests)
+        encoded = time.perf_counter()
+        
+        responses = self.qdrant_client.query_batch_points(
             collection_name=self.config["COLLECTION_NAME"],
-            query_vector=query_vector,
-            limit=limit
+            requests=requests
         )
+        searched = time.perf_counter()
         
-        # Preparar resultado
         results = []
-        for scored_point in search_result:
-            doc = {
-                "id": scored_point.id,
-                "score": scored_point.score,
-                "title": scored_point.payload.get("title", ""),
-                "summary": scored_point.payload.get("summary", ""),
-                "body": scored_point.payload.get("body", ""),
-                "metadata": scored_point.payload.get("metadata", {})
+        for (offset, count), query_text in zip(spans, query_texts):
+            if self.hybrid and query_text:
+                documents = fuse_search_results(
+                    responses[offset].points,
+                    responses[offset + 1].points if count > 1 else [],
+                    limit,
+                    self.config["MAX_PASSAGES_PER_DOC"],
+                    self.config.get("RRF_K", 60)
+                )
+            else:
+                documents = self._group_chunks(responses[offset].points, limit)
+            results.append(documents)
+        
+        # Latencia de cada fase repartida entre las consultas del lote
+        if self.hybrid:
+            fused = time.perf_counter()
+            latency = {
+                "encode": (encoded - start) * 1000 / len(results),
+                "search": (searched - encoded) * 1000 / len(results),
+                "fusion": (fused - searched) * 1000 / len(results)
             }
-            results.append(doc)
+            for documents, query_text in zip(results, query_texts):
+                if query_text:
+                    self.hybrid_stats.record(documents, latency)
         
+        self._load_missing_bodies([doc for documents in results for doc in documents])
         return results
     
-    def get_document_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
-        """Recuperar un documento específico por su ID"""
-        try:
-            result = self.qdrant_client.retrieve(
+    def _hybrid_search(self, query_vector, query_text, limit, chunk_limit, fields, params) -> List[Dict[str, Any]]:
+        """Búsquedas densa y BM25 en una sola petición, fusionadas con RRF"""
+        start = time.perf_counter()
+        sparse_vector = self.sparse_encoder.encode_query(query_text)
+        encoded = time.perf_counter()
+        
+        responses = self.qdrant_client.query_batch_points(
+            collection_name=self.config["COLLECTION_NAME"],
+            requests=hybrid_search_requests(query_vector, sparse_vector, chunk_limit, fields, params)
+        )
+        searched = time.perf_counter()
+        
+        documents = fuse_search_results(
+            responses[0].points,
+            responses[1].points if len(responses) > 1 else [],
+            limit,
+            self.config["MAX_PASSAGES_PER_DOC"],
+            self.config.get("RRF_K", 60)
+        )
+        self.hybrid_stats.record(documents, {
+            "encode": (encoded - start) * 1000,
+            "search": (searched - encoded) * 1000,
+            "fusion": (time.perf_counter() - searched) * 1000
+        })
+        return documents
+    
+    def _group_chunks(self, scored_points, limit: int) -> List[Dict[str, Any]]:
+        """Agrupar fragmentos puntuados (ordenados por puntuación) en documentos"""
+        return group_chunks(scored_points, limit, self.config["MAX_PASSAGES_PER_DOC"])
+    
+    def get_documents(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Recuperar varios documentos por ID con lecturas por lotes (retrieve),
+        en el orden pedido. Solo se leen los campos `fields` (por defecto
+        DOCUMENT_FIELDS); los IDs que no existen se omiten.
+        """
+        documents = []
+        for start in range(0, len(doc_ids), self.BATCH_SIZE):
+            batch = doc_ids[start:start + self.BATCH_SIZE]
+            points = self.qdrant_client.retrieve(
+                collection_name=self.config["COLLECTION_NAME"],
+                ids=document_point_ids(batch),
+                with_payload=["parent_id"] + list(fields or DOCUMENT_FIELDS),
+                with_vectors=False
+            )
+            documents.extend(points_to_documents(points, batch, fields))
+        
+        return documents
+    
+    def _document_filter(self, doc_ids: Optional[List[str]] = None) -> models.Filter:
+        """
+        Filtro que selecciona un punto por documento: su primer fragmento o,
+        en documentos almacenados sin fragmentar, el punto sin parent_id
+        """
+        first_chunk = [models.FieldCondition(key="chunk_index", match=models.MatchValue(value=0))]
+        legacy = [models.IsEmptyCondition(is_empty=models.PayloadField(key="parent_id"))]
+        if doc_ids is not None:
+            first_chunk.append(models.FieldCondition(key="parent_id", match=models.MatchAny(any=doc_ids)))
+            legacy_ids = [pid for pid in (_legacy_point_id(doc_id) for doc_id in doc_ids) if pid is not None]
+            if not legacy_ids:
+                return models.Filter(must=first_chunk)
+            legacy.append(models.HasIdCondition(has_id=legacy_ids))
+        return models.Filter(should=[models.Filter(must=first_chunk), models.Filter(must=legacy)])
+    
+    def _scroll_documents(self, doc_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Revisión de los documentos de un lote que existen, por ID de documento"""
+        # Los puntos sin fragmentar se identifican con el ID de documento pedido
+        legacy_ids = {_legacy_point_id(doc_id): doc_id for doc_id in doc_ids}
+        points, _ = self.qdrant_client.scroll(
+            collection_name=self.config["COLLECTION_NAME"],
+            scroll_filter=self._document_filter(doc_ids),
+            # Un documento a medio migrar puede tener los dos puntos
+            limit=2 * len(doc_ids),
+            with_payload=["parent_id", "revision"],
+            with_vectors=False
+        )
+        revisions = {}
+        for point in points:
+            payload = point.payload or {}
+            doc_id = payload.get("parent_id") or legacy_ids.get(point.id, str(point.id))
+            if doc_id not in revisions or "parent_id" in payload:
+                revisions[doc_id] = payload.get("revision")
+        return revisions
+    
+    def get_revisions(self, doc_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Obtener en bloque la revisión almacenada de varios documentos.
+        Los documentos que no existen no aparecen en el resultado; los que
+        existen sin revisión almacenada (también los que se guardaron sin
+        fragmentar) aparecen con None.
+        """
+        revisions = {}
+        for start in range(0, len(doc_ids), self.BATCH_SIZE):
+            revisions.update(self._scroll_documents(doc_ids[start:start + self.BATCH_SIZE]))
+        return revisions
+    
+    def list_document_ids(self) -> List[str]:
+        """Listar los IDs de todos los documentos de la colección, también los no fragmentados"""
+        doc_ids = {}
+        offset = None
+        
+        while True:
+            points, offset = self.qdrant_client.scroll(
                 collection_name=self.config["COLLECTION_NAME"],
-                ids=[doc_id]
+                scroll_filter=self._document_filter(),
+                limit=self.BATCH_SIZE,
+                offset=offset,
+                with_payload=["parent_id"],
+                with_vectors=False
             )
+            doc_ids.update(dict.fromkeys(str((point.payload or {}).get("parent_id", point.id)) for point in points))
             
-            if result and len(result) > 0:
-                point = result[0]
-                return {
-                    "id": point.id,
-                    "title": point.payload.get("title", ""),
-                    "summary": point.payload.get("summary", ""),
-                    "body": point.payload.get("body", ""),
-                    "metadata": point.payload.get("metadata", {})
-                }
-            return None
-        except Exception as e:
-            print(f"Error recuperando documento {doc_id}: {e}")
-            return None
+            if offset is None:
+                break
+        
+        return list(doc_ids)
     
-    def delete_document(self, doc_id: str) -> bool:
-        """Eliminar un documento de la base de datos"""
-        try:
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """
+        Eliminar varios documentos (con todos sus fragmentos y el punto del
+        documento sin fragmentar) con borrados por lotes. Devuelve cuántos
+        de ellos existían.
+        """
+        deleted = 0
+        for start in range(0, len(doc_ids), self.BATCH_SIZE):
+            batch = doc_ids[start:start + self.BATCH_SIZE]
+            deleted += len(self._scroll_documents(batch))
+            
+            conditions = [models.FieldCondition(key="parent_id", match=models.MatchAny(any=batch))]
+            legacy_ids = [pid for pid in (_legacy_point_id(doc_id) for doc_id in batch) if pid is not None]
+            if legacy_ids:
+                conditions.append(models.HasIdCondition(has_id=legacy_ids))
             self.qdrant_client.delete(
                 collection_name=self.config["COLLECTION_NAME"],
-                points_selector=models.PointIdsList(
-                    points=[doc_id]
-                )
+                points_selector=models.FilterSelector(filter=models.Filter(should=conditions))
             )
+        
+        self._notify_write()
+        return deleted
+    
+    def delete_document(self, doc_id: str) -> bool:
+        """Eliminar un documento de la base de datos"""
+        try:
+            self.delete_documents([doc_id])
             return True
         except Exception as e:
             print(f"Error eliminando documento {doc_id}: {e}")
             return False
     
+    def ping(self) -> None:
+        """Comprobar la conexión con Qdrant, que la colección existe y su dimensión"""
+        collection_info = self.qdrant_client.get_collection(self.config["COLLECTION_NAME"])
+        check_collection_vector_size(collection_info, self.config["COLLECTION_NAME"], self.config["VECTOR_SIZE"])
+    
     def clear_collection(self) -> bool:
         """Limpiar toda la colección (útil para pruebas)"""
         try:
@@ -250,11 +956,146 @@ class ContextComponent:
                 collection_name=self.config["COLLECTION_NAME"]
             )
             self._setup_collection()
+            self._notify_write()
             return True
         except Exception as e:
             print(f"Error limpiando colección: {e}")
             return False
 
+class NumpyContextComponent(BaseContextComponent):
+    """
+    Backend del componente Context en proceso sobre NumpyVectorIndex: sin
+    viaje de red por consulta y sin servidor. La búsqueda es siempre exacta
+    (se ignoran hnsw_ef y exact) y solo densa.
+    """
+    
+    def __init__(self, config, index: Optional[NumpyVectorIndex] = None):
+        super().__init__(config)
+        self.index = index or NumpyVectorIndex(
+            self.config["VECTOR_SIZE"],
+            path=self.config.get("NUMPY_INDEX_PATH") or None
+        )
+        self._bulk_loads = 0
+    
+    def _written(self) -> None:
+        # flush() solo escribe los cambios de esta escritura; durante una carga
+        # masiva se guardan una sola vez al final
+        if not self._bulk_loads:
+            self.index.flush()
+        self._notify_write()
+    
+    @contextmanager
+    def bulk_load(self):
+        """Modo de carga masiva: el índice se guarda en disco al terminar el bloque `with`"""
+        self._bulk_loads += 1
+        try:
+            yield
+        finally:
+            self._bulk_loads -= 1
+            if not self._bulk_loads:
+                self.index.flush()
+    
+    def store_document(self, doc_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        self.index.upsert([doc_id], [vector], [payload])
+        self._written()
+    
+    def store_documents(self, documents: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        if not documents or not vectors or len(documents) != len(vectors):
+            raise ValueError("La lista de documentos y vectores debe tener la misma longitud")
+        
+        payloads = [self.document_payload(doc) for doc in documents]
+        self.index.upsert([payload["parent_id"] for payload in payloads], vectors, payloads)
+        self._written()
+    
+    def store_chunks(self, chunks: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        if not chunks or not vectors or len(chunks) != len(vectors):
+            raise ValueError("La lista de fragmentos y vectores debe tener la misma longitud")
+        
+        ids = [chunk["id"] for chunk in chunks]
+        self.index.upsert(ids, vectors, [self.chunk_payload(chunk) for chunk in chunks])
+        
+        # Eliminar fragmentos de estos documentos que no forman parte de la versión actual
+        self.index.delete_parents({chunk["parent_id"] for chunk in chunks}, keep_ids=ids)
+        self._written()
+    
+    def retrieve_documents(self,
+                           query_vector: List[float],
+                           limit: int = 5,
+                           fields: Optional[List[str]] = None,
+                           hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None,
+                           query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recuperar documentos por similitud coseno exacta agrupando sus fragmentos"""
+        payload_fields = search_payload_fields(fields)
+        scored_points = [
+            models.ScoredPoint(
+                id=point_id,
+                version=0,
+                score=score,
+                payload={field: payload[field] for field in payload_fields if field in payload}
+            )
+            for point_id, score, payload in self.index.search(
+                query_vector, limit * max(1, self.config["CHUNK_SEARCH_FACTOR"])
+            )
+        ]
+        
+        documents = group_chunks(scored_points, limit, self.config["MAX_PASSAGES_PER_DOC"])
+        return self._load_missing_bodies(documents)
+    
+    def get_documents(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        payload_fields = ["parent_id"] + list(fields or DOCUMENT_FIELDS)
+        points = [
+            models.Record(id=point_id, payload={field: payload[field] for field in payload_fields if field in payload})
+            for point_id, payload in self.index.retrieve(document_point_ids(doc_ids))
+        ]
+        return points_to_documents(points, doc_ids, fields)
+    
+    def get_revisions(self, doc_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {
+            payload["parent_id"]: payload.get("revision")
+            for _, payload in self.index.first_chunks(doc_ids)
+        }
+    
+    def list_document_ids(self) -> List[str]:
+        return [payload["parent_id"] for _, payload in self.index.first_chunks()]
+    
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        deleted = self.index.delete_documents(doc_ids)
+        self._written()
+        return deleted
+    
+    def delete_document(self, doc_id: str) -> bool:
+        try:
+            self.index.delete_parents([doc_id])
+            self.index.delete([doc_id])
+            self._written()
+            return True
+        except Exception as e:
+            print(f"Error eliminando documento {doc_id}: {e}")
+            return False
+    
+    def clear_collection(self) -> bool:
+        try:
+            self.index.clear()
+            self._written()
+            return True
+        except Exception as e:
+            print(f"Error limpiando colección: {e}")
+            return False
+
+
+def create_context_component(config: Dict[str, Any], qdrant_client=None) -> BaseContextComponent:
+    """
+    Crear el componente Context del backend indicado en CONTEXT_BACKEND:
+    "qdrant" (por defecto) o "numpy" (índice en proceso).
+    """
+    backend = config.get("CONTEXT_BACKEND", "qdrant")
+    if backend == "numpy":
+        return NumpyContextComponent(config)
+    if backend == "qdrant":
+        return ContextComponent(qdrant_client or create_qdrant_client(config), config)
+    raise ValueError(f"Backend de contexto desconocido: {backend}. Valores admitidos: qdrant, numpy")
+
 # ========================
 # COMPONENT: PROTOCOL
 # ========================
@@ -266,34 +1107,86 @@ class ProtocolComponent:
     
     def __init__(self, config):
         self.config = config
+        self._fetcher = None
+    
+    @property
+    def fetcher(self) -> PublicationFetcher:
+        """Cliente paginado de la API (se crea la primera vez que se usa)"""
+        if self._fetcher is None:
+            self._fetcher = PublicationFetcher.from_config(self.config)
+        return self._fetcher
+    
+    def iter_publication_pages(self, limit: Optional[int] = 100) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Obtener publicaciones desde la API página a página, entregando cada
+        página en cuanto llega (no necesariamente en orden)
+        """
+        for _, publications in self.fetcher.iter_pages(limit):
+            yield publications
         
     def fetch_publications(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Obtener publicaciones desde la API externa"""
         print("Descargando publicaciones desde la API...")
         
         try:
-            response = requests.get(f"{self.config['API_ENDPOINT']}?limit={limit}")
-            
-            if response.status_code == 200:
-                publications = response.json()
-                print(f"Se descargaron {len(publications)} publicaciones")
-                return publications
-            else:
-                raise Exception(f"Error al obtener publicaciones: {response.status_code}")
+            publications = self.fetcher.fetch_all(limit)
+            print(f"Se descargaron {len(publications)} publicaciones")
+            return publications
         except Exception as e:
             print(f"Error en la comunicación con la API: {e}")
             return []
     
+    def iter_local_json_file(self, file_path: str,
+                             on_read: Optional[Callable[[int], None]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Leer publicaciones de un archivo local una a una, sin cargarlo entero.
+        Admite un array JSON, JSON Lines o un único objeto. `on_read` recibe
+        los bytes leídos tras cada lectura del archivo.
+        """
+        return iter_json_records(file_path, on_read=on_read)
+    
     def process_local_json_file(self, file_path: str) -> List[Dict[str, Any]]:
         """Procesar un archivo JSON local como fuente de datos"""
         try:
-            with open(file_path, 'r') as file:
-                publication = json.load(file)
-                return [publication]
+            return list(self.iter_local_json_file(file_path))
         except Exception as e:
             print(f"Error procesando archivo local: {e}")
             return []
     
+    def chunk_document(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Dividir el cuerpo de un documento en fragmentos solapados.
+        Cada fragmento lleva el ID de su documento padre y los datos
+        necesarios para reconstruir el documento al recuperarlo.
+        """
+        windows = split_into_windows(
+            strip_html(document.get("body", "")),
+            self.config["CHUNK_SIZE"],
+            self.config["CHUNK_OVERLAP"]
+        )
+        
+        # Un documento sin cuerpo se representa con un único fragmento vacío
+        if not windows:
+            windows = [""]
+        
+        parent_id = str(document["id"])
+        chunks = []
+        for i, text in enumerate(windows):
+            chunks.append({
+                "id": chunk_point_id(parent_id, i),
+                "parent_id": parent_id,
+                "chunk_index": i,
+                "chunk_count": len(windows),
+                "text": text,
+                "title": document["title"],
+                "summary": document.get("summary", ""),
+                "body": document.get("body", "") if i == 0 else "",
+                "metadata": document.get("metadata", {}),
+                "revision": document.get("revision", {})
+            })
+        
+        return chunks
+    
     def extract_relevant_content(self, publication: Dict[str, Any]) -> Dict[str, Any]:
         """Extraer contenido relevante de una publicación"""
         # Inicializar objeto para almacenar contenido relevante
@@ -302,7 +1195,8 @@ class ProtocolComponent:
             "title": "",
             "summary": "",
             "body": "",
-            "metadata": {}
+            "metadata": {},
+            "revision": {}
         }
         
         # Extraer ID
@@ -361,6 +1255,13 @@ class ProtocolComponent:
         
         relevant_content["metadata"] = metadata
         
+        # Revisión de la publicación, usada para la sincronización incremental
+        revision = {}
+        for field in ("vid", "changed", "revision_timestamp"):
+            if field in publication and len(publication[field]) > 0:
+                revision[field] = publication[field][0]["value"]
+        relevant_content["revision"] = revision
+        
         return relevant_content
 
 # ========================
@@ -370,74 +1271,305 @@ class MCPRagService:
     """
     Fachada principal para el sistema RAG usando arquitectura MCP.
     Orquesta los componentes Model, Context y Protocol.
+    Los clientes y el proveedor de embeddings pueden inyectarse (p. ej. en pruebas).
     """
     
-    def __init__(self):
+    def __init__(self,
+                 config: Optional[Dict[str, Any]] = None,
+                 openai_client: Optional[OpenAI] = None,
+                 qdrant_client=None,
+                 embedding_provider: Optional[EmbeddingProvider] = None):
         # Cargar configuración
-        self.config = load_config()
+        self.config = config or load_config()
         
         # Configurar cliente OpenAI con base URL opcional
-        openai_client_kwargs = {"api_key": self.config["OPENAI_API_KEY"]}
-        if self.config["OPENAI_API_BASE"]:
-            openai_client_kwargs["base_url"] = self.config["OPENAI_API_BASE"]
+        if openai_client is None:
+            openai_client_kwargs = {"api_key": self.config["OPENAI_API_KEY"]}
+            if self.config["OPENAI_API_BASE"]:
+                openai_client_kwargs["base_url"] = self.config["OPENAI_API_BASE"]
+            openai_client = OpenAI(**openai_client_kwargs)
         
         # Inicializar clientes
-        self.openai_client = OpenAI(**openai_client_kwargs)
-        self.qdrant_client = QdrantClient(
-            host=self.config["QDRANT_HOST"], 
-            port=self.config["QDRANT_PORT"]
-        )
+        self.openai_client = openai_client
         
-        # Inicializar componentes MCP
-        self.model = ModelComponent(self.openai_client, self.config)
-        self.context = ContextComponent(self.qdrant_client, self.config)
+        # Inicializar componentes MCP; la dimensión de los vectores es la del
+        # proveedor de embeddings y se comprueba contra la colección existente
+        self.model = ModelComponent(self.openai_client, self.config, embedding_provider)
+        self.config = {**self.config, "VECTOR_SIZE": self.model.vector_size}
+        self.context = create_context_component(self.config, qdrant_client)
+        self.qdrant_client = getattr(self.context, "qdrant_client", None)
         self.protocol = ProtocolComponent(self.config)
+        
+        # Caché semántica de respuestas, invalidada con cada escritura en el índice
+        self.answer_cache = None
+        if self.config["SEMANTIC_CACHE_ENABLED"]:
+            self.answer_cache = SemanticCache.from_config(self.config)
+            self.context.add_write_listener(self.answer_cache.invalidate)
+        
+        # Reordenación opcional de los candidatos con un cross-encoder local
+        self.reranker = Reranker.from_config(self.config) if self.config["RERANK_ENABLED"] else None
+        
+        # Estadísticas de la última indexación por etapas
+        self.last_index_stats = None
     
-    def index_publications_from_api(self, limit: int = 100) -> int:
-        """Indexar publicaciones desde la API"""
-        # Protocolo: Obtener publicaciones
-        publications = self.protocol.fetch_publications(limit)
+    def _extract_documents(self, publications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Protocolo: extraer el contenido relevante de las publicaciones con ID"""
+        documents = [self.protocol.extract_relevant_content(pub) for pub in publications]
+        return [doc for doc in documents if doc["id"] is not None]
+    
+    def _select_changed(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Contexto: comparar en bloque con las revisiones almacenadas.
+        Devuelve los documentos nuevos o con otra revisión y los contadores
+        de nuevos, actualizados y sin cambios.
+        """
+        stored_revisions = self.context.get_revisions([doc["id"] for doc in documents]) if documents else {}
         
-        # Protocolo: Extraer contenido relevante
-        processed_documents = []
-        vectors = []
+        changed = []
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        for doc in documents:
+            if doc["id"] not in stored_revisions:
+                counts["added"] += 1
+                changed.append(doc)
+            elif not doc["revision"] or stored_revisions[doc["id"]] != doc["revision"]:
+                # Sin revisión no podemos saber si cambió: se reindexa
+                counts["updated"] += 1
+                changed.append(doc)
+            else:
+                counts["unchanged"] += 1
+        return changed, counts
+    
+    def _chunk_documents(self, documents: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Protocolo: dividir los documentos en fragmentos"""
+        chunks = [chunk for doc in documents for chunk in self.protocol.chunk_document(doc)]
+        return chunks or None
+    
+    def _extract_chunks(self, publications: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Protocolo: extraer el contenido relevante y fragmentar solo los documentos que cambiaron"""
+        changed, _ = self._select_changed(self._extract_documents(publications))
+        return self._chunk_documents(changed)
+    
+    def _embed_chunks(self, chunks: List[Dict[str, Any]]) -> tuple:
+        """Modelo: generar los embeddings de un lote de fragmentos"""
+        return chunks, self.model.create_chunk_embeddings(chunks)
+    
+    def _upsert_chunks(self, item: tuple) -> None:
+        """Contexto: almacenar un lote de fragmentos con sus vectores"""
+        chunks, vectors = item
+        self.context.store_chunks(chunks, vectors)
+    
+    def _store_documents(self, documents: List[Dict[str, Any]]) -> None:
+        """Fragmentar, vectorizar por lotes y almacenar documentos ya extraídos"""
+        chunks = self._chunk_documents(documents)
+        if chunks:
+            self._upsert_chunks(self._embed_chunks(chunks))
+    
+    def _run_index_pipeline(self, source: Iterable[List[Dict[str, Any]]], source_name: str) -> int:
+        """
+        Indexar lotes de publicaciones con un pipeline por etapas
+        (obtener → extraer → vectorizar → almacenar) con colas acotadas.
+        Los documentos cuya revisión coincide con la almacenada se descartan
+        al extraer y no se vuelven a vectorizar.
+        Devuelve el número de documentos indexados; las estadísticas por
+        etapa quedan en `last_index_stats`.
+        """
+        pipeline = StagedPipeline(
+            source,
+            [
+                Stage("extract", self._extract_chunks, workers=self.config["INDEX_EXTRACT_WORKERS"]),
+                Stage("embed", self._embed_chunks, workers=self.config["INDEX_EMBED_WORKERS"]),
+                Stage("upsert", self._upsert_chunks, workers=self.config["INDEX_UPSERT_WORKERS"],
+                      count=lambda item: sum(1 for chunk in item[0] if chunk["chunk_index"] == 0))
+            ],
+            queue_size=self.config["INDEX_QUEUE_SIZE"],
+            source_name=source_name
+        )
         
-        for pub in publications:
-            doc = self.protocol.extract_relevant_content(pub)
-            processed_documents.append(doc)
-            
-            # Modelo: Generar embeddings
-            vector = self.model.create_document_embedding(doc)
-            vectors.append(vector)
+        self.last_index_stats = pipeline.run()
         
-        # Contexto: Almacenar documentos
-        self.context.store_documents(processed_documents, vectors)
+        stats = self.last_index_stats
+        print(f"Indexación completada en {stats['elapsed_seconds']:.2f}s")
+        for name, stage in stats["stages"].items():
+            print(f"  {name}: {stage['records']} registros, {stage['records_per_second']}/s, "
+                  f"ocupado {stage['busy_seconds']}s con {stage['workers']} hilo(s)")
         
-        return len(processed_documents)
+        return stats["stages"]["upsert"]["records"]
+    
+    def index_publications_from_api(self, limit: int = 100) -> int:
+        """Indexar publicaciones desde la API, procesando cada página al llegar"""
+        try:
+            # Protocolo: Obtener publicaciones página a página
+            with self.context.bulk_load():
+                return self._run_index_pipeline(self.protocol.iter_publication_pages(limit), "fetch")
+        except FetchError as e:
+            print(f"Error en la comunicación con la API: {e}")
+            return 0
     
     def index_publication_from_file(self, file_path: str) -> int:
-        """Indexar publicaciones desde un archivo local"""
-        # Protocolo: Obtener publicaciones
-        publications = self.protocol.process_local_json_file(file_path)
+        """
+        Indexar publicaciones desde un archivo local.
+        El archivo se lee en streaming y se procesa en lotes de tamaño
+        fijo, por lo que la memoria no depende del tamaño del archivo.
+        """
+        try:
+            # Protocolo: Obtener publicaciones en lotes
+            publications = self.protocol.iter_local_json_file(file_path)
+            batches = iter_batches(publications, self.config["INDEX_BATCH_SIZE"])
+            with self.context.bulk_load():
+                return self._run_index_pipeline(batches, "read")
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error procesando archivo local: {e}")
+            return 0
+    
+    def run_index_job(self, job: Dict[str, Any], progress: JobProgress) -> int:
+        """
+        Ejecutar un trabajo de indexación persistente (ver
+        src/utils/index_jobs.py) desde su punto de control: los lotes de la
+        fuente se numeran (lotes de INDEX_BATCH_SIZE del archivo o páginas
+        de la API) y se saltan los ya confirmados. Informa del progreso por
+        lote y se detiene en el siguiente lote si el trabajo se cancela.
+        
+        La indexación es incremental: solo se vectorizan y almacenan los
+        documentos nuevos o con otra revisión. Con el parámetro
+        `delete_missing`, al terminar se eliminan los documentos almacenados
+        que no estaban en la fuente (que debe ser completa).
+        Devuelve los documentos almacenados en esta ejecución.
+        """
+        params = job["params"]
+        start_batch = progress.checkpoint
+        delete_missing = params.get("delete_missing", False)
+        source_ids = set()
+        
+        def resume(batches):
+            # Los lotes ya confirmados se saltan; con delete_missing se leen sus IDs igualmente
+            for batch, publications in batches:
+                if batch >= start_batch:
+                    yield batch, publications
+                elif delete_missing:
+                    source_ids.update(doc["id"] for doc in self._extract_documents(publications))
+        
+        if job["kind"] == "file":
+            # El tamaño de lote queda fijado al crear el trabajo para que el punto de control siga siendo válido
+            batch_size = params["batch_size"]
+            file_size = os.path.getsize(params["file_path"])
+            
+            def read_file():
+                # El total se conoce al llegar al final; hasta entonces el progreso va por bytes leídos
+                count = 0
+                records = self.protocol.iter_local_json_file(
+                    params["file_path"], on_read=lambda position: progress.read_bytes(position, file_size)
+                )
+                for count, publication in enumerate(records, start=1):
+                    yield publication
+                if progress.total is None:
+                    progress.set_total(count)
+            
+            if delete_missing:
+                source = resume(enumerate(iter_batches(read_file(), batch_size)))
+            else:
+                publications = itertools.islice(read_file(), start_batch * batch_size, None)
+                source = enumerate(iter_batches(publications, batch_size), start=start_batch)
+            source_name = "read"
+        elif job["kind"] == "api":
+            fetcher = self.protocol.fetcher
+            if progress.total is None:
+                progress.set_total(params["limit"])
+            first_batch = 0 if delete_missing else start_batch
+            pages = fetcher.iter_pages(params["limit"], start_page=fetcher.first_page + first_batch)
+            source = resume((page - fetcher.first_page, publications) for page, publications in pages)
+            source_name = "fetch"
+        else:
+            raise ValueError(f"Tipo de trabajo de indexación desconocido: {job['kind']}")
+        
+        def documents_in(chunks):
+            return sum(1 for chunk in chunks if chunk["chunk_index"] == 0)
         
-        # Protocolo: Extraer contenido relevante
-        processed_documents = []
-        vectors = []
+        def extract(item):
+            batch, publications = item
+            progress.check_cancelled()
+            progress.seen(batch, len(publications))
+            documents = self._extract_documents(publications)
+            if delete_missing:
+                source_ids.update(doc["id"] for doc in documents)
+            changed, counts = self._select_changed(documents)
+            progress.compared(batch, **counts)
+            chunks = self._chunk_documents(changed)
+            if chunks is None:
+                # Lote sin documentos nuevos ni cambiados: se confirma sin pasar por las demás etapas
+                progress.commit(batch)
+                return None
+            return batch, chunks
+        
+        def embed(item):
+            batch, chunks = item
+            progress.check_cancelled()
+            chunks, vectors = self._embed_chunks(chunks)
+            progress.embedded(batch, documents_in(chunks))
+            return batch, chunks, vectors
+        
+        def upsert(item):
+            batch, chunks, vectors = item
+            progress.check_cancelled()
+            self._upsert_chunks((chunks, vectors))
+            progress.commit(batch, documents_in(chunks))
+        
+        pipeline = StagedPipeline(
+            source,
+            [
+                Stage("extract", extract, workers=self.config["INDEX_EXTRACT_WORKERS"], count=lambda item: len(item[1])),
+                Stage("embed", embed, workers=self.config["INDEX_EMBED_WORKERS"], count=lambda item: len(item[1])),
+                Stage("upsert", upsert, workers=self.config["INDEX_UPSERT_WORKERS"],
+                      count=lambda item: documents_in(item[1]))
+            ],
+            queue_size=self.config["INDEX_QUEUE_SIZE"],
+            source_name=source_name,
+            source_count=lambda item: len(item[1])
+        )
+        
+        with self.context.bulk_load():
+            self.last_index_stats = pipeline.run()
+        
+        # Contexto: Eliminar en lote lo que ya no existe en el origen (solo con la fuente completa)
+        if delete_missing:
+            progress.check_cancelled()
+            removed = [doc_id for doc_id in self.context.list_document_ids() if doc_id not in source_ids]
+            progress.deleted(self.context.delete_documents(removed))
+        
+        return self.last_index_stats["stages"]["upsert"]["records"]
+    
+    def sync_publications(self,
+                          publications: Iterable[Dict[str, Any]],
+                          delete_missing: bool = True) -> Dict[str, int]:
+        """
+        Sincronizar la colección con un conjunto de publicaciones en memoria
+        o en streaming (para archivos y la API, ver run_index_job con
+        `delete_missing`): solo se vectorizan y almacenan las nuevas o con
+        otra revisión. Con delete_missing, los documentos almacenados que ya
+        no están en el conjunto se eliminan (debe ser el conjunto completo).
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        incoming_ids = set()
         
-        for pub in publications:
-            doc = self.protocol.extract_relevant_content(pub)
-            processed_documents.append(doc)
+        for batch in iter_batches(publications, self.config["INDEX_BATCH_SIZE"]):
+            documents = self._extract_documents(batch)
+            incoming_ids.update(doc["id"] for doc in documents)
             
-            # Modelo: Generar embeddings
-            vector = self.model.create_document_embedding(doc)
-            vectors.append(vector)
+            changed, batch_counts = self._select_changed(documents)
+            for name, count in batch_counts.items():
+                counts[name] += count
+            
+            # Modelo y Contexto: Vectorizar y almacenar solo los cambios
+            self._store_documents(changed)
         
-        # Contexto: Almacenar documentos
-        self.context.store_documents(processed_documents, vectors)
+        # Contexto: Eliminar en lote lo que ya no existe en el origen
+        if delete_missing:
+            removed = [doc_id for doc_id in self.context.list_document_ids() if doc_id not in incoming_ids]
+            counts["deleted"] = self.context.delete_documents(removed)
         
-        return len(processed_documents)
+        return counts
     
-    def query(self, query_text: str, limit: int = 5) -> Dict[str, Any]:
+    def query(self, query_text: str, limit: int = 5,
+              hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> Dict[str, Any]:
         """
         Realizar una consulta completa:
         1. Modelo: Vectorizar consulta
@@ -448,7 +1580,7 @@ class MCPRagService:
         query_vector = self.model.create_embedding(query_text)
         
         # Contexto: Recuperar documentos relevantes
-        relevant_docs = self.context.retrieve_documents(query_vector, limit)
+        relevant_docs = self._retrieve(query_text, query_vector, limit, hnsw_ef=hnsw_ef, exact=exact)
         
         if not relevant_docs:
             return {
@@ -457,21 +1589,606 @@ class MCPRagService:
                 "answer": "No se encontraron documentos relevantes para tu consulta."
             }
         
-        # Modelo: Generar respuesta
-        answer = self.model.generate_response(query_text, relevant_docs)
+        # Modelo: Generar respuesta (o reutilizar la de una consulta equivalente)
+        answer, cached = self._answer(query_text, query_vector, relevant_docs)
         
         # Preparar resultado
         return {
             "query": query_text,
             "documents": relevant_docs,
-            "answer": answer
+            "answer": answer,
+            "cached": cached
         }
     
+    def _retrieve(self, query_text: str, query_vector: List[float], limit: int,
+                  hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Recuperar los `limit` documentos para el contexto. Con reordenación se
+        recuperan RERANK_CANDIDATES_FACTOR veces más candidatos y el
+        cross-encoder elige los mejores.
+        """
+        candidates = limit * max(1, self.config["RERANK_CANDIDATES_FACTOR"]) if self.reranker else limit
+        documents = self.context.retrieve_documents(
+            query_vector, candidates, hnsw_ef=hnsw_ef, exact=exact, query_text=query_text
+        )
+        if self.reranker is not None:
+            documents = self.reranker.rerank(query_text, documents, limit)
+        return documents
+    
+    def query_batch(self, queries: List[str], limit: int = 5,
+                    hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Realizar varias consultas de una vez:
+        1. Modelo: Vectorizar todas las consultas en peticiones por lotes
+        2. Contexto: Recuperar los documentos con una sola búsqueda por lotes
+        3. Modelo: Generar las respuestas con como mucho
+           QUERY_BATCH_LLM_CONCURRENCY llamadas al LLM simultáneas
+        Devuelve un resultado por consulta, en el mismo orden; si la consulta
+        está vacía o falla su embedding o su respuesta, su resultado lleva el
+        error en `error`.
+        """
+        if not queries:
+            return []
+        
+        # Las consultas vacías no se vectorizan ni se buscan
+        valid = [i for i, query_text in enumerate(queries) if query_text.strip()]
+        
+        # Modelo: Vectorizar consultas (None si falló su lote)
+        query_vectors: List[Optional[List[float]]] = [None] * len(queries)
+        if valid:
+            vectors = self.model.create_embeddings([queries[i] for i in valid], fill_failed=False)
+            for i, vector in zip(valid, vectors):
+                query_vectors[i] = vector
+        embedded = [i for i, vector in enumerate(query_vectors) if vector is not None]
+        
+        # Contexto: Recuperar documentos relevantes solo para las consultas vectorizadas
+        documents: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        if embedded:
+            candidates = limit * max(1, self.config["RERANK_CANDIDATES_FACTOR"]) if self.reranker else limit
+            retrieved = self.context.retrieve_documents_batch(
+                [query_vectors[i] for i in embedded], candidates,
+                hnsw_ef=hnsw_ef, exact=exact, query_texts=[queries[i] for i in embedded]
+            )
+            for i, docs in zip(embedded, retrieved):
+                documents[i] = self.reranker.rerank(queries[i], docs, limit) if self.reranker is not None else docs
+        
+        def answer(index: int) -> Dict[str, Any]:
+            query_text, relevant_docs = queries[index], documents[index]
+            result = {"query": query_text, "documents": relevant_docs, "cached": False, "error": None}
+            if not query_text.strip():
+                result["answer"] = None
+                result["error"] = "Error al procesar la consulta: la consulta está vacía"
+                return result
+            if query_vectors[index] is None:
+                # Un vector de ceros devolvería documentos arbitrarios: no se busca ni se llama al LLM
+                result["answer"] = None
+                result["error"] = "Error al procesar la consulta: no se pudo generar el embedding"
+                return result
+            if not relevant_docs:
+                result["answer"] = "No se encontraron documentos relevantes para tu consulta."
+                return result
+            try:
+                result["answer"], result["cached"] = self._answer(
+                    query_text, query_vectors[index], relevant_docs, raise_errors=True
+                )
+            except Exception as e:
+                result["answer"] = None
+                result["error"] = f"Error al procesar la consulta: {str(e)}"
+            return result
+        
+        # Modelo: Generar respuestas con concurrencia limitada
+        workers = max(1, min(self.config.get("QUERY_BATCH_LLM_CONCURRENCY", 8), len(queries)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-batch") as executor:
+            return list(executor.map(answer, range(len(queries))))
+    
+    def _answer(self, query_text: str, query_vector: List[float],
+                relevant_docs: List[Dict[str, Any]], raise_errors: bool = False) -> tuple:
+        """
+        Obtener la respuesta del LLM consultando antes la caché semántica.
+        Devuelve (respuesta, si venía de la caché); los errores no se cachean
+        (y se propagan con `raise_errors`).
+        """
+        doc_ids = [doc["id"] for doc in relevant_docs]
+        
+        if self.answer_cache is not None:
+            generation = self.answer_cache.generation
+            answer = self.answer_cache.lookup(query_vector, doc_ids)
+            if answer is not None:
+                return answer, True
+        
+        start = time.perf_counter()
+        try:
+            answer = self.model.complete(query_text, relevant_docs)
+        except Exception as e:
+            print(f"Error al generar respuesta con LLM: {e}")
+            if raise_errors:
+                raise
+            return f"Error al procesar la consulta: {str(e)}", False
+        
+        if self.answer_cache is not None:
+            self.answer_cache.store(query_vector, doc_ids, answer, time.perf_counter() - start, generation)
+        return answer, False
+    
     def reset_database(self) -> bool:
         """Limpiar la base de datos vectorial"""
         return self.context.clear_collection()
 
 
+# ========================
+# VERSIÓN ASÍNCRONA (ruta de consulta)
+# ========================
+class AsyncModelComponent:
+    """
+    Componente Model asíncrono: embeddings de consulta y respuestas del LLM
+    con AsyncOpenAI, para no bloquear el bucle de eventos del servidor
+    """
+    
+    def __init__(self, openai_client: AsyncOpenAI, config, embedding_provider: Optional[EmbeddingProvider] = None):
+        self.openai_client = openai_client
+        self.config = config
+        self.context_stats = ContextPackingStats()
+        
+        self.embedding_provider = embedding_provider or create_embedding_provider(
+            self.config, async_openai_client=openai_client
+        )
+        self.vector_size = resolve_vector_size(self.embedding_provider, self.config.get("VECTOR_SIZE"))
+        
+        # Micro-lotes: los embeddings de consultas concurrentes se piden juntos
+        self.embedding_batcher = None
+        if self.config.get("EMBEDDING_MICROBATCH_ENABLED"):
+            self.embedding_batcher = MicroBatcher(
+                self._embed_batch,
+                max_wait_ms=self.config["EMBEDDING_MICROBATCH_MAX_WAIT_MS"],
+                max_batch_size=self.config["EMBEDDING_MICROBATCH_MAX_SIZE"]
+            )
+    
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Pedir los embeddings de varios textos en una sola petición (o pasada del modelo local)"""
+        return await self.embedding_provider.aembed(texts)
+    
+    async def warm_up(self) -> None:
+        """
+        Vectorización de prueba: abre la conexión con el servicio de
+        embeddings o carga el modelo local (los errores se propagan)
+        """
+        await self.embedding_provider.awarm_up()
+    
+    async def create_embedding(self, text: str, raise_errors: bool = False) -> List[float]:
+        """
+        Crear un embedding para el texto usando el modelo configurado. Si
+        falla se devuelve un vector de ceros (o se propaga el error con
+        `raise_errors`).
+        """
+        if not text.strip():
+            return np.zeros(self.vector_size).tolist()
+        
+        try:
+            if self.embedding_batcher is not None:
+                return await self.embedding_batcher.submit(text)
+            return (await self.embedding_provider.aembed([text]))[0]
+        except Exception as e:
+            print(f"Error generando embedding: {e}")
+            if raise_errors:
+                raise
+            return np.zeros(self.vector_size).tolist()
+    
+    async def complete(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
+        """Llamar al LLM con el contexto recuperado (los errores se propagan)"""
+        messages, context_stats = build_llm_prompt(
+            query, context_docs, self.config.get("CONTEXT_TOKEN_BUDGET"), self.config.get("CHUNK_SIZE")
+        )
+        self.context_stats.record(context_stats)
+        response = await self.openai_client.chat.completions.create(
+            model=self.config["LLM_MODEL"],
+            messages=messages,
+            temperature=self.config["LLM_TEMPERATURE"]
+        )
+        
+        return response.choices[0].message.content
+    
+    async def generate_response(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
+        """Generar respuesta del LLM basada en el contexto recuperado"""
+        try:
+            return await self.complete(query, context_docs)
+        except Exception as e:
+            print(f"Error al generar respuesta con LLM: {e}")
+            return f"Error al procesar la consulta: {str(e)}"
+    
+    async def stream_response(self, query: str, context_docs: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Generar la respuesta del LLM devolviendo los fragmentos de texto según llegan"""
+        messages, context_stats = build_llm_prompt(
+            query, context_docs, self.config.get("CONTEXT_TOKEN_BUDGET"), self.config.get("CHUNK_SIZE")
+        )
+        self.context_stats.record(context_stats)
+        stream = await self.openai_client.chat.completions.create(
+            model=self.config["LLM_MODEL"],
+            messages=messages,
+            temperature=self.config["LLM_TEMPERATURE"],
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AsyncContextComponent:
+    """
+    Componente Context asíncrono: búsqueda de documentos con AsyncQdrantClient.
+    La creación de la colección y la indexación siguen en ContextComponent.
+    """
+    
+    def __init__(self, qdrant_client: AsyncQdrantClient, config):
+        self.qdrant_client = qdrant_client
+        self.config = config
+        self.profile = get_profile(self.config.get("COLLECTION_PROFILE", "default"))
+        
+        # Se comprueba en la primera búsqueda si la colección tiene vector disperso
+        self.hybrid: Optional[bool] = None
+        self.sparse_encoder = BM25Encoder.from_config(self.config)
+        self.hybrid_stats = HybridSearchStats()
+    
+    async def ping(self) -> None:
+        """
+        Comprobar la conexión con Qdrant y que la dimensión de la colección
+        coincide con la del modelo de embeddings (y detectar de paso si la
+        colección es híbrida)
+        """
+        self.hybrid = None
+        collection_info = await self.qdrant_client.get_collection(self.config["COLLECTION_NAME"])
+        check_collection_vector_size(collection_info, self.config["COLLECTION_NAME"], self.config["VECTOR_SIZE"])
+        await self._hybrid_enabled()
+    
+    async def _hybrid_enabled(self) -> bool:
+        if self.hybrid is None:
+            self.hybrid = False
+            if self.config.get("HYBRID_SEARCH_ENABLED", False):
+                self.hybrid = has_sparse_vectors(
+                    await self.qdrant_client.get_collection(self.config["COLLECTION_NAME"])
+                )
+        return self.hybrid
+    
+    async def retrieve_documents(self,
+                                 query_vector: List[float],
+                                 limit: int = 5,
+                                 fields: Optional[List[str]] = None,
+                                 hnsw_ef: Optional[int] = None,
+                                 exact: Optional[bool] = None,
+                                 query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recuperar documentos por similitud vectorial (y BM25) agrupando sus fragmentos"""
+        chunk_limit = limit * max(1, self.config["CHUNK_SEARCH_FACTOR"])
+        params = search_params(self.profile, hnsw_ef, exact)
+        
+        if query_text and await self._hybrid_enabled():
+            documents = await self._hybrid_search(query_vector, query_text, limit, chunk_limit, fields, params)
+        else:
+            response = await self.qdrant_client.query_points(
+                collection_name=self.config["COLLECTION_NAME"],
+                query=query_vector,
+                limit=chunk_limit,
+                with_payload=search_payload_fields(fields),
+                search_params=params
+            )
+            documents = group_chunks(response.points, limit, self.config["MAX_PASSAGES_PER_DOC"])
+        
+        # Documentos sin pasajes (sin fragmentar): cargar su cuerpo en una sola lectura
+        missing = [doc for doc in documents if not doc["passages"] and "body" not in doc]
+        if missing:
+            loaded = await self.get_documents([doc["id"] for doc in missing], ["body"])
+            bodies = {doc["id"]: doc["body"] for doc in loaded}
+            for doc in missing:
+                doc["body"] = bodies.get(doc["id"], "")
+        
+        return documents
+    
+    async def _hybrid_search(self, query_vector, query_text, limit, chunk_limit, fields, params) -> List[Dict[str, Any]]:
+        """Versión asíncrona de ContextComponent._hybrid_search"""
+        start = time.perf_counter()
+        sparse_vector = self.sparse_encoder.encode_query(query_text)
+        encoded = time.perf_counter()
+        
+        responses = await self.qdrant_client.query_batch_points(
+            collection_name=self.config["COLLECTION_NAME"],
+            requests=hybrid_search_requests(query_vector, sparse_vector, chunk_limit, fields, params)
+        )
+        searched = time.perf_counter()
+        
+        documents = fuse_search_results(
+            responses[0].points,
+            responses[1].points if len(responses) > 1 else [],
+            limit,
+            self.config["MAX_PASSAGES_PER_DOC"],
+            self.config.get("RRF_K", 60)
+        )
+        self.hybrid_stats.record(documents, {
+            "encode": (encoded - start) * 1000,
+            "search": (searched - encoded) * 1000,
+            "fusion": (time.perf_counter() - searched) * 1000
+        })
+        return documents
+    
+    async def get_documents(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Versión asíncrona de ContextComponent.get_documents"""
+        documents = []
+        for start in range(0, len(doc_ids), ContextComponent.BATCH_SIZE):
+            batch = doc_ids[start:start + ContextComponent.BATCH_SIZE]
+            points = await self.qdrant_client.retrieve(
+                collection_name=self.config["COLLECTION_NAME"],
+                ids=document_point_ids(batch),
+                with_payload=["parent_id"] + list(fields or DOCUMENT_FIELDS),
+                with_vectors=False
+            )
+            documents.extend(points_to_documents(points, batch, fields))
+        
+        return documents
+
+
+class AsyncContextAdapter:
+    """
+    Interfaz asíncrona de un componente Context en proceso (p. ej.
+    NumpyContextComponent): las búsquedas se ejecutan en un hilo para no
+    bloquear el bucle de eventos.
+    """
+    
+    def __init__(self, context: BaseContextComponent):
+        self.context = context
+    
+    @property
+    def hybrid_stats(self) -> HybridSearchStats:
+        return self.context.hybrid_stats
+    
+    async def retrieve_documents(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.context.retrieve_documents, *args, **kwargs)
+    
+    async def get_documents(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.context.get_documents, *args, **kwargs)
+    
+    async def ping(self) -> None:
+        await asyncio.to_thread(self.context.ping)
+
+
+class AsyncMCPRagService:
+    """
+    Servicio RAG asíncrono para la ruta de consulta: mientras una consulta
+    espera al modelo o a Qdrant, el bucle de eventos atiende a las demás.
+    Los clientes pueden inyectarse (p. ej. en pruebas). Para que las
+    escrituras del servicio síncrono invaliden la caché semántica, ambos
+    deben compartirla (`answer_cache=servicio.answer_cache`); con embeddings
+    locales, `embedding_provider` evita cargar el modelo dos veces.
+    """
+    
+    def __init__(self,
+                 config: Optional[Dict[str, Any]] = None,
+                 openai_client: Optional[AsyncOpenAI] = None,
+                 qdrant_client: Optional[AsyncQdrantClient] = None,
+                 answer_cache: Optional[SemanticCache] = None,
+                 context: Optional[BaseContextComponent] = None,
+                 reranker: Optional[Reranker] = None,
+                 embedding_provider: Optional[EmbeddingProvider] = None):
+        # Cargar configuración
+        self.config = config or load_config()
+        
+        # Configurar cliente OpenAI asíncrono con base URL opcional
+        if openai_client is None:
+            openai_client_kwargs = {"api_key": self.config["OPENAI_API_KEY"]}
+            if self.config["OPENAI_API_BASE"]:
+                openai_client_kwargs["base_url"] = self.config["OPENAI_API_BASE"]
+            openai_client = AsyncOpenAI(**openai_client_kwargs)
+        
+        self.openai_client = openai_client
+        self.model = AsyncModelComponent(self.openai_client, self.config, embedding_provider)
+        self.config = {**self.config, "VECTOR_SIZE": self.model.vector_size}
+        
+        # Con el backend en proceso, `context` permite compartir el índice con el servicio síncrono
+        self.qdrant_client = None
+        if context is None and self.config.get("CONTEXT_BACKEND", "qdrant") == "numpy":
+            context = NumpyContextComponent(self.config)
+        if context is not None:
+            self.context = AsyncContextAdapter(context)
+        else:
+            self.qdrant_client = qdrant_client or create_async_qdrant_client(self.config)
+            self.context = AsyncContextComponent(self.qdrant_client, self.config)
+        
+        # Caché semántica de respuestas
+        self.answer_cache = answer_cache
+        if self.answer_cache is None and self.config.get("SEMANTIC_CACHE_ENABLED"):
+            self.answer_cache = SemanticCache.from_config(self.config)
+        
+        # Reordenación con cross-encoder (puede compartirse con el servicio síncrono)
+        self.reranker = reranker
+        if self.reranker is None and self.config.get("RERANK_ENABLED"):
+            self.reranker = Reranker.from_config(self.config)
+        
+        # Consultas idénticas simultáneas comparten una sola ejecución
+        self.single_flight = SingleFlight() if self.config.get("QUERY_COALESCING_ENABLED") else None
+    
+    async def _retrieve(self, query_text: str, query_vector: List[float], limit: int,
+                        hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Versión asíncrona de MCPRagService._retrieve (el modelo se ejecuta en un hilo)"""
+        candidates = limit * max(1, self.config["RERANK_CANDIDATES_FACTOR"]) if self.reranker else limit
+        documents = await self.context.retrieve_documents(
+            query_vector, candidates, hnsw_ef=hnsw_ef, exact=exact, query_text=query_text
+        )
+        if self.reranker is not None:
+            documents = await asyncio.to_thread(self.reranker.rerank, query_text, documents, limit)
+        return documents
+    
+    async def query(self, query_text: str, limit: int = 5,
+                    hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Realizar una consulta completa sin bloquear el bucle de eventos. Si ya
+        hay en curso una consulta igual (mismo texto normalizado y parámetros),
+        se espera su resultado en lugar de repetir el trabajo.
+        """
+        if self.single_flight is None:
+            return await self._query(query_text, limit, hnsw_ef, exact)
+        
+        key = (normalize_query(query_text), limit, hnsw_ef, exact)
+        result = await self.single_flight.run(key, lambda: self._query(query_text, limit, hnsw_ef, exact))
+        # Copia por petición: quien llama puede modificar el resultado
+        return {**result, "query": query_text}
+    
+    async def _query(self, query_text: str, limit: int = 5,
+                     hnsw_ef: Optional[int] = None, exact: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Ejecutar una consulta completa:
+        1. Modelo: Vectorizar consulta
+        2. Contexto: Recuperar documentos relevantes
+        3. Modelo: Generar respuesta con LLM
+        """
+        # Modelo: Vectorizar consulta
+        query_vector = await self.model.create_embedding(query_text)
+        
+        # Contexto: Recuperar documentos relevantes
+        relevant_docs = await self._retrieve(query_text, query_vector, limit, hnsw_ef=hnsw_ef, exact=exact)
+        
+        if not relevant_docs:
+            return {
+                "query": query_text,
+                "documents": [],
+                "answer": "No se encontraron documentos relevantes para tu consulta."
+            }
+        
+        # Modelo: Generar respuesta (o reutilizar la de una consulta equivalente)
+        answer, cached = await self._answer(query_text, query_vector, relevant_docs)
+        
+        return {
+            "query": query_text,
+            "documents": relevant_docs,
+            "answer": answer,
+            "cached": cached
+        }
+    
+    async def _answer(self, query_text: str, query_vector: List[float],
+                      relevant_docs: List[Dict[str, Any]]) -> tuple:
+        """Versión asíncrona de MCPRagService._answer"""
+        doc_ids = [doc["id"] for doc in relevant_docs]
+        
+        if self.answer_cache is not None:
+            generation = self.answer_cache.generation
+            answer = self.answer_cache.lookup(query_vector, doc_ids)
+            if answer is not None:
+                return answer, True
+        
+        start = time.perf_counter()
+        try:
+            answer = await self.model.complete(query_text, relevant_docs)
+        except Exception as e:
+            print(f"Error al generar respuesta con LLM: {e}")
+            return f"Error al procesar la consulta: {str(e)}", False
+        
+        if self.answer_cache is not None:
+            self.answer_cache.store(query_vector, doc_ids, answer, time.perf_counter() - start, generation)
+        return answer, False
+    
+    async def query_stream(self, query_text: str, limit: int = 5,
+                           hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Realizar una consulta devolviendo eventos según están disponibles:
+        1. "documents": documentos recuperados, en cuanto termina la búsqueda
+        2. "token": fragmentos de la respuesta a medida que el LLM los genera
+        3. "done": tiempos de cada fase en milisegundos y si la respuesta
+           venía de la caché semántica (en ese caso llega en un solo "token")
+        Si falla la vectorización o la búsqueda se emite "error" (y "done")
+        en lugar de "documents"; si falla el LLM, "error" en lugar de los
+        tokens restantes.
+        """
+        start = time.perf_counter()
+        timings = {}
+        
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - start) * 1000, 1)
+        
+        try:
+            # Modelo: Vectorizar consulta
+            query_vector = await self.model.create_embedding(query_text, raise_errors=True)
+            timings["embedding_ms"] = elapsed_ms()
+            
+            # Contexto: Recuperar documentos relevantes
+            relevant_docs = await self._retrieve(query_text, query_vector, limit, hnsw_ef=hnsw_ef, exact=exact)
+            timings["retrieval_ms"] = elapsed_ms()
+        except Exception as e:
+            print(f"Error al recuperar documentos: {e}")
+            yield {"event": "error", "data": {"detail": f"Error al procesar la consulta: {str(e)}"}}
+            timings["total_ms"] = elapsed_ms()
+            yield {"event": "done", "data": {"timings": timings, "cached": False}}
+            return
+        
+        yield {"event": "documents", "data": {"query": query_text, "documents": relevant_docs}}
+        
+        doc_ids = [doc["id"] for doc in relevant_docs]
+        cached = False
+        
+        if not relevant_docs:
+            yield {"event": "token", "data": {"text": "No se encontraron documentos relevantes para tu consulta."}}
+        else:
+            # Respuesta de una consulta equivalente: se envía de una vez
+            answer = None
+            if self.answer_cache is not None:
+                generation = self.answer_cache.generation
+                answer = self.answer_cache.lookup(query_vector, doc_ids)
+            
+            if answer is not None:
+                cached = True
+                timings["first_token_ms"] = elapsed_ms()
+                yield {"event": "token", "data": {"text": answer}}
+            else:
+                # Modelo: Generar respuesta en streaming
+                generation_start = time.perf_counter()
+                parts = []
+                try:
+                    async for text in self.model.stream_response(query_text, relevant_docs):
+                        if "first_token_ms" not in timings:
+                            timings["first_token_ms"] = elapsed_ms()
+                        parts.append(text)
+                        yield {"event": "token", "data": {"text": text}}
+                except Exception as e:
+                    print(f"Error al generar respuesta con LLM: {e}")
+                    yield {"event": "error", "data": {"detail": f"Error al procesar la consulta: {str(e)}"}}
+                else:
+                    if self.answer_cache is not None:
+                        self.answer_cache.store(query_vector, doc_ids, "".join(parts),
+                                                time.perf_counter() - generation_start, generation)
+        
+        timings["total_ms"] = elapsed_ms()
+        yield {"event": "done", "data": {"timings": timings, "cached": cached}}
+    
+    async def get_document(self, doc_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Cargar un documento completo (o solo `fields`) bajo demanda"""
+        documents = await self.context.get_documents([doc_id], fields)
+        return documents[0] if documents else None
+    
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Preparar el servicio antes de recibir consultas: comprobar el índice
+        vectorial, hacer una vectorización de prueba y cargar el modelo de
+        reordenación. Devuelve el tiempo de cada paso en milisegundos; los
+        errores se propagan.
+        """
+        timings = {}
+        
+        start = time.perf_counter()
+        await self.context.ping()
+        timings["context_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        start = time.perf_counter()
+        await self.model.warm_up()
+        timings["embedding_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        if self.reranker is not None:
+            start = time.perf_counter()
+            await asyncio.to_thread(self.reranker.warm_up)
+            timings["rerank_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        return timings
+    
+    async def close(self) -> None:
+        """Cerrar las conexiones de los clientes asíncronos"""
+        await self.openai_client.close()
+        if self.qdrant_client is not None:
+            await self.qdrant_client.close()
+
 # ============================
 # API SERVICE (opcional para exponer como servicio REST)
 # ============================
@@ -540,4 +2257,8 @@ if __name__ == "__main__":
     
     print("\nDocumentos relevantes:")
     for i, doc in enumerate(result["documents"], 1):
-        print(f"{i}. {doc['title']} (Similitud: {doc['score']:.2f})")
\ No newline at end of file
+        # Con la búsqueda híbrida la puntuación es la de la fusión RRF, no una similitud
+        if rag_service.config["HYBRID_SEARCH_ENABLED"]:
+            print(f"{i}. {doc['title']} (Puntuación RRF: {doc['score']:.4f})")
+        else:
+            print(f"{i}. {doc['title']} (Similitud: {doc['score']:.2f})")
\ No newline at end of file
@@ -0,0 +1,87 @@
+# chunking.py
+"""
+Utilidades para dividir el cuerpo de las publicaciones en fragmentos.
+
+Los modelos de embeddings truncan la entrada a unos cientos de tokens, así
+que un documento largo se divide en ventanas solapadas que se vectorizan por
+separado. Los tokens se aproximan por palabras separadas por espacios.
+"""
+
+import html
+import re
+import uuid
+from html.parser import HTMLParser
+from typing import List
+
+# Espacio de nombres para derivar IDs de fragmento estables
+CHUNK_NAMESPACE = uuid.UUID("6f1c2b9e-5d4a-4e1b-8c3f-0a7d9e2b4c61")
+
+_BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "table", "section"}
+
+
+class _TextExtractor(HTMLParser):
+    """Extrae el texto visible de un fragmento HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def strip_html(text: str) -> str:
+    """Eliminar etiquetas HTML y normalizar los espacios de un texto"""
+    if not text:
+        return ""
+
+    if "<" not in text:
+        return " ".join(html.unescape(text).split())
+
+    extractor = _TextExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return " ".join("".join(extractor.parts).split())
+
+
+def split_into_windows(text: str, size: int, overlap: int) -> List[str]:
+    """
+    Dividir un texto en ventanas de `size` tokens que se solapan `overlap`
+    tokens con la anterior. Con size <= 0 se devuelve el texto completo.
+    """
+    tokens = re.findall(r"\S+", text)
+
+    if not tokens:
+        return []
+
+    if size <= 0 or len(tokens) <= size:
+        return [" ".join(tokens)]
+
+    step = max(1, size - max(0, overlap))
+    windows = []
+
+    for start in range(0, len(tokens), step):
+        windows.append(" ".join(tokens[start:start + size]))
+        if start + size >= len(tokens):
+            break
+
+    return windows
+
+
+def chunk_point_id(parent_id: str, chunk_index: int) -> str:
+    """ID determinista (UUID) del punto que almacena un fragmento"""
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{parent_id}#{chunk_index}"))
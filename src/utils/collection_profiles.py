@@ -0,0 +1,130 @@
+# collection_profiles.py
+"""
+Perfiles de colección de Qdrant.
+
+Cada perfil agrupa las decisiones que afectan a memoria, latencia y recall:
+parámetros del grafo HNSW, cuantización (escalar int8 o binaria) con
+re-puntuación sobre los vectores originales, y si los vectores y el payload
+se guardan en disco. El perfil se elige con COLLECTION_PROFILE y solo se
+aplica al crear la colección; los parámetros de búsqueda del perfil
+(hnsw_ef, rescore, oversampling) se aplican en cada consulta y pueden
+sobrescribirse por petición.
+"""
+
+from typing import Any, Dict, Optional
+
+from qdrant_client.http import models
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # Vectores float32 en RAM, sin cuantización (comportamiento original)
+    "default": {
+        "m": 16,
+        "ef_construct": 100,
+        "quantization": None,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+    },
+    # Más conexiones y exploración: mejor recall a cambio de memoria y latencia
+    "high_recall": {
+        "m": 32,
+        "ef_construct": 256,
+        "quantization": None,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+        "hnsw_ef": 256,
+    },
+    # int8 en RAM (4x menos memoria), re-puntuación con los originales
+    "scalar": {
+        "m": 16,
+        "ef_construct": 100,
+        "quantization": "scalar",
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+        "rescore": True,
+        "oversampling": 2.0,
+    },
+    # int8 en RAM y originales y payload en disco: para colecciones mayores que la RAM
+    "scalar_on_disk": {
+        "m": 16,
+        "ef_construct": 100,
+        "quantization": "scalar",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "rescore": True,
+        "oversampling": 2.0,
+    },
+    # 1 bit por dimensión (32x menos memoria); adecuado para vectores de muchas dimensiones
+    "binary_on_disk": {
+        "m": 16,
+        "ef_construct": 100,
+        "quantization": "binary",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "rescore": True,
+        "oversampling": 3.0,
+    },
+}
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """Obtener un perfil por nombre"""
+    if name not in PROFILES:
+        raise ValueError(f"Perfil de colección desconocido: {name}. "
+                         f"Perfiles disponibles: {', '.join(sorted(PROFILES))}")
+    return PROFILES[name]
+
+
+def _quantization_config(profile: Dict[str, Any]):
+    if profile["quantization"] == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    if profile["quantization"] == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return None
+
+
+def collection_params(profile: Dict[str, Any], vector_size: int,
+                      distance: models.Distance = models.Distance.COSINE) -> Dict[str, Any]:
+    """Argumentos de create_collection para un perfil"""
+    return {
+        "vectors_config": models.VectorParams(
+            size=vector_size,
+            distance=distance,
+            on_disk=profile["on_disk_vectors"]
+        ),
+        "hnsw_config": models.HnswConfigDiff(
+            m=profile["m"],
+            ef_construct=profile["ef_construct"]
+        ),
+        "quantization_config": _quantization_config(profile),
+        "on_disk_payload": profile["on_disk_payload"],
+    }
+
+
+def search_params(profile: Dict[str, Any],
+                  hnsw_ef: Optional[int] = None,
+                  exact: Optional[bool] = None) -> Optional[models.SearchParams]:
+    """
+    Parámetros de búsqueda del perfil con los valores de la petición
+    (`hnsw_ef`, `exact`) por encima de los del perfil. None si no hay
+    nada que ajustar.
+    """
+    hnsw_ef = hnsw_ef or profile.get("hnsw_ef")
+    quantization = None
+    if profile["quantization"]:
+        quantization = models.QuantizationSearchParams(
+            rescore=profile.get("rescore", True),
+            oversampling=profile.get("oversampling")
+        )
+
+    if not hnsw_ef and not exact and quantization is None:
+        return None
+
+    return models.SearchParams(hnsw_ef=hnsw_ef, exact=bool(exact), quantization=quantization)
@@ -0,0 +1,207 @@
+# context_packer.py
+"""
+Empaquetado del contexto del LLM dentro de un presupuesto de tokens.
+
+En lugar de cortar cada cuerpo a un número fijo de caracteres (con etiquetas
+HTML incluidas), el contexto se llena pasaje a pasaje hasta el presupuesto:
+
+- Se elimina el HTML de cuerpos y resúmenes.
+- Los documentos sin pasajes se dividen en ventanas de `window_words`; los
+  que tampoco tienen cuerpo aportan solo su cabecera (título y resumen).
+- Se toma primero el mejor pasaje de cada documento (en el orden de
+  relevancia recibido), después el segundo de cada uno, etc.
+- El texto que se solapa con pasajes ya incluidos (fragmentos contiguos o
+  contenido repetido entre documentos) se recorta o se descarta.
+- Un pasaje que no cabe entero se recorta si queda sitio suficiente.
+
+Devuelve el texto del contexto y cuántos tokens usó.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.utils.chunking import strip_html, split_into_windows
+from src.utils.tokens import estimate_tokens, truncate_to_tokens
+
+# Palabras por "shingle" para detectar texto repetido
+SHINGLE_SIZE = 8
+
+# Fracción mínima de texto nuevo para incluir un pasaje
+MIN_NOVELTY = 0.2
+
+# Un pasaje no se recorta por debajo de estos tokens
+MIN_PASSAGE_TOKENS = 32
+
+# Tokens máximos del resumen en la cabecera de cada documento
+MAX_SUMMARY_TOKENS = 120
+
+HEADER = "Información relevante:\n\n"
+SEPARATOR = "\n---\n\n"
+
+
+def _shingles(words: List[str]) -> List[Tuple[str, ...]]:
+    if len(words) < SHINGLE_SIZE:
+        return [tuple(words)] if words else []
+    return [tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def _remove_overlap(text: str, seen: Set[Tuple[str, ...]]) -> Optional[str]:
+    """
+    Recortar el principio y el final del texto que ya aparecen en `seen`
+    (solape entre fragmentos contiguos). None si queda muy poco texto nuevo.
+    """
+    words = text.split()
+    shingles = _shingles(words)
+    if not shingles:
+        return None
+
+    start, end = 0, len(shingles)
+    while start < end and shingles[start] in seen:
+        start += 1
+    while end > start and shingles[end - 1] in seen:
+        end -= 1
+    if start >= end:
+        return None
+
+    novel = sum(1 for shingle in shingles[start:end] if shingle not in seen)
+    if novel < MIN_NOVELTY * len(shingles):
+        return None
+
+    # Un shingle ya visto cubre sus SHINGLE_SIZE palabras: se descartan todas
+    first_word = start + SHINGLE_SIZE - 1 if start > 0 else 0
+    last_word = end if end < len(shingles) else len(words)
+    if first_word >= last_word:
+        return None
+    return " ".join(words[first_word:last_word])
+
+
+def _document_header(index: int, doc: Dict[str, Any]) -> str:
+    header = f"Documento {index}:\nTítulo: {strip_html(doc.get('title', ''))}\n"
+    summary = strip_html(doc.get("summary", ""))
+    if summary:
+        header += f"Resumen: {truncate_to_tokens(summary, MAX_SUMMARY_TOKENS)}\n"
+    return header
+
+
+def _candidate_passages(doc: Dict[str, Any], window_words: int) -> List[Dict[str, Any]]:
+    """Pasajes del documento de mayor a menor relevancia"""
+    if doc.get("passages"):
+        return [
+            {"text": strip_html(passage["text"]), "position": passage.get("chunk_index", i)}
+            for i, passage in enumerate(doc["passages"])
+        ]
+    # Sin fragmentos: ventanas del cuerpo, por orden de aparición
+    windows = split_into_windows(strip_html(doc.get("body", "")), window_words, 0)
+    return [{"text": text, "position": i} for i, text in enumerate(windows)]
+
+
+def pack_context(documents: List[Dict[str, Any]],
+                 token_budget: int,
+                 window_words: int = 200) -> Tuple[str, Dict[str, Any]]:
+    """
+    Construir el contexto con los pasajes más valiosos que caben en
+    `token_budget` tokens. Devuelve el texto y sus estadísticas
+    (tokens usados, documentos y pasajes incluidos, recortados, duplicados
+    descartados y pasajes que no cupieron).
+    """
+    candidates = [_candidate_passages(doc, window_words) for doc in documents]
+    selected: Dict[int, List[Dict[str, Any]]] = {}
+    seen: Set[Tuple[str, ...]] = set()
+    used = estimate_tokens(HEADER)
+    stats = {"truncated": 0, "duplicates_removed": 0, "dropped": 0}
+
+    # Ronda k: el k-ésimo mejor pasaje de cada documento, en orden de relevancia
+    rounds = max((len(passages) for passages in candidates), default=0)
+    for k in range(max(rounds, 1)):
+        for doc_index, passages in enumerate(candidates):
+            if k == 0 and not passages:
+                # Sin pasajes ni cuerpo: el título y el resumen siguen siendo contexto útil
+                doc = documents[doc_index]
+                if not strip_html(doc.get("title", "")) and not strip_html(doc.get("summary", "")):
+                    continue
+                cost = estimate_tokens(_document_header(len(selected) + 1, doc)) + estimate_tokens(SEPARATOR)
+                if used + cost > token_budget:
+                    stats["dropped"] += 1
+                    continue
+                selected[doc_index] = []
+                used += cost
+                continue
+            if k >= len(passages):
+                continue
+
+            text = _remove_overlap(passages[k]["text"], seen)
+            if text is None:
+                stats["duplicates_removed"] += 1
+                continue
+
+            # La cabecera del documento se cuenta con su primer pasaje
+            cost = 0 if doc_index in selected else (
+                estimate_tokens(_document_header(len(selected) + 1, documents[doc_index]))
+                + estimate_tokens("Fragmentos relevantes:\n") + estimate_tokens(SEPARATOR)
+            )
+            available = token_budget - used - cost - estimate_tokens("- \n")
+            if available < estimate_tokens(text):
+                if available < MIN_PASSAGE_TOKENS:
+                    stats["dropped"] += 1
+                    continue
+                text = truncate_to_tokens(text, available - 1).rsplit(" ", 1)[0] + "..."
+                stats["truncated"] += 1
+
+            selected.setdefault(doc_index, []).append({"text": text, "position": passages[k]["position"]})
+            seen.update(_shingles(text.split()))
+            used += cost + estimate_tokens(f"- {text}\n")
+
+    # Documentos en su orden de relevancia y pasajes en el orden del texto
+    sections = []
+    for doc_index in sorted(selected):
+        section = _document_header(len(sections) + 1, documents[doc_index])
+        if selected[doc_index]:
+            section += "Fragmentos relevantes:\n"
+        for passage in sorted(selected[doc_index], key=lambda p: p["position"]):
+            section += f"- {passage['text']}\n"
+        sections.append(section)
+
+    context = HEADER + "".join(section + SEPARATOR for section in sections)
+    stats.update({
+        "tokens_used": estimate_tokens(context),
+        "token_budget": token_budget,
+        "documents": len(sections),
+        "passages": sum(len(passages) for passages in selected.values()),
+    })
+    return context, stats
+
+
+class ContextPackingStats:
+    """Métricas acumuladas del empaquetado de contexto"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.tokens_used = 0
+        self.max_tokens_used = 0
+        self.passages = 0
+        self.truncated = 0
+        self.duplicates_removed = 0
+        self.dropped = 0
+
+    def record(self, stats: Dict[str, Any]) -> None:
+        with self._lock:
+            self.prompts += 1
+            self.tokens_used += stats["tokens_used"]
+            self.max_tokens_used = max(self.max_tokens_used, stats["tokens_used"])
+            self.passages += stats["passages"]
+            self.truncated += stats["truncated"]
+            self.duplicates_removed += stats["duplicates_removed"]
+            self.dropped += stats["dropped"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "avg_tokens_used": round(self.tokens_used / self.prompts, 1) if self.prompts else 0.0,
+                "max_tokens_used": self.max_tokens_used,
+                "avg_passages": round(self.passages / self.prompts, 2) if self.prompts else 0.0,
+                "truncated": self.truncated,
+                "duplicates_removed": self.duplicates_removed,
+                "dropped": self.dropped
+            }
@@ -0,0 +1,166 @@
+# embedding_cache.py
+"""
+Caché persistente de embeddings direccionada por contenido.
+
+Cada entrada se identifica por el hash del modelo de embeddings y del texto
+normalizado, de modo que un texto sin cambios no vuelve a pasar por el
+modelo. Se guarda en SQLite con un límite de entradas y expulsión LRU.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Límite de parámetros por consulta en SQLite
+_SQL_CHUNK = 500
+
+
+class EmbeddingCache:
+    """Caché en disco de embeddings con expulsión LRU y contadores de uso"""
+
+    def __init__(self, path: str, model_name: str, vector_size: int, max_entries: int = 200000):
+        self.path = path
+        self.model_name = model_name
+        self.vector_size = vector_size
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._setup()
+
+    def _setup(self) -> None:
+        """Crear las tablas e invalidar las entradas si cambió el tamaño del vector"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, vector_size INTEGER NOT NULL)"
+            )
+
+            row = self._conn.execute(
+                "SELECT vector_size FROM models WHERE model = ?", (self.model_name,)
+            ).fetchone()
+
+            if row is not None and row[0] != self.vector_size:
+                print(f"Tamaño de vector cambiado para {self.model_name}: invalidando caché de embeddings")
+                self._conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO models (model, vector_size) VALUES (?, ?)",
+                (self.model_name, self.vector_size)
+            )
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalizar un texto para que variaciones de espaciado compartan entrada"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(self, text: str) -> str:
+        """Clave de la entrada: hash del modelo y del texto normalizado"""
+        content = f"{self.model_name}\0{self.normalize_text(text)}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Buscar varios textos en la caché con consultas por lotes.
+        Devuelve una lista alineada con la entrada con None para los fallos.
+        """
+        keys = [self.make_key(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock, self._conn:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), _SQL_CHUNK):
+                chunk = unique_keys[start:start + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+                # Marcar los aciertos como usados recientemente
+                hit_keys = [key for key, _ in rows]
+                if hit_keys:
+                    placeholders = ",".join("?" * len(hit_keys))
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_access = ? WHERE key IN ({placeholders})",
+                        [time.time()] + hit_keys
+                    )
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Guardar varios embeddings y expulsar los menos usados si se supera el límite"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.make_key(text), self.model_name, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+
+    def clear(self) -> None:
+        """Eliminar todas las entradas de la caché"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embeddings")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso de la caché"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,212 @@
+# embedding_providers.py
+"""
+Proveedores de embeddings intercambiables para el componente Model.
+
+- LocalEmbeddingProvider: SentenceTransformer (o su exportación a ONNX
+  Runtime) en el propio proceso; la vectorización de la consulta no hace
+  ninguna llamada externa
+- OpenAIEmbeddingProvider: API de embeddings de OpenAI o compatible
+
+Todos exponen la misma interfaz: `embed` (síncrono), `aembed` (asíncrono),
+`dimension` (detectada del modelo) y `model_id` (clave de la caché de
+embeddings). EMBEDDING_PROVIDER elige el proveedor ("openai" o "local").
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+
+from openai import OpenAI, AsyncOpenAI
+
+from src.utils.local_embeddings import encode_batch
+
+
+class EmbeddingProvider:
+    """Interfaz común de los proveedores de embeddings"""
+
+    def __init__(self, model_name: str, dimension: Optional[int] = None):
+        self.model_name = model_name
+        self._dimension = dimension
+
+    @property
+    def model_id(self) -> str:
+        """Identificador de los vectores que produce (clave de la caché de embeddings)"""
+        return self.model_name
+
+    @property
+    def dimension(self) -> int:
+        """Dimensión de los vectores, detectada la primera vez que se consulta"""
+        if self._dimension is None:
+            self._dimension = self._detect_dimension()
+        return self._dimension
+
+    def _detect_dimension(self) -> int:
+        return len(self.embed(["dimension"])[0])
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Vectorizar varios textos, en el orden de entrada (los errores se propagan)"""
+        raise NotImplementedError
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Versión asíncrona de `embed`; por defecto se ejecuta en un hilo"""
+        return await asyncio.to_thread(self.embed, texts)
+
+    def warm_up(self) -> None:
+        """Vectorización de prueba (carga el modelo o abre la conexión)"""
+        self.embed(["warm-up"])
+
+    async def awarm_up(self) -> None:
+        await self.aembed(["warm-up"])
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Embeddings con un modelo de SentenceTransformer local (PyTorch u ONNX Runtime)"""
+
+    def __init__(self,
+                 model_name: str,
+                 backend: str = "torch",
+                 batch_size: int = 32,
+                 onnx_dir: str = ".cache/onnx",
+                 quantize: bool = True,
+                 intra_op_threads: int = 0,
+                 inter_op_threads: int = 0,
+                 model=None):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Backend de embeddings locales desconocido: {backend}. Valores admitidos: torch, onnx")
+        super().__init__(model_name)
+        self.backend = backend
+        self.batch_size = batch_size
+        self.onnx_dir = onnx_dir
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+        # Cualquier objeto con encode() y get_sentence_embedding_dimension() sirve (p. ej. en pruebas)
+        self._model = model
+        self._model_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LocalEmbeddingProvider":
+        """Crear el proveedor a partir de la configuración del servicio"""
+        return cls(
+            config["LOCAL_EMBEDDING_MODEL"],
+            backend=config.get("LOCAL_EMBEDDING_BACKEND", "torch"),
+            batch_size=config.get("LOCAL_EMBEDDING_BATCH_SIZE", 32),
+            onnx_dir=config.get("ONNX_MODEL_DIR", ".cache/onnx"),
+            quantize=config.get("ONNX_QUANTIZE", True),
+            intra_op_threads=config.get("ONNX_INTRA_OP_THREADS", 0),
+            inter_op_threads=config.get("ONNX_INTER_OP_THREADS", 0)
+        )
+
+    @property
+    def model_id(self) -> str:
+        # Los vectores int8 no coinciden con los de PyTorch: no deben mezclarse en la caché
+        if self.backend == "onnx" and self.quantize:
+            return f"{self.model_name}@onnx-int8"
+        return self.model_name
+
+    @property
+    def model(self):
+        """Modelo local, cargado la primera vez que se necesita"""
+        with self._model_lock:
+            if self._model is None:
+                self._model = self._load_model()
+            return self._model
+
+    def _load_model(self):
+        if self.backend == "onnx":
+            from src.utils.onnx_embeddings import load_onnx_encoder
+
+            print(f"Cargando el modelo {self.model_name} con ONNX Runtime")
+            return load_onnx_encoder(
+                self.model_name,
+                self.onnx_dir,
+                quantize=self.quantize,
+                intra_op_threads=self.intra_op_threads,
+                inter_op_threads=self.inter_op_threads
+            )
+
+        # Importación diferida: torch y sentence-transformers tardan varios segundos en importarse
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"Cargando el modelo {self.model_name} en {device}")
+        return SentenceTransformer(self.model_name, device=device, trust_remote_code=True)
+
+    def _detect_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return encode_batch(self.model, texts, batch_size=self.batch_size).tolist()
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeddings con la API de OpenAI o compatible. Sin `dimension`, se
+    detecta con una petición de prueba.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 client: Optional[OpenAI] = None,
+                 async_client: Optional[AsyncOpenAI] = None,
+                 dimension: Optional[int] = None):
+        super().__init__(model_name, dimension)
+        self.client = client
+        self.async_client = async_client
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(input=texts, model=self.model_name)
+        # La API puede devolver los resultados en otro orden: usar su índice
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        if self.async_client is None:
+            return await super().aembed(texts)
+        response = await self.async_client.embeddings.create(input=texts, model=self.model_name)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def create_embedding_provider(config: Dict[str, Any],
+                              openai_client: Optional[OpenAI] = None,
+                              async_openai_client: Optional[AsyncOpenAI] = None) -> EmbeddingProvider:
+    """
+    Crear el proveedor indicado en EMBEDDING_PROVIDER: "openai" (por
+    defecto) o "local". Con el proveedor remoto, si solo se pasa el cliente
+    asíncrono se crea uno síncrono equivalente para detectar la dimensión.
+    VECTOR_SIZE no se usa como dimensión: la dimensión se detecta siempre
+    del modelo y resolve_vector_size la compara con el valor configurado.
+    """
+    provider = config.get("EMBEDDING_PROVIDER", "openai")
+    if provider == "local":
+        return LocalEmbeddingProvider.from_config(config)
+    if provider != "openai":
+        raise ValueError(f"Proveedor de embeddings desconocido: {provider}. Valores admitidos: openai, local")
+
+    if openai_client is None and async_openai_client is not None:
+        openai_client = OpenAI(api_key=async_openai_client.api_key, base_url=async_openai_client.base_url)
+    elif openai_client is None:
+        openai_client_kwargs = {"api_key": config["OPENAI_API_KEY"]}
+        if config.get("OPENAI_API_BASE"):
+            openai_client_kwargs["base_url"] = config["OPENAI_API_BASE"]
+        openai_client = OpenAI(**openai_client_kwargs)
+
+    return OpenAIEmbeddingProvider(
+        config["EMBEDDING_MODEL"],
+        client=openai_client,
+        async_client=async_openai_client
+    )
+
+
+def resolve_vector_size(provider: EmbeddingProvider, configured: Optional[int] = None) -> int:
+    """
+    Dimensión de los embeddings del servicio: la del proveedor. Si
+    VECTOR_SIZE está fijado y no coincide, se lanza ValueError al arrancar
+    en lugar de fallar en la primera escritura o búsqueda.
+    """
+    dimension = provider.dimension
+    if configured and configured != dimension:
+        raise ValueError(f"VECTOR_SIZE={configured} no coincide con la dimensión del modelo de embeddings "
+                         f"{provider.model_id} ({dimension})")
+    return dimension
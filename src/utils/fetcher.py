@@ -0,0 +1,189 @@
+# fetcher.py
+"""
+Descarga paginada de publicaciones desde la API de origen.
+
+Recorre la API página a página con una sesión HTTP con conexiones
+persistentes, mantiene un número acotado de páginas en curso, reintenta los
+errores transitorios con espera exponencial y jitter, y entrega cada página
+en cuanto llega para que las etapas siguientes no esperen a la descarga
+completa.
+"""
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Códigos HTTP que se consideran transitorios
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Error definitivo al descargar una página de publicaciones"""
+
+
+class PublicationFetcher:
+    """Cliente paginado, concurrente y con reintentos para la API de publicaciones"""
+
+    def __init__(self,
+                 endpoint: str,
+                 page_size: int = 100,
+                 concurrency: int = 4,
+                 max_retries: int = 5,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 timeout: float = 30.0,
+                 page_param: str = "page",
+                 limit_param: str = "limit",
+                 first_page: int = 0):
+        self.endpoint = endpoint
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.page_param = page_param
+        self.limit_param = limit_param
+        self.first_page = first_page
+
+        # Sesión compartida: reutiliza conexiones (keep-alive) entre páginas
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests_made = 0
+        self.retries = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PublicationFetcher":
+        """Crear el cliente a partir de la configuración del servicio"""
+        return cls(
+            config["API_ENDPOINT"],
+            page_size=config["API_PAGE_SIZE"],
+            concurrency=config["API_CONCURRENCY"],
+            max_retries=config["API_MAX_RETRIES"],
+            backoff_base=config["API_BACKOFF_BASE"],
+            backoff_max=config["API_BACKOFF_MAX"],
+            timeout=config["API_TIMEOUT"],
+            page_param=config["API_PAGE_PARAM"],
+            limit_param=config["API_LIMIT_PARAM"],
+            first_page=config["API_FIRST_PAGE"]
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def fetch_page(self, page: int) -> List[Dict[str, Any]]:
+        """Descargar una página reintentando los errores transitorios"""
+        params = {self.limit_param: self.page_size, self.page_param: page}
+
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.requests_made += 1
+
+            try:
+                response = self.session.get(self.endpoint, params=params, timeout=self.timeout)
+
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        # Cuerpo truncado o página de error de un proxy con estado 200
+                        error = FetchError(f"Respuesta no JSON en la página {page}: {e}")
+                elif response.status_code not in RETRYABLE_STATUS:
+                    raise FetchError(f"Error al obtener la página {page}: {response.status_code}")
+                else:
+                    error = FetchError(f"Error al obtener la página {page}: {response.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt == self.max_retries:
+                raise FetchError(f"Página {page} fallida tras {self.max_retries} reintentos: {error}")
+
+            with self._lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt))
+
+    def iter_pages(self, limit: Optional[int] = None,
+                   start_page: Optional[int] = None) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Recorrer la API y devolver pares (número de página, publicaciones)
+        en el orden en que llegan. La descarga termina con la primera página
+        incompleta o vacía, o al alcanzar `limit` publicaciones (contadas
+        desde la primera página aunque se empiece en `start_page`, p. ej.
+        al reanudar un trabajo).
+        """
+        max_pages = math.ceil(limit / self.page_size) if limit else None
+        last_page = None  # Última página con datos, conocida al ver una página incompleta
+        next_page = self.first_page if start_page is None else max(self.first_page, start_page)
+        seen_first_records = set()
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        in_flight = {}
+
+        def can_schedule():
+            if last_page is not None and next_page > last_page:
+                return False
+            if max_pages is not None and next_page >= self.first_page + max_pages:
+                return False
+            return True
+
+        try:
+            while True:
+                # Mantener como mucho `concurrency` páginas en curso
+                while len(in_flight) < self.concurrency and can_schedule():
+                    in_flight[executor.submit(self.fetch_page, next_page)] = next_page
+                    next_page += 1
+
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    page = in_flight.pop(future)
+                    publications = future.result()
+
+                    if len(publications) < self.page_size:
+                        last_page = page if last_page is None else min(last_page, page)
+
+                    # Páginas pedidas de más después del final
+                    if last_page is not None and page > last_page:
+                        continue
+
+                    # Una API que ignora la paginación devolvería siempre la misma página
+                    if publications:
+                        fingerprint = repr(publications[0])
+                        if fingerprint in seen_first_records:
+                            print(f"La página {page} repite datos: la API no parece paginar")
+                            last_page = page - 1 if last_page is None else min(last_page, page - 1)
+                            continue
+                        seen_first_records.add(fingerprint)
+
+                    if limit:
+                        allowed = limit - (page - self.first_page) * self.page_size
+                        publications = publications[:allowed]
+
+                    if publications:
+                        yield page, publications
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def fetch_all(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Descargar todas las publicaciones, ordenadas por página"""
+        pages = sorted(self.iter_pages(limit), key=lambda item: item[0])
+        return [publication for _, publication_list in pages for publication in publication_list]
+
+    def close(self) -> None:
+        self.session.close()
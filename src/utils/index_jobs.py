@@ -0,0 +1,388 @@
+# index_jobs.py
+"""
+Trabajos de indexación persistentes.
+
+Cada trabajo (indexar un archivo o la API de publicaciones) recibe un
+identificador y se guarda en SQLite con su estado, su progreso y un punto
+de control. Un pool de hilos propio los ejecuta, fuera de los hilos que
+atienden las peticiones.
+
+- Progreso: documentos leídos, vectorizados y almacenados (y cuántos eran
+  nuevos, cambiados, sin cambios o se eliminaron), ritmo y tiempo
+  estimado hasta terminar. Con un archivo, el total de documentos solo se
+  conoce al terminar de leerlo; mientras tanto el progreso y el tiempo
+  estimado se basan en los bytes leídos.
+- Cancelación: el trabajo se detiene en el siguiente lote.
+- Punto de control: los lotes de la fuente se numeran y el trabajo guarda
+  cuántos hay almacenados sin huecos (varios hilos pueden terminarlos
+  fuera de orden). Un trabajo interrumpido (reinicio del proceso o stop)
+  vuelve a la cola al arrancar y continúa desde ese lote. Los lotes
+  posteriores que ya se habían almacenado se repiten; la escritura es
+  idempotente (mismos ids de punto).
+
+La ejecución de cada trabajo la hace un `runner(job, progress)` (ver
+MCPRagService.run_index_job); este módulo solo gestiona la cola, el estado
+y el progreso.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+COUNTERS = ("docs_seen", "docs_embedded", "docs_upserted",
+            "docs_added", "docs_updated", "docs_unchanged", "docs_deleted")
+
+
+class JobCancelled(Exception):
+    """El trabajo se canceló mientras se ejecutaba"""
+
+
+class JobInterrupted(Exception):
+    """El trabajo se detuvo al parar el pool; continuará desde su punto de control"""
+
+
+class JobStore:
+    """Estado de los trabajos de indexación en SQLite (ruta vacía: solo en memoria)"""
+
+    def __init__(self, path: str = ""):
+        self.path = path or ":memory:"
+        directory = os.path.dirname(path) if path else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, error TEXT, "
+                "total INTEGER, checkpoint INTEGER NOT NULL DEFAULT 0, "
+                "committed TEXT NOT NULL DEFAULT '{}', progress TEXT NOT NULL DEFAULT '{}')"
+            )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["committed"] = json.loads(job["committed"])
+        job["progress"] = json.loads(job["progress"])
+        return job
+
+    def create(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO index_jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), QUEUED, time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM index_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def list(self, statuses: Optional[List[str]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Trabajos más recientes primero, opcionalmente filtrados por estado"""
+        query = "SELECT * FROM index_jobs"
+        params: List[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def update(self, job_id: str, **fields) -> None:
+        for name in ("params", "committed", "progress"):
+            if name in fields:
+                fields[name] = json.dumps(fields[name])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE index_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobProgress:
+    """
+    Progreso de un trabajo en ejecución. El runner informa de cada lote
+    (`seen`, `embedded`, `committed`) y llama a `check_cancelled` entre
+    pasos; el punto de control avanza solo con lotes consecutivos.
+    """
+
+    def __init__(self, store: JobStore, job: Dict[str, Any]):
+        self.store = store
+        self.job_id = job["id"]
+        self.total: Optional[int] = job["total"]
+        self.bytes_read: Optional[int] = None
+        self.bytes_total: Optional[int] = None
+        self._bytes_at_start: Optional[int] = None
+        self.checkpoint: int = job["checkpoint"]
+        self.committed = {name: job["committed"].get(name, 0) for name in COUNTERS}
+
+        # Contadores en vivo: lo confirmado más lo que está en curso
+        self.counters = dict(self.committed)
+        self.started = time.time()
+        self._upserted_at_start = self.counters["docs_upserted"]
+        self._seen_at_start = self.committed["docs_seen"]
+
+        self._lock = threading.Lock()
+        self._batches: Dict[int, Dict[str, int]] = {}
+        self._done: set = set()
+
+        self.cancel_event = threading.Event()
+        self.interrupt_event = threading.Event()
+
+    def check_cancelled(self) -> None:
+        if self.interrupt_event.is_set():
+            raise JobInterrupted()
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_total(self, total: Optional[int]) -> None:
+        self.total = total
+        self.store.update(self.job_id, total=total)
+
+    def read_bytes(self, position: int, size: int) -> None:
+        """Posición de lectura de la fuente, en bytes, sobre su tamaño total"""
+        with self._lock:
+            if self._bytes_at_start is None:
+                self._bytes_at_start = position
+            self.bytes_read = position
+            self.bytes_total = size
+
+    def _add(self, batch: int, name: str, count: int) -> None:
+        counts = self._batches.setdefault(batch, dict.fromkeys(COUNTERS, 0))
+        counts[name] += count
+        self.counters[name] += count
+
+    def seen(self, batch: int, count: int) -> None:
+        with self._lock:
+            self._add(batch, "docs_seen", count)
+
+    def embedded(self, batch: int, count: int) -> None:
+        with self._lock:
+            self._add(batch, "docs_embedded", count)
+
+    def compared(self, batch: int, added: int, updated: int, unchanged: int) -> None:
+        """Resultado de comparar las revisiones del lote con las almacenadas"""
+        with self._lock:
+            self._add(batch, "docs_added", added)
+            self._add(batch, "docs_updated", updated)
+            self._add(batch, "docs_unchanged", unchanged)
+
+    def deleted(self, count: int) -> None:
+        """Documentos eliminados al terminar por no estar en la fuente"""
+        with self._lock:
+            self.counters["docs_deleted"] += count
+            self.committed["docs_deleted"] += count
+            self.store.update(self.job_id, committed=self.committed, progress=self._snapshot())
+
+    def commit(self, batch: int, upserted: int = 0) -> None:
+        """Lote almacenado: avanzar el punto de control y guardarlo"""
+        with self._lock:
+            self._add(batch, "docs_upserted", upserted)
+            self._done.add(batch)
+            advanced = False
+            while self.checkpoint in self._done:
+                self._done.discard(self.checkpoint)
+                for name, count in self._batches.pop(self.checkpoint, {}).items():
+                    self.committed[name] += count
+                self.checkpoint += 1
+                advanced = True
+            if advanced:
+                self.store.update(self.job_id, checkpoint=self.checkpoint,
+                                  committed=self.committed, progress=self._snapshot())
+
+    def _snapshot(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started
+        upserted = self.counters["docs_upserted"] - self._upserted_at_start
+        rate = upserted / elapsed if elapsed > 0 else 0.0
+
+        # El tiempo restante se estima con las publicaciones de lotes ya confirmados
+        # o, si aún no se conoce el total, con los bytes leídos de la fuente
+        eta = None
+        confirmed = self.committed["docs_seen"] - self._seen_at_start
+        if self.total and confirmed > 0 and elapsed > 0:
+            eta = round(max(0, self.total - self.committed["docs_seen"]) * elapsed / confirmed, 1)
+        elif self.bytes_total and elapsed > 0 and self.bytes_read > self._bytes_at_start:
+            eta = round((self.bytes_total - self.bytes_read) * elapsed / (self.bytes_read - self._bytes_at_start), 1)
+
+        return {
+            **self.counters,
+            "total": self.total,
+            "bytes_read": self.bytes_read,
+            "bytes_total": self.bytes_total,
+            "checkpoint_batches": self.checkpoint,
+            "elapsed_seconds": round(elapsed, 2),
+            "rate_per_second": round(rate, 2),
+            "eta_seconds": eta
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._snapshot()
+
+
+class IndexJobManager:
+    """
+    Cola de trabajos de indexación con un pool de hilos propio.
+    `runner(job, progress)` ejecuta un trabajo desde `progress.checkpoint`.
+    """
+
+    def __init__(self, store: JobStore, runner: Callable[[Dict[str, Any], JobProgress], Any], workers: int = 1):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._running: Dict[str, JobProgress] = {}
+        self._running_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], runner) -> "IndexJobManager":
+        """Crear el gestor a partir de la configuración del servicio"""
+        return cls(JobStore(config.get("INDEX_JOBS_PATH", "")), runner, workers=config.get("INDEX_JOB_WORKERS", 1))
+
+    def start(self) -> "IndexJobManager":
+        """Arrancar el pool y volver a encolar los trabajos pendientes o interrumpidos"""
+        pending = self.store.list([QUEUED, RUNNING], limit=-1)
+        for job in sorted(pending, key=lambda job: job["created_at"]):
+            if job["status"] == RUNNING:
+                print(f"Reanudando el trabajo de indexación {job['id']} desde el lote {job['checkpoint']}")
+                self.store.update(job["id"], status=QUEUED)
+            self._queue.put(job["id"])
+
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run_worker, name=f"index-job-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Parar el pool: los trabajos en curso se detienen en el siguiente lote
+        y quedan en la cola (persistente) para continuar al volver a arrancar
+        """
+        with self._running_lock:
+            for progress in self._running.values():
+                progress.interrupt_event.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Crear un trabajo y encolarlo; devuelve su estado inicial"""
+        job = self.store.create(kind, params)
+        self._queue.put(job["id"])
+        return self.get(job["id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado del trabajo con su progreso (en vivo si se está ejecutando)"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        with self._running_lock:
+            progress = self._running.get(job_id)
+        if progress is not None:
+            job["progress"] = progress.snapshot()
+        return self._public(job)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return [self.get(job["id"]) for job in self.store.list(limit=limit)]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancelar un trabajo: si está en cola no llega a ejecutarse y si está
+        en curso se detiene en el siguiente lote. Los trabajos terminados no
+        cambian.
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        with self._running_lock:
+            progress = self._running.get(job_id)
+            if progress is not None:
+                progress.cancel_event.set()
+            elif job["status"] == QUEUED:
+                self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        return self.get(job_id)
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Campos expuestos; los contadores confirmados internos no se incluyen"""
+        progress = job["progress"] or {
+            **dict.fromkeys(COUNTERS, 0), "total": job["total"], "checkpoint_batches": job["checkpoint"]
+        }
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "params": job["params"],
+            "status": job["status"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "error": job["error"],
+            "progress": progress
+        }
+
+    def _run_worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            self._run_job(job_id)
+
+    def _run_job(self, job_id: str) -> None:
+        with self._running_lock:
+            job = self.store.get(job_id)
+            # Cancelado mientras esperaba en la cola
+            if job is None or job["status"] != QUEUED:
+                return
+            progress = JobProgress(self.store, job)
+            self._running[job_id] = progress
+        self.store.update(job_id, status=RUNNING, started_at=job["started_at"] or time.time(), error=None)
+
+        status, error = COMPLETED, None
+        try:
+            self.runner(job, progress)
+        except JobInterrupted:
+            status = QUEUED
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            print(f"Error en el trabajo de indexación {job_id}: {e}")
+            status, error = FAILED, str(e)
+        finally:
+            with self._running_lock:
+                self._running.pop(job_id, None)
+                self.store.update(
+                    job_id,
+                    status=status,
+                    error=error,
+                    finished_at=time.time() if status in FINISHED_STATUSES else None,
+                    progress=progress.snapshot()
+                )
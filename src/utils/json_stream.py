@@ -0,0 +1,115 @@
+# json_stream.py
+"""
+Lectura en streaming de volcados de publicaciones.
+
+Los volcados de producción ocupan cientos de MB, así que en lugar de cargar
+el archivo completo con json.load se decodifica registro a registro. Se
+admiten tres formatos:
+1. Un array JSON en el nivel superior: [{...}, {...}]
+2. JSON Lines: un objeto por línea
+3. Un único objeto JSON (se devuelve como un solo registro)
+"""
+
+import json
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Buffer de lectura que solo retiene el registro que se está decodificando"""
+
+    def __init__(self, file, chunk_size: int, on_read: Optional[Callable[[int], None]] = None):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.on_read = on_read
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, min_size: int = 0) -> bool:
+        """Leer más datos descartando lo ya consumido. Devuelve False en EOF"""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if self.on_read is not None:
+            # Posición en bytes del archivo subyacente (incluye la lectura anticipada del decodificador)
+            self.on_read(self.file.buffer.tell())
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter significativo ("" al final del archivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        """Decodificar el siguiente valor JSON leyendo tanto como haga falta"""
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+                # Un valor que acaba justo al final del buffer puede estar incompleto
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Duplicar la lectura para registros grandes
+            self.fill(read_size)
+            read_size *= 2
+
+
+def iter_json_records(file_path: str, chunk_size: int = 1 << 16,
+                      on_read: Optional[Callable[[int], None]] = None) -> Iterator[Any]:
+    """
+    Recorrer los registros de un archivo JSON (array, JSON Lines u objeto
+    único) decodificándolos uno a uno con memoria acotada. `on_read`
+    recibe los bytes leídos del archivo tras cada lectura (para informar
+    del progreso sin contar antes los registros).
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        reader = _Reader(file, chunk_size, on_read)
+        first = reader.peek()
+
+        if first == "[":
+            # Array en el nivel superior: recorrer sus elementos
+            reader.pos += 1
+            while True:
+                char = reader.peek()
+                if char == "]":
+                    return
+                if char == ",":
+                    reader.pos += 1
+                    continue
+                if char == "":
+                    raise json.JSONDecodeError("Array JSON sin cerrar", reader.buffer, reader.pos)
+                yield reader.decode(decoder)
+        else:
+            # JSON Lines u objetos concatenados
+            while reader.peek():
+                yield reader.decode(decoder)
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Agrupar un iterable en listas de como máximo `batch_size` elementos"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
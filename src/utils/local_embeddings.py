@@ -0,0 +1,104 @@
+# local_embeddings.py
+"""
+Codificación local de embeddings con SentenceTransformer.
+
+Ofrece dos caminos:
+1. encode_batch: un único pase por lotes en el proceso actual
+2. EncoderPool: reparte la inferencia entre varios procesos para usar todos
+   los núcleos de CPU en ingestas grandes
+
+En ambos casos los vectores se devuelven en el mismo orden que los textos.
+"""
+
+import math
+import multiprocessing
+import os
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Modelo cargado en cada proceso del pool (uno por proceso)
+_worker_model = None
+
+
+def _init_worker(model_name: str, device: str, threads: int, loader: Optional[Callable] = None) -> None:
+    """Inicializar un proceso del pool cargando su propia copia del modelo"""
+    global _worker_model
+    if loader is not None:
+        _worker_model = loader(model_name, device)
+        return
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Repartir los núcleos entre procesos para no sobresuscribir la CPU
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device=device, trust_remote_code=True)
+
+
+def _encode_chunk(args) -> np.ndarray:
+    """Codificar un fragmento de textos dentro de un proceso del pool"""
+    texts, batch_size = args
+    return encode_batch(_worker_model, texts, batch_size)
+
+
+def encode_batch(model, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """Codificar varios textos en lotes con el modelo indicado"""
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    return model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+
+
+class EncoderPool:
+    """
+    Pool de procesos que codifica textos con SentenceTransformer.
+    Cada proceso carga el modelo una vez y recibe fragmentos de la entrada;
+    los resultados se recombinan en el orden original. `loader(model_name,
+    device)` sustituye la carga del modelo (debe poder importarse desde los
+    procesos hijos, p. ej. una función de módulo en pruebas).
+    """
+
+    def __init__(self, model_name: str, workers: Optional[int] = None, device: str = "cpu",
+                 loader: Optional[Callable] = None):
+        cpu_count = os.cpu_count() or 1
+        self.workers = workers or cpu_count
+        threads_per_worker = max(1, cpu_count // self.workers)
+
+        # 'spawn' evita heredar el estado de hilos de torch del proceso padre
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(model_name, device, threads_per_worker, loader)
+        )
+
+    def encode(self, texts: List[str], batch_size: int = 32, chunk_size: Optional[int] = None) -> np.ndarray:
+        """Codificar textos repartiéndolos entre los procesos del pool"""
+        if not texts:
+            raise ValueError("La lista de textos no puede estar vacía")
+
+        # Varios fragmentos por proceso para equilibrar la carga
+        if chunk_size is None:
+            chunk_size = max(batch_size, math.ceil(len(texts) / (self.workers * 4)))
+
+        chunks = [(texts[i:i + chunk_size], batch_size) for i in range(0, len(texts), chunk_size)]
+
+        # Pool.map conserva el orden de los fragmentos
+        return np.vstack(self._pool.map(_encode_chunk, chunks))
+
+    def close(self) -> None:
+        """Detener los procesos del pool"""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
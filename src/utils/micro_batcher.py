@@ -0,0 +1,99 @@
+# micro_batcher.py
+"""
+Agrupación de peticiones concurrentes de embeddings en micro-lotes.
+
+Con carga, cada consulta pide el embedding de su texto por separado: con un
+modelo local son muchos pases de lote 1 compitiendo por la CPU, y con una
+API remota, muchas peticiones HTTP de un solo texto. El MicroBatcher retiene
+cada petición como mucho `max_wait_ms` milisegundos (o hasta reunir
+`max_batch_size` textos), codifica el lote en una sola llamada y entrega a
+cada petición su vector.
+
+Con poca carga el coste es, como mucho, la espera máxima configurada.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """Reúne textos de peticiones concurrentes y los codifica en un solo lote"""
+
+    def __init__(self,
+                 encode: Callable[[List[str]], Awaitable[List[Any]]],
+                 max_wait_ms: float = 5.0,
+                 max_batch_size: int = 32):
+        # encode recibe una lista de textos y devuelve sus vectores en el mismo orden
+        self.encode = encode
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Referencias a los lotes en curso (el bucle solo guarda referencias débiles)
+        self._running: Set[asyncio.Task] = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    async def submit(self, text: str) -> Any:
+        """Devolver el vector del texto, codificado junto a las peticiones concurrentes"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Lanzar la codificación de las peticiones pendientes"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await self.encode([text for text, _ in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"La codificación devolvió {len(vectors)} vectores para {len(batch)} textos")
+
+            for (_, future), vector in zip(batch, vectors):
+                # Una petición cancelada ya no espera su vector
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            # El error llega a todas las peticiones del lote
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Si se cancela el lote (p. ej. al cerrar el bucle), ninguna petición se queda esperando
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de agrupación: peticiones, lotes y tamaño medio y máximo"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._pending)
+        }
@@ -0,0 +1,162 @@
+# onnx_embeddings.py
+"""
+Embeddings locales con ONNX Runtime en CPU.
+
+Alternativa a la inferencia de SentenceTransformer con PyTorch para nodos
+solo con CPU: el modelo completo (transformer, pooling y normalización) se
+exporta una vez a ONNX, se cuantiza a int8 de forma dinámica (pesos int8,
+activaciones cuantizadas al vuelo) y se ejecuta con ONNX Runtime con un
+número de hilos configurable.
+
+- export_onnx_model: exportar (y cuantizar) un modelo de SentenceTransformer
+- OnnxEncoder: codificador con la misma interfaz que usa el proyecto de
+  SentenceTransformer (encode, get_sentence_embedding_dimension)
+- load_onnx_encoder: cargar el modelo exportado, exportándolo si no existe
+
+torch y sentence-transformers solo hacen falta para exportar; para
+codificar bastan onnxruntime y el tokenizador de transformers.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+ONNX_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+SETTINGS_FILE = "onnx_config.json"
+
+
+def export_dir(base_dir: str, model_name: str) -> str:
+    """Directorio del modelo exportado dentro de `base_dir` (uno por modelo)"""
+    return os.path.join(base_dir, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name.strip("/")))
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True, opset: int = 17) -> str:
+    """
+    Exportar el modelo de SentenceTransformer `model_name` a ONNX en
+    `output_dir` (con el tokenizador) y, con `quantize`, cuantizarlo a int8.
+    Devuelve la ruta del modelo que debe cargarse.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(["texto de ejemplo", "otro texto de ejemplo más largo"], padding=True, return_tensors="pt")
+    input_names = list(sample.keys())
+
+    class SentenceEmbedding(torch.nn.Module):
+        """Transformer + pooling + normalización en un solo grafo"""
+
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(dict(zip(input_names, inputs)))["sentence_embedding"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    onnx_path = os.path.join(output_dir, ONNX_FILE)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["sentence_embedding"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            SentenceEmbedding(),
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["sentence_embedding"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False
+        )
+
+    model_path = onnx_path
+    if quantize:
+        model_path = os.path.join(output_dir, INT8_FILE)
+        quantize_dynamic(onnx_path, model_path, weight_type=QuantType.QInt8)
+
+    # sentence-transformers 6 renombró get_sentence_embedding_dimension
+    get_dimension = getattr(model, "get_embedding_dimension", None) or model.get_sentence_embedding_dimension
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, SETTINGS_FILE), "w", encoding="utf-8") as settings_file:
+        json.dump({
+            "source_model": model_name,
+            "input_names": input_names,
+            "max_seq_length": model.max_seq_length,
+            "dimension": get_dimension(),
+        }, settings_file, indent=2)
+
+    return model_path
+
+
+class OnnxEncoder:
+    """Codificador de embeddings sobre ONNX Runtime (CPU)"""
+
+    def __init__(self, model_dir: str, quantized: bool = True,
+                 intra_op_threads: int = 0, inter_op_threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, SETTINGS_FILE), encoding="utf-8") as settings_file:
+            self.settings: Dict[str, Any] = json.load(settings_file)
+
+        # 0 deja el número de hilos a ONNX Runtime (un hilo por núcleo)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = os.path.join(model_dir, INT8_FILE if quantized else ONNX_FILE)
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.input_names = self.settings["input_names"]
+        self.max_seq_length = self.settings["max_seq_length"]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.settings["dimension"]
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """
+        Codificar uno o varios textos (como SentenceTransformer.encode con
+        convert_to_numpy): un texto da un vector y una lista, una matriz.
+        """
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size=batch_size)[0]
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            features = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+            batches.append(self.session.run(None, inputs)[0])
+        return np.vstack(batches).astype(np.float32)
+
+
+def load_onnx_encoder(model_name: str,
+                      base_dir: str,
+                      quantize: bool = True,
+                      intra_op_threads: int = 0,
+                      inter_op_threads: int = 0) -> OnnxEncoder:
+    """Cargar el modelo exportado de `model_name`, exportándolo la primera vez"""
+    model_dir = export_dir(base_dir, model_name)
+    model_file = os.path.join(model_dir, INT8_FILE if quantize else ONNX_FILE)
+    if not os.path.exists(model_file) or not os.path.exists(os.path.join(model_dir, SETTINGS_FILE)):
+        print(f"Exportando {model_name} a ONNX{' (int8)' if quantize else ''} en {model_dir}")
+        export_onnx_model(model_name, model_dir, quantize=quantize)
+    return OnnxEncoder(model_dir, quantized=quantize,
+                       intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
@@ -0,0 +1,247 @@
+# pipeline.py
+"""
+Motor de indexación por etapas (productor/consumidor).
+
+Cada etapa se ejecuta en sus propios hilos y se comunica con la siguiente a
+través de una cola acotada. Mientras una etapa espera a la red (descarga,
+Qdrant) las demás siguen trabajando, de modo que el tiempo total se acerca
+al de la etapa más lenta en lugar de a la suma de todas. Las colas acotadas
+aplican contrapresión: un productor rápido se bloquea cuando la cola de la
+etapa siguiente está llena.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Marca de fin de datos que se propaga de una etapa a la siguiente
+_DONE = object()
+
+# Intervalo para comprobar si otra etapa ha fallado mientras se espera en una cola
+_POLL_INTERVAL = 0.1
+
+
+class PipelineStopped(Exception):
+    """La ejecución se detuvo porque otra etapa falló"""
+
+
+class Stage:
+    """
+    Etapa del pipeline: aplica `fn` a cada elemento con `workers` hilos.
+    `count` indica cuántos registros representa cada elemento de entrada
+    (por defecto su longitud) para calcular el rendimiento en registros/s.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1,
+                 count: Optional[Callable[[Any], int]] = None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.count = count or _default_count
+
+
+def _default_count(item: Any) -> int:
+    try:
+        return len(item)
+    except TypeError:
+        return 1
+
+
+class _StageStats:
+    """Contadores de una etapa o de una cola, protegidos por un lock"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = 0
+        self.records = 0
+        self.busy = 0.0
+        self.depth_max = 0
+        self.depth_sum = 0
+        self.depth_samples = 0
+
+    def add_work(self, records: int, busy: float) -> None:
+        with self.lock:
+            self.items += 1
+            self.records += records
+            self.busy += busy
+
+    def sample_depth(self, depth: int) -> None:
+        with self.lock:
+            self.depth_max = max(self.depth_max, depth)
+            self.depth_sum += depth
+            self.depth_samples += 1
+
+
+class StagedPipeline:
+    """
+    Pipeline fuente → etapa 1 → ... → etapa N con colas acotadas.
+    La fuente es un iterable que se consume en su propio hilo; el resultado
+    de la última etapa se descarta.
+    """
+
+    def __init__(self, source: Iterable[Any], stages: List[Stage],
+                 queue_size: int = 4, source_name: str = "source",
+                 source_count: Optional[Callable[[Any], int]] = None):
+        if not stages:
+            raise ValueError("El pipeline necesita al menos una etapa")
+
+        self.source = source
+        self.stages = stages
+        self.source_name = source_name
+        self.source_count = source_count or _default_count
+
+        # Una cola de entrada por etapa
+        self.queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._errors_lock = threading.Lock()
+        self._remaining_workers = [stage.workers for stage in stages]
+        self._remaining_lock = threading.Lock()
+
+        self._source_stats = _StageStats()
+        self._stage_stats = [_StageStats() for _ in stages]
+        self._queue_stats = [_StageStats() for _ in stages]
+
+    # ---- Colas con posibilidad de cancelación ----
+
+    def _put(self, index: int, item: Any) -> None:
+        q = self.queues[index]
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                self._queue_stats[index].sample_depth(q.qsize())
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, index: int) -> Any:
+        q = self.queues[index]
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def _fail(self, error: BaseException) -> None:
+        with self._errors_lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    # ---- Hilos ----
+
+    def _run_source(self) -> None:
+        iterator = iter(self.source)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self._source_stats.add_work(self.source_count(item), time.perf_counter() - start)
+                self._put(0, item)
+
+            # Una marca de fin por cada hilo de la primera etapa
+            for _ in range(self.stages[0].workers):
+                self._put(0, _DONE)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # Cerrar generadores de la fuente (p. ej. para cancelar descargas pendientes)
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def _run_worker(self, index: int) -> None:
+        stage = self.stages[index]
+        stats = self._stage_stats[index]
+        is_last = index == len(self.stages) - 1
+
+        try:
+            while True:
+                item = self._get(index)
+                if item is _DONE:
+                    break
+
+                start = time.perf_counter()
+                result = stage.fn(item)
+                stats.add_work(stage.count(item), time.perf_counter() - start)
+
+                if not is_last and result is not None:
+                    self._put(index + 1, result)
+
+            # El último hilo de la etapa avisa a la siguiente
+            with self._remaining_lock:
+                self._remaining_workers[index] -= 1
+                finished = self._remaining_workers[index] == 0
+
+            if finished and not is_last:
+                for _ in range(self.stages[index + 1].workers):
+                    self._put(index + 1, _DONE)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Ejecutar el pipeline hasta agotar la fuente.
+        Devuelve las estadísticas por etapa y por cola; si alguna etapa
+        falla, se detienen todas y se relanza el primer error.
+        """
+        start = time.perf_counter()
+
+        threads = [threading.Thread(target=self._run_source, name=f"pipeline-{self.source_name}", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_worker, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+
+        return self._build_stats(elapsed)
+
+    def _build_stats(self, elapsed: float) -> Dict[str, Any]:
+        """Rendimiento por etapa y profundidad de las colas"""
+        def stage_summary(stats: _StageStats, workers: int) -> Dict[str, Any]:
+            return {
+                "workers": workers,
+                "items": stats.items,
+                "records": stats.records,
+                "busy_seconds": round(stats.busy, 4),
+                "records_per_second": round(stats.records / elapsed, 2) if elapsed else 0.0,
+                # Rendimiento si la etapa trabajase sola, sin esperar a las demás
+                "capacity_per_second": round(stats.records * workers / stats.busy, 2) if stats.busy else None
+            }
+
+        stages = {self.source_name: stage_summary(self._source_stats, 1)}
+        queues = {}
+        previous = self.source_name
+
+        for index, stage in enumerate(self.stages):
+            queue_stats = self._queue_stats[index]
+            stages[stage.name] = stage_summary(self._stage_stats[index], stage.workers)
+            queues[f"{previous}->{stage.name}"] = {
+                "max_depth": queue_stats.depth_max,
+                "avg_depth": round(queue_stats.depth_sum / queue_stats.depth_samples, 2) if queue_stats.depth_samples else 0.0,
+                "capacity": self.queues[index].maxsize
+            }
+            previous = stage.name
+
+        return {"elapsed_seconds": round(elapsed, 4), "stages": stages, "queues": queues}
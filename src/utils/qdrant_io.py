@@ -0,0 +1,124 @@
+# qdrant_io.py
+"""
+Utilidades de conexión y escritura en Qdrant.
+
+- create_qdrant_client / create_async_qdrant_client: cliente HTTP o gRPC
+  según la configuración.
+- upsert_points: divide los puntos en lotes y mantiene varias peticiones en
+  curso, en lugar de enviar una sola petición enorme.
+- bulk_load_mode: desactiva la construcción del índice HNSW durante una carga
+  masiva y restaura la configuración del optimizador al terminar, de modo que
+  el índice se construye una sola vez sobre los datos completos.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http import models
+from qdrant_client.local.qdrant_local import QdrantLocal
+
+# Cargas masivas activas por colección, para admitir llamadas anidadas o concurrentes
+_bulk_loads: Dict[str, int] = {}
+_bulk_thresholds: Dict[str, Any] = {}
+_bulk_lock = threading.Lock()
+
+
+def create_qdrant_client(config: Dict[str, Any]) -> QdrantClient:
+    """Crear el cliente de Qdrant usando gRPC si QDRANT_PREFER_GRPC está activo"""
+    return QdrantClient(
+        host=config["QDRANT_HOST"],
+        port=config["QDRANT_PORT"],
+        grpc_port=config["QDRANT_GRPC_PORT"],
+        prefer_grpc=config["QDRANT_PREFER_GRPC"]
+    )
+
+
+def create_async_qdrant_client(config: Dict[str, Any]) -> AsyncQdrantClient:
+    """Versión asíncrona de create_qdrant_client"""
+    return AsyncQdrantClient(
+        host=config["QDRANT_HOST"],
+        port=config["QDRANT_PORT"],
+        grpc_port=config["QDRANT_GRPC_PORT"],
+        prefer_grpc=config["QDRANT_PREFER_GRPC"]
+    )
+
+
+def upsert_points(client: QdrantClient, collection_name: str, points: List[models.PointStruct],
+                  batch_size: int = 256, parallel: int = 1) -> int:
+    """
+    Insertar puntos en lotes de `batch_size` con hasta `parallel` peticiones
+    simultáneas (en modo local se insertan en serie). Termina cuando todos
+    los lotes están confirmados y relanza el primer error. Devuelve el
+    número de puntos insertados.
+    """
+    if not points:
+        return 0
+
+    # El modo local (":memory:" o ruta en disco) no admite escrituras concurrentes
+    if isinstance(getattr(client, "_client", None), QdrantLocal):
+        parallel = 1
+
+    batch_size = max(1, batch_size)
+    batches = [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+
+    def upsert(batch):
+        client.upsert(collection_name=collection_name, points=batch, wait=True)
+
+    if parallel <= 1 or len(batches) == 1:
+        for batch in batches:
+            upsert(batch)
+    else:
+        with ThreadPoolExecutor(max_workers=min(parallel, len(batches))) as executor:
+            # list() propaga la primera excepción
+            list(executor.map(upsert, batches))
+
+    return len(points)
+
+
+def _indexing_threshold(client: QdrantClient, collection_name: str) -> Any:
+    return client.get_collection(collection_name).config.optimizer_config.indexing_threshold
+
+
+def _set_indexing_threshold(client: QdrantClient, collection_name: str, threshold: Any) -> None:
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=threshold)
+    )
+
+
+@contextmanager
+def bulk_load_mode(client: QdrantClient, collection_name: str,
+                   default_threshold: int = 10000) -> Iterator[None]:
+    """
+    Diferir la indexación HNSW mientras dura el bloque (indexing_threshold=0)
+    y restaurar el umbral original al salir, también si hay errores. Las
+    cargas anidadas o simultáneas sobre la misma colección comparten el modo:
+    solo la última en terminar restaura la configuración.
+
+    El umbral original solo se guarda en memoria: si un proceso terminó a
+    mitad de una carga, la colección se quedó con 0 (o sin umbral). En ese
+    caso se restaura `default_threshold` (QDRANT_INDEXING_THRESHOLD) en
+    lugar de dejar la indexación desactivada para siempre.
+    """
+    with _bulk_lock:
+        if _bulk_loads.get(collection_name, 0) == 0:
+            threshold = _indexing_threshold(client, collection_name)
+            if not threshold:
+                print(f"La colección {collection_name} tenía la indexación desactivada "
+                      f"(carga masiva interrumpida); se restaurará indexing_threshold={default_threshold}")
+                threshold = default_threshold
+            _bulk_thresholds[collection_name] = threshold
+            _set_indexing_threshold(client, collection_name, 0)
+        _bulk_loads[collection_name] = _bulk_loads.get(collection_name, 0) + 1
+
+    try:
+        yield
+    finally:
+        with _bulk_lock:
+            _bulk_loads[collection_name] -= 1
+            if _bulk_loads[collection_name] == 0:
+                del _bulk_loads[collection_name]
+                _set_indexing_threshold(client, collection_name, _bulk_thresholds.pop(collection_name))
@@ -0,0 +1,196 @@
+# reranker.py
+"""
+Reordenación de documentos recuperados con un cross-encoder local.
+
+La búsqueda vectorial compara embeddings calculados por separado para la
+consulta y el documento; un cross-encoder lee ambos textos juntos y estima
+mejor la relevancia, pero es más caro. Por eso se aplica solo a un conjunto
+amplio de candidatos de la búsqueda vectorial y se queda con los mejores,
+en lugar de enviar más documentos al LLM.
+
+- Todos los pares (consulta, pasaje) sin puntuación cacheada se puntúan en
+  una sola pasada del modelo.
+- Las puntuaciones se guardan en una caché LRU por (consulta, texto).
+- Si la puntuación no termina dentro del presupuesto de latencia, se usa el
+  orden de la búsqueda vectorial; la puntuación sigue en segundo plano y
+  su resultado queda en la caché para las siguientes consultas.
+- Como mucho `max_pending` puntuaciones esperan al modelo: con más, la
+  consulta usa directamente el orden vectorial en lugar de encolar trabajo
+  que terminaría fuera de presupuesto. Un error del modelo también
+  devuelve el orden vectorial.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Dict, List, Optional
+
+
+class Reranker:
+    """Reordena documentos con un cross-encoder dentro de un presupuesto de latencia"""
+
+    def __init__(self,
+                 model_name: str,
+                 budget_ms: Optional[float] = 300.0,
+                 cache_size: int = 10000,
+                 max_text_chars: int = 2000,
+                 max_pending: int = 2,
+                 model=None):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.cache_size = max(1, cache_size)
+        self.max_text_chars = max_text_chars
+        self.max_pending = max(1, max_pending)
+
+        # Cualquier objeto con predict(pares, batch_size=...) sirve (p. ej. en pruebas)
+        self._model = model
+        self._model_lock = threading.Lock()
+
+        # Un solo hilo: el modelo se carga y ejecuta fuera del hilo de la consulta
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.skipped = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Reranker":
+        """Crear el reordenador a partir de la configuración del servicio"""
+        return cls(
+            config["RERANK_MODEL"],
+            budget_ms=config["RERANK_BUDGET_MS"],
+            cache_size=config["RERANK_CACHE_SIZE"],
+            max_pending=config["RERANK_MAX_PENDING"]
+        )
+
+    def _get_model(self):
+        # Importación diferida: sentence-transformers solo hace falta con la reordenación activa
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    def _submit(self, query: str, texts: List[str]):
+        """Encolar una puntuación; None si ya hay `max_pending` esperando al modelo"""
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                return None
+            self._pending += 1
+
+        def release(_):
+            with self._pending_lock:
+                self._pending -= 1
+
+        future = self._executor.submit(self._score, query, texts)
+        future.add_done_callback(release)
+        return future
+
+    def warm_up(self) -> None:
+        """Cargar el modelo de antemano para que la primera consulta no agote el presupuesto"""
+        self._executor.submit(self._get_model).result()
+
+    def document_text(self, doc: Dict[str, Any]) -> str:
+        """Texto del documento que se compara con la consulta: título y pasajes (o resumen)"""
+        parts = [doc.get("title", "")]
+        passages = [passage["text"] for passage in doc.get("passages", [])]
+        parts.extend(passages or [doc.get("summary", "")])
+        return " ".join(part for part in parts if part)[:self.max_text_chars]
+
+    @staticmethod
+    def _cache_key(query: str, text: str) -> str:
+        return hashlib.sha1(f"{query}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        """Puntuar todos los pares en una sola pasada y guardar el resultado en la caché"""
+        model = self._get_model()
+        scores = [float(score) for score in model.predict([(query, text) for text in texts], batch_size=len(texts))]
+
+        with self._cache_lock:
+            for text, score in zip(texts, scores):
+                self._cache[self._cache_key(query, text)] = score
+                self._cache.move_to_end(self._cache_key(query, text))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    def rerank(self, query: str, documents: List[Dict[str, Any]], top_n: int) -> List[Dict[str, Any]]:
+        """
+        Devolver los `top_n` documentos más relevantes según el cross-encoder,
+        con su puntuación en `rerank_score`. Si se agota el presupuesto, el
+        modelo está ocupado o falla, los `top_n` primeros en el orden original.
+        """
+        if not documents:
+            return []
+
+        start = time.perf_counter()
+        texts = [self.document_text(doc) for doc in documents]
+
+        scores: Dict[str, float] = {}
+        with self._cache_lock:
+            for text in texts:
+                key = self._cache_key(query, text)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[text] = self._cache[key]
+        missing = list(dict.fromkeys(text for text in texts if text not in scores))
+
+        fallback = skipped = failed = False
+        if missing:
+            future = self._submit(query, missing)
+            if future is None:
+                fallback = skipped = True
+            else:
+                try:
+                    timeout = self.budget_ms / 1000 if self.budget_ms else None
+                    scores.update(zip(missing, future.result(timeout=timeout)))
+                except TimeoutError:
+                    fallback = True
+                except Exception as e:
+                    print(f"Error al reordenar con {self.model_name}: {e}")
+                    fallback = failed = True
+
+        with self._stats_lock:
+            self.calls += 1
+            self.cache_hits += len(texts) - len(missing)
+            self.pairs_scored += 0 if fallback else len(missing)
+            self.fallbacks += int(fallback)
+            self.skipped += int(skipped)
+            self.errors += int(failed)
+            self.total_seconds += time.perf_counter() - start
+
+        if fallback:
+            return documents[:top_n]
+
+        ranked = sorted(zip(documents, texts), key=lambda item: scores[item[1]], reverse=True)
+        result = []
+        for doc, text in ranked[:top_n]:
+            doc["rerank_score"] = scores[text]
+            result.append(doc)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso de la reordenación"""
+        with self._stats_lock:
+            return {
+                "calls": self.calls,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "cache_entries": len(self._cache),
+                "fallbacks": self.fallbacks,
+                "skipped": self.skipped,
+                "errors": self.errors,
+                "avg_latency_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0.0
+            }
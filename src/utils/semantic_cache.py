@@ -0,0 +1,182 @@
+# semantic_cache.py
+"""
+Caché semántica de respuestas del LLM.
+
+Muchas consultas repiten la misma pregunta con otras palabras. En lugar de
+buscar por texto exacto, se compara el embedding de la consulta con los de
+las consultas cacheadas (similitud coseno) y se reutiliza la respuesta si la
+similitud supera un umbral y los documentos recuperados son los mismos, de
+modo que la respuesta se basa en el mismo contexto.
+
+Las entradas caducan tras `ttl` segundos, se descartan por antigüedad de uso
+al superar `max_entries`, y toda la caché se invalida cuando cambia el índice.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ("vector", "doc_ids", "value", "created", "compute_seconds")
+
+    def __init__(self, vector, doc_ids, value, created, compute_seconds):
+        self.vector = vector
+        self.doc_ids = doc_ids
+        self.value = value
+        self.created = created
+        self.compute_seconds = compute_seconds
+
+
+class SemanticCache:
+    """Caché de respuestas indexada por similitud de embeddings de consulta"""
+
+    def __init__(self,
+                 threshold: float = 0.95,
+                 ttl: float = 3600.0,
+                 max_entries: int = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_key = 0
+        self._generation = 0
+
+        # Matriz de vectores normalizados, reconstruida solo cuando cambian las entradas
+        self._matrix = None
+        self._matrix_keys: List[int] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.latency_saved = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SemanticCache":
+        """Crear la caché a partir de la configuración del servicio"""
+        return cls(
+            threshold=config["SEMANTIC_CACHE_THRESHOLD"],
+            ttl=config["SEMANTIC_CACHE_TTL"],
+            max_entries=config["SEMANTIC_CACHE_MAX_ENTRIES"]
+        )
+
+    @staticmethod
+    def _normalize(vector: Iterable[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    @property
+    def generation(self) -> int:
+        """Versión de la caché; cambia con cada invalidación"""
+        return self._generation
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if now - entry.created > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self.expirations += len(expired)
+            self._matrix = None
+
+    def _similarities(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key].vector for key in self._matrix_keys])
+        return self._matrix
+
+    def lookup(self, query_vector: Iterable[float], doc_ids: Iterable[Any]) -> Optional[Any]:
+        """
+        Devolver el valor cacheado de la consulta más parecida con similitud
+        >= threshold y los mismos documentos, o None si no hay ninguna.
+        """
+        vector = self._normalize(query_vector)
+        doc_ids = frozenset(str(doc_id) for doc_id in doc_ids)
+
+        with self._lock:
+            self._expire(self.clock())
+
+            if vector is not None and self._entries:
+                similarities = self._similarities() @ vector
+                # De mayor a menor similitud, solo las que superan el umbral
+                for index in np.argsort(-similarities):
+                    if similarities[index] < self.threshold:
+                        break
+                    key = self._matrix_keys[index]
+                    entry = self._entries[key]
+                    if entry.doc_ids == doc_ids:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        self.latency_saved += entry.compute_seconds
+                        return entry.value
+
+            self.misses += 1
+            return None
+
+    def store(self, query_vector: Iterable[float], doc_ids: Iterable[Any], value: Any,
+              compute_seconds: float = 0.0, generation: Optional[int] = None) -> None:
+        """
+        Guardar un valor. `compute_seconds` es lo que costó calcularlo (para
+        medir la latencia ahorrada). Si se indica `generation` y la caché se
+        invalidó desde entonces, el valor se descarta por estar obsoleto.
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            now = self.clock()
+            self._expire(now)
+
+            self._entries[self._next_key] = _Entry(
+                vector, frozenset(str(doc_id) for doc_id in doc_ids), value, now, compute_seconds
+            )
+            self._next_key += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            self._matrix = None
+
+    def invalidate(self) -> None:
+        """Vaciar la caché (p. ej. tras una escritura en el índice)"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso de la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+                "avg_latency_saved_seconds": round(self.latency_saved / self.hits, 3) if self.hits else 0.0
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,69 @@
+# single_flight.py
+"""
+Agrupación de peticiones idénticas en curso ("single flight").
+
+Cuando una pregunta se pone de moda llegan decenas de consultas iguales en
+el mismo segundo, y cada una vectoriza, busca y llama al LLM por su cuenta
+(la caché semántica aún no tiene la respuesta). Con SingleFlight, la primera
+petición de una clave lanza el cálculo y las que llegan mientras sigue en
+curso esperan ese mismo resultado (o su excepción). Al terminar la clave se
+libera: las peticiones posteriores vuelven a calcular (o usan la caché).
+
+El cálculo se ejecuta en su propia tarea: si se cancela la petición que lo
+lanzó (el cliente se desconecta), las demás siguen esperando el resultado.
+"""
+
+import asyncio
+import re
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def normalize_query(text: str) -> str:
+    """Forma canónica de una consulta: Unicode NFC, minúsculas y espacios simples"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+class SingleFlight:
+    """Comparte una única ejecución entre las llamadas concurrentes con la misma clave"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Devolver el resultado de `func()`. Si ya hay una ejecución en curso
+        con la misma clave, esperar la suya en lugar de lanzar otra.
+        """
+        self.requests += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+
+        # shield: cancelar una de las peticiones no cancela el cálculo compartido
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Marcar la excepción como recuperada aunque todas las peticiones se cancelaran
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de agrupación de peticiones"""
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_rate": round(self.coalesced / self.requests, 4) if self.requests else 0.0
+        }
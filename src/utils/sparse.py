@@ -0,0 +1,163 @@
+# sparse.py
+"""
+Búsqueda léxica (BM25) con vectores dispersos de Qdrant y fusión de rankings.
+
+Los embeddings densos captan el significado pero fallan con nombres exactos
+de informes, siglas u organismos. Cada fragmento se indexa también como un
+vector disperso: un índice por término (hash del token) con su peso de
+frecuencia BM25 saturada y normalizada por longitud. Qdrant aplica el IDF al
+buscar (`Modifier.IDF`), así que no hay que mantener estadísticas globales
+en el cliente.
+
+Los resultados de ambas búsquedas se combinan con reciprocal rank fusion
+(RRF): cada punto suma 1 / (k + posición) por cada ranking en el que aparece,
+de modo que no hace falta que las puntuaciones sean comparables.
+"""
+
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from qdrant_client.http import models
+
+# Nombre del vector disperso en la colección
+SPARSE_VECTOR_NAME = "bm25"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Palabras vacías frecuentes en español e inglés: no aportan a la búsqueda léxica
+STOPWORDS = frozenset("""
+a al algo ante como con contra cual de del desde donde el ella ellos en entre era es esa ese eso esta este
+esto estos fue ha han hasta la las le les lo los mas me mi muy no nos o para pero por que se ser si sin
+sobre son su sus tambien te tiene un una uno unos y ya
+an and are as at be by for from has have in is it its of on or that the this to was were which with
+""".split())
+
+
+def sparse_vectors_config() -> Dict[str, models.SparseVectorParams]:
+    """Configuración de vectores dispersos para create_collection (IDF calculado por Qdrant)"""
+    return {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+
+
+def tokenize(text: str) -> List[str]:
+    """Dividir en términos en minúsculas y sin tildes, descartando palabras vacías"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return [token for token in _TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def token_index(token: str) -> int:
+    """Índice estable (uint32) de un término en el vector disperso"""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class BM25Encoder:
+    """Codifica textos como vectores dispersos BM25 (sin el IDF, que aplica Qdrant)"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 150.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = max(1.0, avg_doc_len)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BM25Encoder":
+        """Crear el codificador a partir de la configuración del servicio"""
+        return cls(
+            k1=config.get("BM25_K1", 1.2),
+            b=config.get("BM25_B", 0.75),
+            avg_doc_len=config.get("BM25_AVG_DOC_LEN", 150.0)
+        )
+
+    @staticmethod
+    def _vector(weights: Dict[int, float]) -> models.SparseVector:
+        indices = sorted(weights)
+        return models.SparseVector(indices=indices, values=[weights[index] for index in indices])
+
+    def encode_document(self, text: str) -> models.SparseVector:
+        """Peso de cada término: tf * (k1 + 1) / (tf + k1 * (1 - b + b * longitud / longitud_media))"""
+        tokens = tokenize(text)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_doc_len)
+
+        weights: Dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            index = token_index(token)
+            # Las colisiones de hash suman frecuencias
+            weights[index] = weights.get(index, 0.0) + tf
+        return self._vector({index: tf * (self.k1 + 1) / (tf + norm) for index, tf in weights.items()})
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        """Cada término de la consulta cuenta una vez"""
+        return self._vector({token_index(token): 1.0 for token in tokenize(text)})
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Sequence[models.ScoredPoint]],
+                           k: int = 60,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Combinar rankings de puntos con RRF. Devuelve, de mayor a menor
+    puntuación fusionada, diccionarios con el punto (`point`, con `score`
+    sustituido por la puntuación RRF) y la posición (desde 1) que tenía en
+    cada ranking (`ranks`).
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for source, points in rankings.items():
+        for rank, point in enumerate(points, start=1):
+            entry = fused.get(point.id)
+            if entry is None:
+                entry = fused[point.id] = {"point": point, "score": 0.0, "ranks": {}}
+            elif not entry["point"].payload and point.payload:
+                entry["point"] = point
+            entry["score"] += 1.0 / (k + rank)
+            entry["ranks"][source] = rank
+
+    results = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+    if limit is not None:
+        results = results[:limit]
+    for entry in results:
+        entry["point"] = entry["point"].model_copy(update={"score": entry["score"]})
+    return results
+
+
+class HybridSearchStats:
+    """Métricas acumuladas de la búsqueda híbrida: aportación de cada lado y latencias"""
+
+    SOURCES = ("dense", "sparse")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        # Documentos devueltos encontrados solo por un lado o por ambos
+        self.documents = {"dense_only": 0, "sparse_only": 0, "both": 0}
+        # Milisegundos acumulados por fase
+        self.latency_ms = {"encode": 0.0, "search": 0.0, "fusion": 0.0}
+
+    def record(self, documents: List[Dict[str, Any]], latency_ms: Dict[str, float]) -> None:
+        """Registrar una búsqueda a partir de los `sources` de sus documentos"""
+        with self._lock:
+            self.queries += 1
+            for doc in documents:
+                sources = doc.get("sources", {})
+                if all(sources.get(source) for source in self.SOURCES):
+                    self.documents["both"] += 1
+                elif sources.get("dense"):
+                    self.documents["dense_only"] += 1
+                elif sources.get("sparse"):
+                    self.documents["sparse_only"] += 1
+            for phase, value in latency_ms.items():
+                self.latency_ms[phase] = self.latency_ms.get(phase, 0.0) + value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.documents.values())
+            return {
+                "queries": self.queries,
+                "documents": dict(self.documents),
+                "sparse_contribution": round((self.documents["sparse_only"]) / total, 4) if total else 0.0,
+                "avg_latency_ms": {
+                    phase: round(value / self.queries, 2) if self.queries else 0.0
+                    for phase, value in self.latency_ms.items()
+                }
+            }
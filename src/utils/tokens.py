@@ -0,0 +1,56 @@
+# tokens.py
+"""
+Utilidades para estimar el tamaño en tokens de un texto.
+
+No dependemos de un tokenizador concreto porque el servicio puede trabajar
+con modelos distintos (OpenAI, Jina, MiniLM...). La estimación es
+deliberadamente conservadora para no superar los límites de los modelos.
+"""
+
+import math
+from typing import List, Tuple, Iterable
+
+# Caracteres por token usados en la estimación (los tokenizadores BPE
+# suelen rondar los 4 caracteres por token; usamos 3 para ir sobre seguro)
+CHARS_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimar el número de tokens de un texto"""
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Recortar un texto para que no supere el número de tokens indicado"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars]
+
+
+def token_batches(items: Iterable[Tuple[int, str]],
+                  max_tokens: int,
+                  max_items: int) -> Iterable[List[Tuple[int, str]]]:
+    """
+    Agrupar pares (índice, texto) en lotes que no superen ni el presupuesto
+    de tokens ni el número máximo de elementos por lote.
+    Un texto que por sí solo supera el presupuesto forma su propio lote.
+    """
+    batch = []
+    batch_tokens = 0
+
+    for index, text in items:
+        tokens = estimate_tokens(text)
+
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_tokens = 0
+
+        batch.append((index, text))
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
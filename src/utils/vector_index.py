@@ -0,0 +1,368 @@
+# vector_index.py
+"""
+Índice vectorial en proceso con NumPy.
+
+Alternativa a Qdrant para colecciones que caben en memoria: evita el viaje
+de red en cada consulta y permite ejecutar el servicio sin servidor.
+
+- Los vectores se guardan normalizados en una matriz float32 contigua, de
+  modo que la similitud coseno es un producto matriz-vector; el top-k se
+  obtiene con argpartition (O(n)) y solo se ordenan los k elegidos.
+- Con `path`, la matriz es un archivo .npy mapeado en memoria. flush()
+  añade los cambios de metadatos desde la última llamada a un diario
+  (journal.pkl), de modo que su coste depende de lo escrito y no del
+  tamaño del índice; el diario se integra en meta.pkl cuando crece más de
+  una cuarta parte del índice, o tras compactar o vaciar.
+- El documento padre y la posición de cada fragmento se guardan en arrays
+  de enteros para filtrar sin recorrer los payloads.
+- Los borrados marcan la fila como eliminada; la matriz se compacta cuando
+  las filas eliminadas superan una cuarta parte del total.
+"""
+
+import os
+import pickle
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+PointId = Union[int, str]
+
+_MIN_CAPACITY = 1024
+
+
+def normalize_point_id(point_id: PointId) -> PointId:
+    """Forma canónica de un ID, igual que Qdrant: entero o UUID en minúsculas con guiones"""
+    if isinstance(point_id, str):
+        if point_id.isdigit():
+            return int(point_id)
+        try:
+            return str(uuid.UUID(point_id))
+        except ValueError:
+            return point_id
+    return point_id
+
+
+class NumpyVectorIndex:
+    """Índice de vectores normalizados con búsqueda exacta por similitud coseno"""
+
+    def __init__(self, dim: int, path: Optional[str] = None):
+        self.dim = dim
+        self.path = path
+        self._lock = threading.RLock()
+
+        if path and os.path.exists(self._meta_path):
+            self._load()
+        else:
+            self._reset()
+
+    # ---- almacenamiento ----
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.npy")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.pkl")
+
+    @property
+    def _journal_path(self) -> str:
+        return os.path.join(self.path, "journal.pkl")
+
+    def _allocate(self, capacity: int, copy_from: Optional[np.ndarray] = None) -> np.ndarray:
+        """Matriz de `capacity` filas en memoria o mapeada en disco, copiando las filas en uso"""
+        if not self.path:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_path = self._vectors_path + ".tmp"
+            matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        if copy_from is not None:
+            matrix[:self._count] = copy_from[:self._count]
+        if self.path:
+            matrix.flush()
+            os.replace(tmp_path, self._vectors_path)
+        return matrix
+
+    def _reset(self) -> None:
+        self._count = 0
+        self._dead = 0
+        self._matrix = self._allocate(_MIN_CAPACITY)
+        self._alive = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self._parents = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._chunk_indices = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._ids: List[PointId] = []
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[PointId, int] = {}
+        self._parent_codes: Dict[str, int] = {}
+        self._parent_names: List[str] = []
+        self._reset_journal(snapshot_needed=True)
+
+    def _reset_journal(self, snapshot_needed: bool = False) -> None:
+        # Cambios aún no guardados y puntos ya escritos en el diario
+        self._pending: List[Tuple] = []
+        self._journal_entries = 0
+        self._snapshot_needed = snapshot_needed
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._alive)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        self._matrix = self._allocate(capacity, self._matrix)
+        for name in ("_alive", "_parents", "_chunk_indices"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+
+    def _load(self) -> None:
+        with open(self._meta_path, "rb") as meta_file:
+            meta = pickle.load(meta_file)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"El índice en {self.path} tiene dimensión {meta['dim']}, se esperaba {self.dim}")
+
+        self._matrix = np.load(self._vectors_path, mmap_mode="r+")
+        self._count = meta["count"]
+        self._ids = meta["ids"]
+        self._payloads = meta["payloads"]
+        self._parent_names = meta["parent_names"]
+        self._parent_codes = {name: code for code, name in enumerate(self._parent_names)}
+
+        capacity = len(self._matrix)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._parents = np.zeros(capacity, dtype=np.int32)
+        self._chunk_indices = np.zeros(capacity, dtype=np.int32)
+        self._alive[:self._count] = meta["alive"]
+        self._parents[:self._count] = meta["parents"]
+        self._chunk_indices[:self._count] = meta["chunk_indices"]
+
+        self._rows = {point_id: row for row, point_id in enumerate(self._ids) if self._alive[row]}
+        self._reset_journal()
+        self._replay_journal()
+        self._dead = self._count - len(self._rows)
+
+    def _replay_journal(self) -> None:
+        """Aplicar los cambios del diario posteriores a meta.pkl"""
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, "rb") as journal_file:
+            while True:
+                try:
+                    operation = pickle.load(journal_file)
+                except (EOFError, pickle.UnpicklingError):
+                    # Fin del diario (o última entrada incompleta tras una caída)
+                    break
+                self._journal_entries += len(operation[1])
+                if operation[0] == "upsert":
+                    for row, point_id, payload in operation[1]:
+                        if row == self._count:
+                            self._count += 1
+                            self._ids.append(point_id)
+                            self._payloads.append(payload)
+                        else:
+                            self._ids[row] = point_id
+                            self._payloads[row] = payload
+                        self._rows[point_id] = row
+                        self._alive[row] = True
+                        self._parents[row] = self._parent_code(str(payload.get("parent_id", point_id)))
+                        self._chunk_indices[row] = payload.get("chunk_index", 0)
+                else:
+                    for row in operation[1]:
+                        if self._alive[row]:
+                            del self._rows[self._ids[row]]
+                            self._payloads[row] = None
+                            self._alive[row] = False
+
+    def flush(self) -> None:
+        """
+        Guardar en disco la matriz y los cambios de metadatos desde la
+        última llamada (sin efecto si el índice está en memoria)
+        """
+        if not self.path:
+            return
+        with self._lock:
+            self._matrix.flush()
+            self._journal_entries += sum(len(operation[1]) for operation in self._pending)
+            if self._snapshot_needed or self._journal_entries > max(_MIN_CAPACITY, self._count // 4):
+                self._write_snapshot()
+            elif self._pending:
+                with open(self._journal_path, "ab") as journal_file:
+                    for operation in self._pending:
+                        pickle.dump(operation, journal_file, protocol=pickle.HIGHEST_PROTOCOL)
+                self._pending = []
+
+    def _write_snapshot(self) -> None:
+        """Guardar todos los metadatos en meta.pkl y vaciar el diario"""
+        meta = {
+                "dim": self.dim,
+                "count": self._count,
+                "ids": self._ids,
+                "payloads": self._payloads,
+                "parent_names": self._parent_names,
+                "alive": self._alive[:self._count].copy(),
+                "parents": self._parents[:self._count].copy(),
+                "chunk_indices": self._chunk_indices[:self._count].copy(),
+        }
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "wb") as meta_file:
+            pickle.dump(meta, meta_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._meta_path)
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        self._reset_journal()
+
+    # ---- escritura ----
+
+    def _parent_code(self, parent_id: str) -> int:
+        code = self._parent_codes.get(parent_id)
+        if code is None:
+            code = self._parent_codes[parent_id] = len(self._parent_names)
+            self._parent_names.append(parent_id)
+        return code
+
+    def upsert(self, ids: List[PointId], vectors: Iterable[Iterable[float]],
+               payloads: List[Dict[str, Any]]) -> int:
+        """Insertar o sustituir puntos. Devuelve el número de puntos escritos"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if not (len(ids) == len(vectors) == len(payloads)):
+            raise ValueError("La lista de IDs, vectores y payloads debe tener la misma longitud")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            ids = [normalize_point_id(point_id) for point_id in ids]
+            new_rows = sum(1 for point_id in set(ids) if point_id not in self._rows)
+            self._grow(self._count + new_rows)
+
+            rows = np.empty(len(ids), dtype=np.int64)
+            for i, (point_id, payload) in enumerate(zip(ids, payloads)):
+                row = self._rows.get(point_id)
+                if row is None:
+                    row = self._rows[point_id] = self._count
+                    self._count += 1
+                    self._ids.append(point_id)
+                    self._payloads.append(payload)
+                else:
+                    self._payloads[row] = payload
+                rows[i] = row
+                self._parents[row] = self._parent_code(str(payload.get("parent_id", point_id)))
+                self._chunk_indices[row] = payload.get("chunk_index", 0)
+
+            self._matrix[rows] = vectors
+            self._alive[rows] = True
+            if self.path:
+                self._pending.append(("upsert", [
+                    (int(row), self._ids[row], self._payloads[row]) for row in rows
+                ]))
+
+        return len(ids)
+
+    def _delete_rows(self, rows: np.ndarray) -> int:
+        rows = rows[self._alive[rows]]
+        for row in rows:
+            del self._rows[self._ids[row]]
+            self._payloads[row] = None
+        self._alive[rows] = False
+        self._dead += len(rows)
+        if self.path and len(rows):
+            self._pending.append(("delete", rows.tolist()))
+
+        if self._dead > _MIN_CAPACITY and self._dead * 4 > self._count:
+            self._compact()
+        return len(rows)
+
+    def delete(self, ids: Iterable[PointId]) -> int:
+        """Eliminar puntos por ID. Devuelve cuántos existían"""
+        with self._lock:
+            rows = [self._rows[point_id] for point_id in map(normalize_point_id, ids) if point_id in self._rows]
+            return self._delete_rows(np.asarray(rows, dtype=np.int64))
+
+    def delete_documents(self, parent_ids: Iterable[str]) -> int:
+        """Eliminar todos los puntos de varios documentos padre. Devuelve cuántos documentos existían"""
+        with self._lock:
+            rows = np.flatnonzero(self._parent_mask(parent_ids))
+            documents = len(np.unique(self._parents[rows]))
+            self._delete_rows(rows)
+            return documents
+
+    def delete_parents(self, parent_ids: Iterable[str], keep_ids: Optional[Iterable[PointId]] = None) -> int:
+        """Eliminar los puntos de varios documentos padre, salvo los de `keep_ids`"""
+        with self._lock:
+            rows = np.flatnonzero(self._parent_mask(parent_ids))
+            if keep_ids is not None:
+                keep = {self._rows[point_id] for point_id in map(normalize_point_id, keep_ids) if point_id in self._rows}
+                rows = np.asarray([row for row in rows if row not in keep], dtype=np.int64)
+            return self._delete_rows(rows)
+
+    def _compact(self) -> None:
+        """Eliminar físicamente las filas borradas"""
+        keep = np.flatnonzero(self._alive[:self._count])
+        self._matrix[:len(keep)] = self._matrix[keep]
+        for name in ("_parents", "_chunk_indices"):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self._alive[:] = False
+        self._alive[:len(keep)] = True
+        self._ids = [self._ids[row] for row in keep]
+        self._payloads = [self._payloads[row] for row in keep]
+        self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+        self._count = len(keep)
+        self._dead = 0
+        # Las filas cambian de posición: el diario ya no es válido
+        self._snapshot_needed = True
+
+    def clear(self) -> None:
+        """Eliminar todos los puntos"""
+        with self._lock:
+            self._reset()
+
+    # ---- lectura ----
+
+    def _parent_mask(self, parent_ids: Iterable[str]) -> np.ndarray:
+        codes = [self._parent_codes[parent_id] for parent_id in map(str, parent_ids) if parent_id in self._parent_codes]
+        return np.isin(self._parents[:self._count], codes) & self._alive[:self._count]
+
+    def search(self, query_vector: Iterable[float], limit: int) -> List[Tuple[PointId, float, Dict[str, Any]]]:
+        """Los `limit` puntos más similares como (id, similitud coseno, payload)"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm or limit <= 0:
+            return []
+
+        with self._lock:
+            if not self._rows:
+                return []
+            scores = self._matrix[:self._count] @ (query / norm)
+            if self._dead:
+                scores[~self._alive[:self._count]] = -np.inf
+
+            limit = min(limit, len(self._rows))
+            top = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[row], float(scores[row]), self._payloads[row]) for row in top if self._alive[row]]
+
+    def retrieve(self, ids: Iterable[PointId]) -> List[Tuple[PointId, Dict[str, Any]]]:
+        """Puntos existentes de `ids` como (id, payload), en el orden pedido"""
+        with self._lock:
+            result = []
+            for point_id in map(normalize_point_id, ids):
+                row = self._rows.get(point_id)
+                if row is not None:
+                    result.append((point_id, self._payloads[row]))
+            return result
+
+    def first_chunks(self, parent_ids: Optional[Iterable[str]] = None) -> List[Tuple[PointId, Dict[str, Any]]]:
+        """Primer fragmento (chunk_index 0) de los documentos indicados o de todos"""
+        with self._lock:
+            mask = self._alive[:self._count] & (self._chunk_indices[:self._count] == 0)
+            if parent_ids is not None:
+                mask &= self._parent_mask(parent_ids)
+            return [(self._ids[row], self._payloads[row]) for row in np.flatnonzero(mask)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
@@ -0,0 +1,279 @@
+"""
+Servidores HTTP locales que imitan servicios externos para pruebas y benchmarks.
+Se ejecutan en un hilo en segundo plano sobre 127.0.0.1 con un puerto libre.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import urlparse, parse_qs
+
+
+def fake_embedding(text: str, size: int) -> List[float]:
+    """Vector determinista derivado del hash del texto"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(digest[i % len(digest)] - 128) / 128.0 for i in range(size)]
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # Cola de conexiones amplia: con la de por defecto (5) una ráfaga de
+    # conexiones simultáneas provoca reintentos de conexión de ~1 s
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class _StubServer:
+    """Base común: arranque y parada del servidor en un hilo"""
+
+    def __init__(self):
+        self.httpd = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _handler_class(self):
+        raise NotImplementedError
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.httpd = _HTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubOpenAIServer(_StubServer):
+    """
+    Servidor compatible con la API de OpenAI para los endpoints de embeddings
+    y de chat. Cada petición de embeddings cuesta `latency` segundos más
+    `per_input_latency` por texto; cada respuesta de chat, `chat_latency`
+    (con stream=True, repartidos entre los tokens).
+    """
+
+    def __init__(self, vector_size: int = 8, latency: float = 0.0, per_input_latency: float = 0.0,
+                 chat_latency: float = 0.0):
+        super().__init__()
+        self.vector_size = vector_size
+        self.latency = latency
+        self.per_input_latency = per_input_latency
+        self.chat_latency = chat_latency
+        self.embedding_requests = 0
+        self.embedding_inputs = 0
+        self.chat_requests = 0
+        self.chat_active = 0
+        self.chat_max_active = 0
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path.endswith("/embeddings"):
+                    server.handle_embeddings(self, request)
+                elif self.path.endswith("/chat/completions"):
+                    server.handle_chat(self, request)
+                else:
+                    self._send_json({"error": {"message": "not found"}}, status=404)
+
+        return Handler
+
+    def handle_embeddings(self, handler, request):
+        inputs = request["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        with self.lock:
+            self.embedding_requests += 1
+            self.embedding_inputs += len(inputs)
+
+        time.sleep(self.latency + self.per_input_latency * len(inputs))
+
+        handler._send_json({
+            "object": "list",
+            "model": request.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text, self.vector_size)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    def handle_chat(self, handler, request):
+        # La respuesta repite la consulta para poder comprobarla en las pruebas
+        content = self.chat_answer(request)
+
+        with self.lock:
+            self.chat_requests += 1
+            self.chat_active += 1
+            self.chat_max_active = max(self.chat_max_active, self.chat_active)
+
+        try:
+            if request.get("stream"):
+                self._stream_chat(handler, request, content)
+                return
+
+            time.sleep(self.chat_latency)
+            handler._send_json({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        finally:
+            with self.lock:
+                self.chat_active -= 1
+
+    @staticmethod
+    def chat_answer(request) -> str:
+        return f"Respuesta a: {request['messages'][-1]['content'][:200]}"
+
+    def _stream_chat(self, handler, request, content):
+        """Enviar la respuesta palabra a palabra como eventos SSE, repartiendo `chat_latency`"""
+        tokens = [word + " " for word in content.split(" ")]
+        tokens[-1] = tokens[-1].rstrip(" ")
+        delay = self.chat_latency / len(tokens)
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.end_headers()
+
+        def send(delta, finish_reason=None):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        for token in tokens:
+            time.sleep(delay)
+            send({"role": "assistant", "content": token})
+        send({}, finish_reason="stop")
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+
+class StubPublicationsServer(_StubServer):
+    """
+    API de publicaciones paginada (?limit=N&page=P) que puede inyectar
+    latencia y errores 5xx. `fail_first` hace que cada página falle con 503
+    las primeras veces que se pide; `invalid_json_first`, que responda 200
+    con un cuerpo que no es JSON.
+    """
+
+    def __init__(self, total: int = 250, latency: float = 0.0, fail_first: int = 0,
+                 always_fail_pages=(), invalid_json_first: int = 0):
+        super().__init__()
+        self.total = total
+        self.latency = latency
+        self.fail_first = fail_first
+        self.invalid_json_first = invalid_json_first
+        self.always_fail_pages = set(always_fail_pages)
+        self.page_requests = {}
+        self.active = 0
+        self.max_active = 0
+        self.connections = set()
+
+    @staticmethod
+    def publication(nid: int):
+        return {
+            "nid": [{"value": nid}],
+            "uuid": [{"value": f"00000000-0000-4000-8000-{nid:012d}"}],
+            "vid": [{"value": 1}],
+            "title": [{"value": f"Publicación {nid}"}],
+            "body": [{"processed": f"<p>Contenido de la publicación {nid}</p>"}],
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 para permitir conexiones persistentes
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                limit = int(params.get("limit", ["100"])[0])
+                page = int(params.get("page", ["0"])[0])
+
+                with server.lock:
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    server.connections.add(self.client_address)
+                    attempt = server.page_requests.get(page, 0)
+                    server.page_requests[page] = attempt + 1
+
+                try:
+                    time.sleep(server.latency)
+
+                    if page in server.always_fail_pages or attempt < server.fail_first:
+                        self._send(503, {"error": "unavailable"})
+                        return
+
+                    if attempt < server.invalid_json_first:
+                        body = b"<html><body>Bad gateway</body></html>"
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/html")
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+
+                    start = page * limit
+                    end = min(start + limit, server.total)
+                    self._send(200, [server.publication(nid) for nid in range(start, end)])
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+        return Handler
@@ -1,5 +1,6 @@
 import os
 import json
+import time
 import unittest
 import sys
 from pathlib import Path
@@ -17,7 +18,13 @@ class TestRagAPI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Configuración inicial para todas las pruebas de API"""
+        # Con el contexto se ejecuta el arranque de la aplicación (servicios y calentamiento)
         cls.client = TestClient(app)
+        cls.client.__enter__()
+        for _ in range(600):
+            if cls.client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.1)
         
         # Preparar archivo de prueba si no existe
         if not os.path.exists('test_data.json'):
@@ -42,6 +49,8 @@ class TestRagAPI(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Limpieza después de las pruebas de API"""
+        cls.client.__exit__(None, None, None)
+        
         # Limpiar archivos de prueba
         if os.path.exists('test_data.json'):
             os.unlink('test_data.json')
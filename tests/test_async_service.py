@@ -0,0 +1,160 @@
+import asyncio
+import time
+import unittest
+import sys
+from pathlib import Path
+
+from openai import AsyncOpenAI
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.mcp_architecture import AsyncMCPRagService
+from tests.stubs import StubOpenAIServer, fake_embedding
+
+CONFIG = {
+    "EMBEDDING_MODEL": "stub-embeddings",
+    "LLM_MODEL": "stub-llm",
+    "LLM_TEMPERATURE": 0.3,
+    "VECTOR_SIZE": 8,
+    "COLLECTION_NAME": "async_test",
+    "CHUNK_SEARCH_FACTOR": 4,
+    "MAX_PASSAGES_PER_DOC": 3,
+}
+
+
+class TestAsyncMCPRagService(unittest.TestCase):
+    """Pruebas de la ruta de consulta asíncrona"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=CONFIG["VECTOR_SIZE"], latency=0.05, chat_latency=0.3).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    async def _service(self, config=CONFIG):
+        qdrant_client = AsyncQdrantClient(":memory:")
+        await qdrant_client.create_collection(
+            CONFIG["COLLECTION_NAME"],
+            vectors_config=models.VectorParams(size=CONFIG["VECTOR_SIZE"], distance=models.Distance.COSINE)
+        )
+        await qdrant_client.upsert(CONFIG["COLLECTION_NAME"], points=[
+            models.PointStruct(
+                id=i,
+                vector=fake_embedding(f"texto {i}", CONFIG["VECTOR_SIZE"]),
+                payload={"parent_id": str(i), "chunk_index": 0, "title": f"Documento {i}", "text": f"texto {i}"}
+            )
+            for i in range(20)
+        ])
+        openai_client = AsyncOpenAI(api_key="stub", base_url=self.server.base_url)
+        return AsyncMCPRagService(config, openai_client=openai_client, qdrant_client=qdrant_client)
+
+    def test_query(self):
+        """Una consulta devuelve documentos agrupados y la respuesta del LLM"""
+        async def run():
+            service = await self._service()
+            try:
+                return await service.query("texto 3", limit=2)
+            finally:
+                await service.close()
+
+        result = asyncio.run(run())
+
+        self.assertEqual(len(result["documents"]), 2)
+        self.assertEqual(result["documents"][0]["id"], "3")
+        self.assertEqual(result["documents"][0]["passages"][0]["text"], "texto 3")
+        self.assertTrue(result["answer"].startswith("Respuesta a:"))
+
+    def test_concurrent_queries_do_not_serialize(self):
+        """N consultas simultáneas tardan aproximadamente lo mismo que una"""
+        concurrency = 10
+
+        async def run():
+            service = await self._service()
+            try:
+                start = time.perf_counter()
+                await service.query("texto 1")
+                single = time.perf_counter() - start
+
+                start = time.perf_counter()
+                results = await asyncio.gather(*(service.query(f"texto {i}") for i in range(concurrency)))
+                concurrent = time.perf_counter() - start
+                return single, concurrent, results
+            finally:
+                await service.close()
+
+        single, concurrent, results = asyncio.run(run())
+
+        self.assertEqual(len(results), concurrency)
+        self.assertEqual(self.server.chat_requests, concurrency + 1)
+        self.assertGreater(self.server.chat_max_active, 1)
+        # En serie tardarían unas N veces una consulta
+        self.assertLess(concurrent, single * 3)
+
+    def test_identical_concurrent_queries_coalesced(self):
+        """Consultas iguales simultáneas comparten una sola llamada al LLM"""
+        concurrency = 20
+        queries = ["Texto 5", "texto 5", "  texto   5 "] * 6 + ["texto 6", "texto 6"]
+
+        async def run():
+            service = await self._service({**CONFIG, "QUERY_COALESCING_ENABLED": True})
+            try:
+                embedding_requests = self.server.embedding_requests
+                results = await asyncio.gather(*(service.query(query, limit=2) for query in queries))
+                return service.single_flight.stats(), results, self.server.embedding_requests - embedding_requests
+            finally:
+                await service.close()
+
+        stats, results, embedding_requests = asyncio.run(run())
+
+        self.assertEqual(len(results), concurrency)
+        # Una llamada para "texto 5" (con sus variantes) y otra para "texto 6"
+        self.assertEqual(self.server.chat_requests, 2)
+        self.assertEqual(embedding_requests, 2)
+        self.assertEqual(stats["executions"], 2)
+        self.assertEqual(stats["coalesced"], concurrency - 2)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual([result["query"] for result in results], queries)
+        self.assertEqual(len({result["answer"] for result in results[:18]}), 1)
+        # Cada petición recibe su propia copia del resultado
+        results[0]["documents"] = []
+        self.assertEqual(len(results[1]["documents"]), 2)
+
+    def test_query_stream(self):
+        """Los documentos llegan antes que la respuesta y los tokens forman la respuesta completa"""
+        async def run():
+            service = await self._service()
+            try:
+                answer = (await service.query("texto 3", limit=2))["answer"]
+
+                start = time.perf_counter()
+                events = []
+                async for event in service.query_stream("texto 3", limit=2):
+                    events.append((time.perf_counter() - start, event))
+                return answer, events
+            finally:
+                await service.close()
+
+        answer, events = asyncio.run(run())
+        names = [event["event"] for _, event in events]
+
+        self.assertEqual(names[0], "documents")
+        self.assertEqual(names[-1], "done")
+        self.assertGreater(names.count("token"), 1)
+        self.assertEqual(events[0][1]["data"]["documents"][0]["id"], "3")
+        self.assertEqual("".join(event["data"]["text"] for _, event in events if event["event"] == "token"), answer)
+
+        # Los documentos se envían tras la búsqueda, sin esperar a la generación
+        first_event_time, total_time = events[0][0], events[-1][0]
+        self.assertLess(first_event_time, total_time / 2)
+
+        timings = events[-1][1]["data"]["timings"]
+        self.assertLessEqual(timings["retrieval_ms"], timings["first_token_ms"])
+        self.assertLessEqual(timings["first_token_ms"], timings["total_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.chunking import strip_html, split_into_windows, chunk_point_id
+
+
+class TestChunking(unittest.TestCase):
+    """Pruebas de la división de documentos en fragmentos"""
+
+    def test_strip_html(self):
+        """Se eliminan etiquetas, scripts y entidades HTML"""
+        html = "<p>Informe&nbsp;sobre <b>economía</b> circular</p><script>alert(1)</script><p>Fin</p>"
+        self.assertEqual(strip_html(html), "Informe sobre economía circular Fin")
+
+    def test_windows_overlap(self):
+        """Las ventanas tienen el tamaño indicado y se solapan"""
+        text = " ".join(f"t{i}" for i in range(10))
+        windows = split_into_windows(text, size=4, overlap=1)
+
+        self.assertEqual(windows[0], "t0 t1 t2 t3")
+        self.assertEqual(windows[1], "t3 t4 t5 t6")
+        self.assertEqual(windows[-1].split()[-1], "t9")
+
+    def test_short_text_single_window(self):
+        """Un texto corto produce una única ventana y uno vacío ninguna"""
+        self.assertEqual(split_into_windows("uno dos", size=4, overlap=1), ["uno dos"])
+        self.assertEqual(split_into_windows("   ", size=4, overlap=1), [])
+
+    def test_chunk_point_id_is_stable(self):
+        """El ID de un fragmento es determinista y distinto por índice"""
+        self.assertEqual(chunk_point_id("doc", 0), chunk_point_id("doc", 0))
+        self.assertNotEqual(chunk_point_id("doc", 0), chunk_point_id("doc", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
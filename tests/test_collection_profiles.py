@@ -0,0 +1,85 @@
+import unittest
+import sys
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import ContextComponent
+from src.utils.collection_profiles import PROFILES, get_profile, collection_params, search_params
+from tests.stubs import fake_embedding
+
+VECTOR_SIZE = 8
+
+
+class TestCollectionProfiles(unittest.TestCase):
+    """Perfiles de cuantización, HNSW y almacenamiento de la colección"""
+
+    def test_collection_params(self):
+        """Cada perfil se traduce en los argumentos de create_collection"""
+        default = collection_params(get_profile("default"), VECTOR_SIZE)
+        self.assertIsNone(default["quantization_config"])
+        self.assertFalse(default["vectors_config"].on_disk)
+        self.assertEqual(default["hnsw_config"].m, 16)
+
+        scalar = collection_params(get_profile("scalar_on_disk"), VECTOR_SIZE)
+        self.assertIsInstance(scalar["quantization_config"], models.ScalarQuantization)
+        self.assertTrue(scalar["quantization_config"].scalar.always_ram)
+        self.assertTrue(scalar["vectors_config"].on_disk)
+        self.assertTrue(scalar["on_disk_payload"])
+
+        binary = collection_params(get_profile("binary_on_disk"), VECTOR_SIZE)
+        self.assertIsInstance(binary["quantization_config"], models.BinaryQuantization)
+
+    def test_search_params_overrides(self):
+        """Los valores de la petición sustituyen a los del perfil"""
+        self.assertIsNone(search_params(get_profile("default")))
+
+        params = search_params(get_profile("high_recall"))
+        self.assertEqual(params.hnsw_ef, 256)
+        self.assertEqual(search_params(get_profile("high_recall"), hnsw_ef=64).hnsw_ef, 64)
+
+        params = search_params(get_profile("scalar"), exact=True)
+        self.assertTrue(params.exact)
+        self.assertTrue(params.quantization.rescore)
+        self.assertEqual(params.quantization.oversampling, 2.0)
+
+    def test_unknown_profile(self):
+        """Un perfil desconocido se rechaza indicando los disponibles"""
+        with self.assertRaises(ValueError) as error:
+            get_profile("no_existe")
+        self.assertIn("scalar", str(error.exception))
+
+    def test_retrieve_with_each_profile(self):
+        """La colección se crea con cada perfil y las búsquedas aceptan los ajustes por petición"""
+        for name in PROFILES:
+            with self.subTest(profile=name):
+                config = load_config()
+                config.update({
+                    "VECTOR_SIZE": VECTOR_SIZE,
+                    "COLLECTION_NAME": f"profile_{name}",
+                    "COLLECTION_PROFILE": name,
+                })
+                context = ContextComponent(QdrantClient(":memory:"), config)
+
+                documents = [
+                    {"id": f"00000000-0000-4000-8000-{i:012d}", "title": f"Documento {i}", "summary": "", "body": "", "metadata": {}}
+                    for i in range(1, 6)
+                ]
+                context.store_documents(documents, [fake_embedding(f"doc{i}", VECTOR_SIZE) for i in range(1, 6)])
+
+                query_vector = fake_embedding("doc3", VECTOR_SIZE)
+                approximate = context.retrieve_documents(query_vector, limit=2, hnsw_ef=32)
+                exact = context.retrieve_documents(query_vector, limit=2, exact=True)
+
+                self.assertEqual(approximate[0]["id"], documents[2]["id"])
+                self.assertEqual([doc["id"] for doc in approximate], [doc["id"] for doc in exact])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.context_packer import pack_context
+from src.utils.chunking import split_into_windows
+from src.utils.tokens import estimate_tokens
+from src.mcp_architecture import build_llm_prompt
+
+
+def _words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+class TestContextPacker(unittest.TestCase):
+    """Empaquetado del contexto dentro de un presupuesto de tokens"""
+
+    def test_respects_budget(self):
+        """El contexto no supera el presupuesto aunque los cuerpos sean largos"""
+        documents = [
+            {"id": str(i), "title": f"Documento {i}", "summary": "", "body": f"<p>{_words(f'd{i}w', 2000)}</p>"}
+            for i in range(5)
+        ]
+
+        for budget in (200, 1000, 3000):
+            context, stats = pack_context(documents, budget)
+            self.assertLessEqual(stats["tokens_used"], budget)
+            self.assertEqual(stats["tokens_used"], estimate_tokens(context))
+            self.assertGreater(stats["tokens_used"], budget * 0.8)
+
+    def test_strips_html(self):
+        """El marcado no gasta tokens del presupuesto"""
+        documents = [{"id": "1", "title": "<b>Agua</b>", "summary": "<p>Resumen</p>",
+                      "body": '<div class="x"><p>Texto <a href="http://ejemplo.org">del</a> cuerpo</p></div>'}]
+
+        context, _ = pack_context(documents, 500)
+
+        self.assertNotIn("<", context)
+        self.assertIn("Título: Agua", context)
+        self.assertIn("Texto del cuerpo", context)
+
+    def test_best_passage_of_each_document_first(self):
+        """Con poco presupuesto entra el primer pasaje de cada documento antes que el segundo"""
+        documents = [
+            {"id": str(i), "title": f"D{i}", "passages": [
+                {"text": _words(f"d{i}a", 60), "chunk_index": 0, "score": 0.9},
+                {"text": _words(f"d{i}b", 60), "chunk_index": 1, "score": 0.8},
+            ]}
+            for i in range(3)
+        ]
+
+        context, stats = pack_context(documents, 500)
+
+        self.assertEqual(stats["documents"], 3)
+        for i in range(3):
+            self.assertIn(f"d{i}a59", context)
+        self.assertNotIn("d2b59", context)
+
+    def test_overlapping_chunks_deduplicated(self):
+        """El solape entre fragmentos contiguos y el texto repetido no se envían dos veces"""
+        text = _words("w", 300)
+        windows = split_into_windows(text, 100, 40)
+        documents = [
+            {"id": "1", "title": "A", "passages": [
+                {"text": window, "chunk_index": i, "score": 0.5} for i, window in enumerate(windows)
+            ]},
+            {"id": "2", "title": "B", "passages": [{"text": windows[0], "chunk_index": 0, "score": 0.5}]},
+        ]
+
+        context, stats = pack_context(documents, 5000)
+
+        for i in range(300):
+            self.assertEqual(context.split().count(f"w{i}"), 1)
+        self.assertEqual(stats["documents"], 1)
+        self.assertEqual(stats["duplicates_removed"], 1)
+
+    def test_document_without_passages_or_body(self):
+        """Un documento con título y resumen pero sin cuerpo aporta su cabecera"""
+        documents = [
+            {"id": "1", "title": "Agua", "summary": "", "body": _words("w", 50)},
+            {"id": "2", "title": "Saneamiento rural", "summary": "<p>Informe sobre letrinas</p>", "body": ""},
+        ]
+
+        context, stats = pack_context(documents, 1000)
+
+        self.assertEqual(stats["documents"], 2)
+        self.assertIn("Título: Saneamiento rural\nResumen: Informe sobre letrinas", context)
+        self.assertEqual(context.count("Fragmentos relevantes:"), 1)
+
+    def test_prompt_uses_component_window(self):
+        """El tamaño de las ventanas llega del componente que construye el prompt"""
+        documents = [{"id": "1", "title": "Agua", "summary": "", "body": _words("w", 1000)}]
+
+        _, wide = build_llm_prompt("consulta", documents, token_budget=5000, window_words=500)
+        _, narrow = build_llm_prompt("consulta", documents, token_budget=5000, window_words=100)
+
+        self.assertEqual(wide["passages"], 2)
+        self.assertEqual(narrow["passages"], 10)
+
+    def test_prompt_reports_tokens(self):
+        """Los mensajes del LLM se construyen con el contexto empaquetado"""
+        documents = [{"id": "1", "title": "Agua", "summary": "", "body": _words("w", 5000)}]
+
+        messages, stats = build_llm_prompt("consulta", documents, token_budget=400)
+
+        self.assertIn("Consulta: consulta", messages[1]["content"])
+        self.assertLessEqual(stats["tokens_used"], 400)
+        self.assertLess(estimate_tokens(messages[1]["content"]), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import unittest
+import tempfile
+import sys
+from pathlib import Path
+
+from openai import OpenAI
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.embedding_cache import EmbeddingCache
+from src.mcp_architecture import ModelComponent
+from tests.stubs import StubOpenAIServer
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Pruebas de la caché persistente de embeddings"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "embeddings.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hits_and_misses(self):
+        """Los textos guardados se recuperan y los contadores reflejan el uso"""
+        cache = EmbeddingCache(self.path, "modelo", vector_size=3)
+        cache.put_many(["hola mundo"], [[0.1, 0.2, 0.3]])
+
+        results = cache.get_many(["hola mundo", "otro texto"])
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(results[0]), 3)
+        self.assertAlmostEqual(results[0][1], 0.2, places=5)
+        self.assertIsNone(results[1])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_normalized_text_shares_entry(self):
+        """Diferencias de espaciado no generan entradas distintas"""
+        cache = EmbeddingCache(self.path, "modelo", vector_size=2)
+        cache.put_many(["  hola   mundo \n"], [[1.0, 0.0]])
+
+        self.assertIsNotNone(cache.get_many(["hola mundo"])[0])
+
+    def test_persistence_between_instances(self):
+        """Las entradas sobreviven al cierre de la caché"""
+        cache = EmbeddingCache(self.path, "modelo", vector_size=2)
+        cache.put_many(["texto"], [[1.0, 2.0]])
+        cache.close()
+
+        reopened = EmbeddingCache(self.path, "modelo", vector_size=2)
+        self.assertEqual(reopened.get_many(["texto"])[0], [1.0, 2.0])
+
+    def test_invalidation_on_model_or_size_change(self):
+        """Cambiar el modelo o el tamaño del vector invalida las entradas"""
+        cache = EmbeddingCache(self.path, "modelo", vector_size=2)
+        cache.put_many(["texto"], [[1.0, 2.0]])
+        cache.close()
+
+        other_model = EmbeddingCache(self.path, "otro-modelo", vector_size=2)
+        self.assertIsNone(other_model.get_many(["texto"])[0])
+        other_model.close()
+
+        resized = EmbeddingCache(self.path, "modelo", vector_size=3)
+        self.assertIsNone(resized.get_many(["texto"])[0])
+
+    def test_lru_eviction(self):
+        """Al superar el límite se expulsan las entradas menos usadas"""
+        cache = EmbeddingCache(self.path, "modelo", vector_size=1, max_entries=2)
+        cache.put_many(["a"], [[1.0]])
+        cache.put_many(["b"], [[2.0]])
+
+        # Usar "a" para que "b" pase a ser la menos reciente
+        cache.get_many(["a"])
+        cache.put_many(["c"], [[3.0]])
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNotNone(cache.get_many(["a"])[0])
+        self.assertIsNone(cache.get_many(["b"])[0])
+
+
+class TestModelComponentEmbeddingCache(unittest.TestCase):
+    """El componente Model no vuelve a llamar al modelo para textos sin cambios"""
+
+    def test_reindex_without_changes_makes_no_model_calls(self):
+        with tempfile.TemporaryDirectory() as temp_dir, StubOpenAIServer(vector_size=4) as server:
+            config = {
+                "EMBEDDING_MODEL": "stub-embeddings",
+                "VECTOR_SIZE": 4,
+                "EMBEDDING_BATCH_SIZE": 16,
+                "EMBEDDING_BATCH_MAX_TOKENS": 60000,
+                "EMBEDDING_MAX_INPUT_TOKENS": 8000,
+                "EMBEDDING_CACHE_PATH": os.path.join(temp_dir, "embeddings.sqlite"),
+                "EMBEDDING_CACHE_MAX_ENTRIES": 1000,
+            }
+            model = ModelComponent(OpenAI(api_key="stub", base_url=server.base_url), config)
+
+            documents = [
+                {"id": str(i), "title": f"Documento {i}", "summary": "", "body": f"Contenido {i}"}
+                for i in range(40)
+            ]
+
+            first = model.create_document_embeddings(documents)
+            requests_after_first = server.embedding_requests
+            self.assertGreater(requests_after_first, 0)
+
+            second = model.create_document_embeddings(documents)
+
+            self.assertEqual(server.embedding_requests, requests_after_first)
+            self.assertEqual(len(second), len(first))
+            for a, b in zip(first, second):
+                self.assertEqual(len(a), len(b))
+                for x, y in zip(a, b):
+                    self.assertAlmostEqual(x, y, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
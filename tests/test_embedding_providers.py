@@ -0,0 +1,143 @@
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService, AsyncMCPRagService
+from src.utils.embedding_providers import LocalEmbeddingProvider, OpenAIEmbeddingProvider, create_embedding_provider
+from tests.stubs import StubOpenAIServer, fake_embedding
+
+LOCAL_SIZE = 6
+
+
+class HashEncoder:
+    """Modelo local de prueba con la interfaz de SentenceTransformer"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return LOCAL_SIZE
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.calls += 1
+        return np.array([fake_embedding(text, LOCAL_SIZE) for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingProviders(unittest.TestCase):
+    """Proveedor local o remoto, detección de la dimensión y comprobación contra la colección"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=8).start()
+        self.config = load_config()
+        self.config.update({
+            "VECTOR_SIZE": None,
+            "COLLECTION_NAME": "embedding_providers_test",
+            "CONTEXT_BACKEND": "qdrant",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "HYBRID_SEARCH_ENABLED": False,
+            "RERANK_ENABLED": False,
+        })
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _service(self, **kwargs):
+        return MCPRagService(
+            self.config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=kwargs.pop("qdrant_client", None) or QdrantClient(":memory:"),
+            **kwargs
+        )
+
+    def test_local_provider_makes_no_external_calls(self):
+        """Con el proveedor local la colección toma su dimensión y las consultas no llaman a la API"""
+        encoder = HashEncoder()
+        service = self._service(embedding_provider=LocalEmbeddingProvider("hash", model=encoder))
+
+        self.assertEqual(service.config["VECTOR_SIZE"], LOCAL_SIZE)
+        info = service.qdrant_client.get_collection(self.config["COLLECTION_NAME"])
+        self.assertEqual(info.config.params.vectors.size, LOCAL_SIZE)
+
+        service._store_documents([
+            {"id": "00000000-0000-4000-8000-000000000001", "title": "Agua", "summary": "", "body": "agua potable"}
+        ])
+        query_vector = service.model.create_embedding("agua potable")
+        documents = service.context.retrieve_documents(query_vector, limit=1)
+
+        self.assertEqual(len(query_vector), LOCAL_SIZE)
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(self.server.embedding_requests, 0)
+
+    def test_remote_dimension_detected(self):
+        """Sin VECTOR_SIZE, la dimensión del modelo remoto se detecta con una petición de prueba"""
+        provider = create_embedding_provider(self.config, OpenAI(api_key="stub", base_url=self.server.base_url))
+
+        self.assertIsInstance(provider, OpenAIEmbeddingProvider)
+        self.assertEqual(provider.dimension, 8)
+        self.assertEqual(provider.dimension, 8)
+        self.assertEqual(self.server.embedding_requests, 1)
+
+    def test_remote_dimension_checked_against_vector_size(self):
+        """Con VECTOR_SIZE fijado también se detecta la dimensión del modelo remoto y se compara"""
+        self.config["VECTOR_SIZE"] = 16
+        provider = create_embedding_provider(self.config, OpenAI(api_key="stub", base_url=self.server.base_url))
+        self.assertEqual(provider.dimension, 8)
+
+        with self.assertRaises(ValueError):
+            self._service()
+
+    def test_dimension_mismatch_fails_at_startup(self):
+        """Una colección existente con otra dimensión (o un VECTOR_SIZE distinto) impide arrancar"""
+        client = QdrantClient(":memory:")
+        client.create_collection(
+            collection_name=self.config["COLLECTION_NAME"],
+            vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE)
+        )
+        with self.assertRaises(ValueError):
+            self._service(qdrant_client=client, embedding_provider=LocalEmbeddingProvider("hash", model=HashEncoder()))
+
+        self.config["VECTOR_SIZE"] = 8
+        with self.assertRaises(ValueError):
+            self._service(embedding_provider=LocalEmbeddingProvider("hash", model=HashEncoder()))
+
+    def test_async_service_with_local_provider(self):
+        """El servicio asíncrono calienta y vectoriza con el modelo local, fuera del bucle de eventos"""
+        self.config.update({"CONTEXT_BACKEND": "numpy", "NUMPY_INDEX_PATH": ""})
+        encoder = HashEncoder()
+
+        async def run():
+            service = AsyncMCPRagService(
+                self.config,
+                openai_client=AsyncOpenAI(api_key="stub", base_url=self.server.base_url),
+                embedding_provider=LocalEmbeddingProvider("hash", model=encoder)
+            )
+            try:
+                timings = await service.warm_up()
+                vectors = await asyncio.gather(*(service.model.create_embedding(f"consulta {i}") for i in range(4)))
+                return timings, vectors
+            finally:
+                await service.close()
+
+        timings, vectors = asyncio.run(run())
+
+        self.assertIn("embedding_ms", timings)
+        self.assertEqual(vectors[0], fake_embedding("consulta 0", LOCAL_SIZE))
+        self.assertEqual(self.server.embedding_requests, 0)
+        # Calentamiento + un micro-lote con las cuatro consultas
+        self.assertEqual(encoder.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.fetcher import PublicationFetcher, FetchError
+from tests.stubs import StubPublicationsServer
+
+
+class TestPublicationFetcher(unittest.TestCase):
+    """Pruebas de la descarga paginada contra un servidor local con fallos"""
+
+    def _fetcher(self, server, **kwargs):
+        options = {"page_size": 20, "concurrency": 4, "max_retries": 3, "backoff_base": 0.01, "backoff_max": 0.05}
+        options.update(kwargs)
+        return PublicationFetcher(server.base_url + "/api", **options)
+
+    def test_fetch_all_pages(self):
+        """Se descargan todas las publicaciones una sola vez y en orden"""
+        with StubPublicationsServer(total=95, latency=0.01) as server:
+            publications = self._fetcher(server).fetch_all()
+
+        nids = [pub["nid"][0]["value"] for pub in publications]
+        self.assertEqual(nids, list(range(95)))
+
+    def test_retries_transient_errors(self):
+        """Los errores 503 se reintentan hasta obtener la página"""
+        with StubPublicationsServer(total=60, fail_first=2) as server:
+            fetcher = self._fetcher(server)
+            publications = fetcher.fetch_all()
+
+        self.assertEqual(len(publications), 60)
+        # Cada página falla dos veces antes de responder
+        self.assertEqual(server.page_requests[0], 3)
+        self.assertGreaterEqual(fetcher.retries, 2 * 3)
+
+    def test_gives_up_after_max_retries(self):
+        """Una página que siempre falla termina en FetchError"""
+        with StubPublicationsServer(total=60, always_fail_pages={1}) as server:
+            fetcher = self._fetcher(server, max_retries=2)
+            with self.assertRaises(FetchError):
+                fetcher.fetch_all()
+
+        self.assertEqual(server.page_requests[1], 3)
+
+    def test_retries_invalid_json(self):
+        """Un cuerpo que no es JSON cuenta como intento fallido: se reintenta y luego FetchError"""
+        with StubPublicationsServer(total=30, invalid_json_first=1) as server:
+            fetcher = self._fetcher(server)
+            publications = fetcher.fetch_all()
+
+        self.assertEqual(len(publications), 30)
+        self.assertEqual(server.page_requests[0], 2)
+
+        with StubPublicationsServer(total=30, invalid_json_first=10) as server:
+            fetcher = self._fetcher(server, max_retries=2)
+            with self.assertRaises(FetchError):
+                fetcher.fetch_all()
+
+        self.assertEqual(server.page_requests[0], 3)
+
+    def test_limit(self):
+        """Con `limit` no se piden más páginas de las necesarias"""
+        with StubPublicationsServer(total=500) as server:
+            publications = self._fetcher(server).fetch_all(limit=45)
+
+        self.assertEqual(len(publications), 45)
+        self.assertEqual(sorted(server.page_requests), [0, 1, 2])
+
+    def test_bounded_concurrency_and_connection_reuse(self):
+        """Las páginas se piden en paralelo, sin superar el límite, reutilizando conexiones"""
+        with StubPublicationsServer(total=400, latency=0.05) as server:
+            fetcher = self._fetcher(server, concurrency=4)
+            start = time.perf_counter()
+            publications = fetcher.fetch_all()
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(publications), 400)
+        self.assertGreater(server.max_active, 1)
+        self.assertLessEqual(server.max_active, 4)
+        self.assertLessEqual(len(server.connections), 4)
+        # 21 páginas de 50 ms en serie tardarían más de 1 s
+        self.assertLess(elapsed, 21 * 0.05)
+
+    def test_pages_are_yielded_as_they_arrive(self):
+        """La primera página se entrega antes de terminar la descarga completa"""
+        with StubPublicationsServer(total=200, latency=0.05) as server:
+            fetcher = self._fetcher(server, concurrency=2)
+            start = time.perf_counter()
+            pages = fetcher.iter_pages()
+            next(pages)
+            first_page_time = time.perf_counter() - start
+            remaining = list(pages)
+            total_time = time.perf_counter() - start
+
+        self.assertEqual(len(remaining), 9)
+        self.assertLess(first_page_time, total_time / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import sys
+from pathlib import Path
+
+from openai import OpenAI
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from src.utils.sparse import BM25Encoder, tokenize, token_index, reciprocal_rank_fusion
+from tests.stubs import StubOpenAIServer
+
+VECTOR_SIZE = 8
+
+
+def _point(point_id, parent_id=None):
+    return models.ScoredPoint(id=point_id, version=0, score=1.0, payload={"parent_id": parent_id or str(point_id)})
+
+
+class TestSparseEncoding(unittest.TestCase):
+    """Tokenización, pesos BM25 y fusión de rankings"""
+
+    def test_tokenize(self):
+        """Minúsculas, sin tildes ni palabras vacías"""
+        self.assertEqual(tokenize("El Informe de la CEPAL sobre Políticas"), ["informe", "cepal", "politicas"])
+
+    def test_document_weights_saturate(self):
+        """Repetir un término aumenta su peso con rendimientos decrecientes"""
+        encoder = BM25Encoder(avg_doc_len=10)
+        once = encoder.encode_document("cepal informe")
+        many = encoder.encode_document("cepal cepal cepal cepal informe")
+        index = once.indices.index(token_index("cepal"))
+        weight_once = once.values[index]
+        weight_many = many.values[many.indices.index(token_index("cepal"))]
+
+        self.assertGreater(weight_many, weight_once)
+        self.assertLess(weight_many, 4 * weight_once)
+        self.assertLess(weight_many, encoder.k1 + 1)
+
+        query = encoder.encode_query("informe CEPAL cepal")
+        self.assertEqual(query.values, [1.0, 1.0])
+
+    def test_reciprocal_rank_fusion(self):
+        """Los puntos presentes en ambos rankings suben; se conserva la posición en cada uno"""
+        fused = reciprocal_rank_fusion({
+            "dense": [_point(1), _point(2), _point(3)],
+            "sparse": [_point(3), _point(4)],
+        }, k=60)
+
+        self.assertEqual(fused[0]["point"].id, 3)
+        self.assertEqual(fused[0]["ranks"], {"dense": 3, "sparse": 1})
+        self.assertAlmostEqual(fused[0]["point"].score, 1 / 63 + 1 / 61)
+        self.assertEqual({entry["point"].id for entry in fused}, {1, 2, 3, 4})
+
+
+class TestHybridRetrieval(unittest.TestCase):
+    """La búsqueda BM25 recupera coincidencias exactas que la densa no encuentra"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE).start()
+        config = load_config()
+        config.update({
+            "VECTOR_SIZE": VECTOR_SIZE,
+            "COLLECTION_NAME": "hybrid_test",
+            "EMBEDDING_CACHE_PATH": "",
+            "HYBRID_SEARCH_ENABLED": True,
+        })
+        self.config = config
+        self.service = MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=QdrantClient(":memory:")
+        )
+        self.documents = [
+            {
+                "id": f"00000000-0000-4000-8000-{i:012d}",
+                "title": f"Publicación {i}",
+                "summary": "",
+                "body": f"<p>Contenido general número {i} sobre desarrollo y economía.</p>",
+                "metadata": {},
+            }
+            for i in range(30)
+        ]
+        self.documents[17]["title"] = "Informe ODS-XR7 de seguimiento"
+        self.service._store_documents(self.documents)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_exact_name_found_by_sparse_search(self):
+        """El documento con el nombre exacto aparece aunque los embeddings no lo acerquen"""
+        self.assertTrue(self.service.context.hybrid)
+
+        query = "informe ODS-XR7"
+        query_vector = self.service.model.create_embedding(query)
+        results = self.service.context.retrieve_documents(query_vector, limit=3, query_text=query)
+
+        self.assertEqual(results[0]["id"], self.documents[17]["id"])
+        self.assertEqual(results[0]["sources"]["sparse"], 1)
+
+        stats = self.service.context.hybrid_stats.stats()
+        self.assertEqual(stats["queries"], 1)
+        self.assertEqual(sum(stats["documents"].values()), 3)
+        self.assertIn("search", stats["avg_latency_ms"])
+
+    def test_dense_only_collection(self):
+        """Una colección sin vector disperso sigue funcionando solo con la búsqueda densa"""
+        config = dict(self.config, COLLECTION_NAME="dense_only_test")
+        client = QdrantClient(":memory:")
+        client.create_collection(
+            "dense_only_test",
+            vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE)
+        )
+        service = MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=client
+        )
+        self.assertFalse(service.context.hybrid)
+
+        service._store_documents(self.documents[:5])
+        result = service.query("informe", limit=2)
+        self.assertEqual(len(result["documents"]), 2)
+        self.assertNotIn("sources", result["documents"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import sys
+import uuid
+from pathlib import Path
+
+from openai import OpenAI
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from src.utils.index_jobs import JobStore, IndexJobManager, COMPLETED
+from tests.stubs import StubOpenAIServer, fake_embedding
+
+VECTOR_SIZE = 8
+PUBLICATIONS = 6
+
+
+def _publication(i, vid=1):
+    return {
+        "uuid": [{"value": str(uuid.UUID(int=i + 1))}],
+        "vid": [{"value": vid}],
+        "changed": [{"value": "2025-03-11T12:00:00+00:00"}],
+        "title": [{"value": f"Publicación {i}"}],
+        "body": [{"processed": f"<p>Contenido de la publicación {i}</p>", "summary": ""}],
+    }
+
+
+class TestIncrementalSync(unittest.TestCase):
+    """Reindexación incremental por revisiones y borrado en lote de lo que desaparece del origen"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE).start()
+        config = load_config()
+        config.update({
+            "VECTOR_SIZE": VECTOR_SIZE,
+            "CONTEXT_BACKEND": "qdrant",
+            "COLLECTION_NAME": "incremental_sync_test",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "HYBRID_SEARCH_ENABLED": False,
+            "RERANK_ENABLED": False,
+        })
+        self.client = QdrantClient(":memory:")
+        self.service = MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=self.client
+        )
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.stop(timeout=10)
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _store_legacy_point(self, doc_id):
+        """Punto de un documento almacenado antes de fragmentar: ID del documento y sin parent_id"""
+        self.client.upsert(collection_name="incremental_sync_test", points=[models.PointStruct(
+            id=doc_id,
+            vector=fake_embedding("legado", VECTOR_SIZE),
+            payload={"title": "Documento sin fragmentar", "body": "<p>Contenido antiguo</p>"}
+        )])
+
+    def _run_file_job(self, publications, delete_missing):
+        file_path = os.path.join(self.tmp.name, f"publicaciones-{len(self.managers)}.json")
+        with open(file_path, "w", encoding="utf-8") as data_file:
+            json.dump(publications, data_file)
+
+        manager = IndexJobManager(JobStore(), self.service.run_index_job).start()
+        self.managers.append(manager)
+        job = manager.submit("file", {"file_path": file_path, "batch_size": 4, "delete_missing": delete_missing})
+
+        deadline = time.monotonic() + 20
+        while manager.get(job["id"])["status"] != COMPLETED and time.monotonic() < deadline:
+            time.sleep(0.02)
+        job = manager.get(job["id"])
+        self.assertEqual(job["status"], COMPLETED, job["error"])
+        return job["progress"]
+
+    def test_sync_publications(self):
+        """Nuevo, sin cambios, actualizado y eliminado"""
+        publication = _publication(0)
+
+        counts = self.service.sync_publications([publication])
+        self.assertEqual(counts, {"added": 1, "updated": 0, "unchanged": 0, "deleted": 0})
+
+        # Sin cambios de revisión no se vuelve a vectorizar
+        requests = self.server.embedding_requests
+        counts = self.service.sync_publications([publication])
+        self.assertEqual(counts["unchanged"], 1)
+        self.assertEqual(self.server.embedding_requests, requests)
+
+        # Una nueva revisión se detecta como actualización
+        counts = self.service.sync_publications([_publication(0, vid=2)])
+        self.assertEqual(counts["updated"], 1)
+
+        # Si desaparece del origen se elimina
+        counts = self.service.sync_publications([])
+        self.assertEqual(counts["deleted"], 1)
+        self.assertEqual(self.service.context.list_document_ids(), [])
+
+    def test_index_job_is_incremental(self):
+        """Un trabajo de indexación solo vectoriza lo nuevo o cambiado e informa de cada caso"""
+        publications = [_publication(i) for i in range(PUBLICATIONS)]
+        progress = self._run_file_job(publications, delete_missing=False)
+        self.assertEqual(progress["docs_added"], PUBLICATIONS)
+        self.assertEqual(progress["docs_upserted"], PUBLICATIONS)
+
+        # Una publicación cambia de revisión y otra desaparece del origen
+        publications[0] = _publication(0, vid=2)
+        removed = publications.pop()
+        progress = self._run_file_job(publications, delete_missing=True)
+
+        self.assertEqual(progress["docs_seen"], PUBLICATIONS - 1)
+        self.assertEqual(progress["docs_added"], 0)
+        self.assertEqual(progress["docs_updated"], 1)
+        self.assertEqual(progress["docs_unchanged"], PUBLICATIONS - 2)
+        self.assertEqual(progress["docs_deleted"], 1)
+        self.assertEqual(progress["docs_embedded"], 1)
+        self.assertEqual(progress["docs_upserted"], 1)
+
+        stored = self.service.context.list_document_ids()
+        self.assertEqual(len(stored), PUBLICATIONS - 1)
+        self.assertNotIn(removed["uuid"][0]["value"], stored)
+
+    def test_legacy_points(self):
+        """Los documentos sin fragmentar se listan, se comparan y se eliminan como los demás"""
+        self.service.sync_publications([_publication(0)])
+        legacy_id = str(uuid.UUID(int=100))
+        self._store_legacy_point(legacy_id)
+
+        self.assertCountEqual(self.service.context.list_document_ids(), [str(uuid.UUID(int=1)), legacy_id])
+        # Existe, pero sin revisión almacenada
+        self.assertEqual(self.service.context.get_revisions([legacy_id, str(uuid.UUID(int=200))]), {legacy_id: None})
+
+        # Solo cuentan los documentos que existían
+        deleted = self.service.context.delete_documents([legacy_id, str(uuid.UUID(int=200))])
+        self.assertEqual(deleted, 1)
+        self.assertEqual(self.client.retrieve("incremental_sync_test", ids=[legacy_id]), [])
+        self.assertEqual(self.service.context.list_document_ids(), [str(uuid.UUID(int=1))])
+
+    def test_legacy_point_deleted_when_missing(self):
+        """Un documento sin fragmentar que ya no está en el origen también se elimina"""
+        legacy_id = str(uuid.UUID(int=100))
+        self._store_legacy_point(legacy_id)
+
+        counts = self.service.sync_publications([_publication(0)])
+
+        self.assertEqual(counts["deleted"], 1)
+        self.assertEqual(self.service.context.list_document_ids(), [str(uuid.UUID(int=1))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import sys
+import uuid
+from pathlib import Path
+
+from openai import OpenAI
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from src.utils.index_jobs import JobStore, JobProgress, IndexJobManager, QUEUED, COMPLETED, CANCELLED
+from tests.stubs import StubOpenAIServer
+
+BATCH_SIZE = 5
+PUBLICATIONS = 60
+
+
+def _publication(i):
+    return {
+        "uuid": [{"value": str(uuid.UUID(int=i + 1))}],
+        "title": [{"value": f"Publicación {i}"}],
+        "body": [{"processed": f"<p>Contenido de la publicación {i} sobre agua y saneamiento</p>", "summary": ""}],
+    }
+
+
+def _wait(predicate, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.02)
+    raise AssertionError("Tiempo de espera agotado")
+
+
+def _wait_status(manager, job_id, status):
+    return _wait(lambda: (job := manager.get(job_id))["status"] == status and job)
+
+
+class TestJobProgress(unittest.TestCase):
+    """El punto de control solo avanza con lotes consecutivos confirmados"""
+
+    def test_checkpoint_out_of_order(self):
+        store = JobStore()
+        job = store.create("file", {})
+        progress = JobProgress(store, job)
+
+        for batch in range(3):
+            progress.seen(batch, BATCH_SIZE)
+        progress.commit(1, BATCH_SIZE)
+        progress.commit(2, BATCH_SIZE)
+        self.assertEqual(store.get(job["id"])["checkpoint"], 0)
+
+        progress.commit(0, BATCH_SIZE)
+        saved = store.get(job["id"])
+        self.assertEqual(saved["checkpoint"], 3)
+        self.assertEqual(saved["committed"]["docs_upserted"], 3 * BATCH_SIZE)
+        self.assertEqual(progress.snapshot()["docs_seen"], 3 * BATCH_SIZE)
+
+    def test_eta_from_bytes_read(self):
+        """Sin total de documentos, el tiempo restante se estima con los bytes leídos"""
+        store = JobStore()
+        progress = JobProgress(store, store.create("file", {}))
+
+        progress.read_bytes(0, 1000)
+        time.sleep(0.05)
+        progress.read_bytes(250, 1000)
+        snapshot = progress.snapshot()
+
+        self.assertIsNone(snapshot["total"])
+        self.assertEqual((snapshot["bytes_read"], snapshot["bytes_total"]), (250, 1000))
+        # Quedan tres cuartas partes: unas tres veces lo transcurrido
+        self.assertAlmostEqual(snapshot["eta_seconds"], 3 * snapshot["elapsed_seconds"], delta=0.1)
+
+
+class TestIndexJobs(unittest.TestCase):
+    """Trabajos de indexación con progreso, cancelación y reanudación desde el punto de control"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp.name, "publicaciones.json")
+        with open(self.file_path, "w", encoding="utf-8") as data_file:
+            json.dump([_publication(i) for i in range(PUBLICATIONS)], data_file)
+
+        # Cada petición de embeddings tarda lo suficiente para observar el trabajo en curso
+        self.server = StubOpenAIServer(vector_size=8, latency=0.05).start()
+        config = load_config()
+        config.update({
+            "VECTOR_SIZE": 8,
+            "CONTEXT_BACKEND": "numpy",
+            "NUMPY_INDEX_PATH": "",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "HYBRID_SEARCH_ENABLED": False,
+            "RERANK_ENABLED": False,
+            "INDEX_EMBED_WORKERS": 1,
+        })
+        self.service = MCPRagService(config, openai_client=OpenAI(api_key="stub", base_url=self.server.base_url))
+        self.store_path = os.path.join(self.tmp.name, "jobs.sqlite")
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.stop(timeout=10)
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _manager(self):
+        manager = IndexJobManager(JobStore(self.store_path), self.service.run_index_job).start()
+        self.managers.append(manager)
+        return manager
+
+    def _submit(self, manager):
+        return manager.submit("file", {"file_path": self.file_path, "batch_size": BATCH_SIZE})
+
+    def test_job_progress(self):
+        """El trabajo termina con los contadores completos y los documentos indexados"""
+        manager = self._manager()
+        job = self._submit(manager)
+        self.assertEqual(job["status"], QUEUED)
+
+        job = _wait_status(manager, job["id"], COMPLETED)
+
+        progress = job["progress"]
+        self.assertEqual(progress["total"], PUBLICATIONS)
+        self.assertEqual(progress["bytes_read"], os.path.getsize(self.file_path))
+        self.assertEqual(progress["bytes_total"], os.path.getsize(self.file_path))
+        self.assertEqual(progress["docs_seen"], PUBLICATIONS)
+        self.assertEqual(progress["docs_embedded"], PUBLICATIONS)
+        self.assertEqual(progress["docs_upserted"], PUBLICATIONS)
+        self.assertEqual(progress["checkpoint_batches"], PUBLICATIONS // BATCH_SIZE)
+        self.assertGreater(progress["rate_per_second"], 0)
+        self.assertEqual(len(self.service.context.list_document_ids()), PUBLICATIONS)
+
+    def test_cancel_running_job(self):
+        """Un trabajo cancelado se detiene en el siguiente lote y conserva lo almacenado"""
+        manager = self._manager()
+        job = self._submit(manager)
+        _wait(lambda: manager.get(job["id"])["progress"]["docs_upserted"] > 0)
+
+        manager.cancel(job["id"])
+        job = _wait_status(manager, job["id"], CANCELLED)
+
+        self.assertLess(job["progress"]["docs_upserted"], PUBLICATIONS)
+        self.assertIsNotNone(job["finished_at"])
+
+    def test_resume_from_checkpoint(self):
+        """Tras parar el pool, el trabajo continúa desde el último lote confirmado"""
+        manager = self._manager()
+        job = self._submit(manager)
+        _wait(lambda: manager.store.get(job["id"])["checkpoint"] >= 3)
+        manager.stop(timeout=10)
+
+        interrupted = JobStore(self.store_path).get(job["id"])
+        self.assertEqual(interrupted["status"], QUEUED)
+        checkpoint = interrupted["checkpoint"]
+        self.assertLess(checkpoint, PUBLICATIONS // BATCH_SIZE)
+
+        # Un nuevo pool (p. ej. tras reiniciar el proceso) lo reanuda
+        resumed = self._manager()
+        job = _wait_status(resumed, job["id"], COMPLETED)
+
+        self.assertEqual(job["progress"]["docs_upserted"], PUBLICATIONS)
+        # Solo se leyeron de nuevo las publicaciones posteriores al punto de control
+        read = self.service.last_index_stats["stages"]["read"]["records"]
+        self.assertEqual(read, PUBLICATIONS - checkpoint * BATCH_SIZE)
+        self.assertEqual(len(self.service.context.list_document_ids()), PUBLICATIONS)
+
+
+if __name__ == "__main__":
+    unittest.main()
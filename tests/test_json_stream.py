@@ -0,0 +1,105 @@
+import os
+import json
+import unittest
+import tempfile
+import subprocess
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.json_stream import iter_json_records, iter_batches
+
+# Tamaño del archivo sintético para la prueba de memoria (MB)
+LARGE_FILE_MB = int(os.getenv("JSON_STREAM_TEST_MB", "300"))
+
+
+class TestJsonStream(unittest.TestCase):
+    """Pruebas de la lectura en streaming de volcados de publicaciones"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_top_level_array(self):
+        """Un array en el nivel superior produce un registro por elemento"""
+        records = [{"nid": [{"value": i}], "title": [{"value": "a, [b] {c}"}]} for i in range(50)]
+        path = self._write("array.json", json.dumps(records, indent=2))
+
+        # Un tamaño de lectura mínimo obliga a decodificar a través de varios bloques
+        self.assertEqual(list(iter_json_records(path, chunk_size=7)), records)
+
+    def test_json_lines(self):
+        """JSON Lines produce un registro por línea"""
+        records = [{"nid": [{"value": i}]} for i in range(10)]
+        path = self._write("data.jsonl", "\n".join(json.dumps(r) for r in records) + "\n")
+
+        self.assertEqual(list(iter_json_records(path, chunk_size=5)), records)
+
+    def test_single_object(self):
+        """Un único objeto se devuelve como un solo registro"""
+        record = {"nid": [{"value": 1}], "title": [{"value": "Único"}]}
+        path = self._write("single.json", json.dumps(record, indent=4))
+
+        self.assertEqual(list(iter_json_records(path)), [record])
+
+    def test_empty_array_and_truncated_file(self):
+        """Un array vacío no produce registros y uno sin cerrar es un error"""
+        self.assertEqual(list(iter_json_records(self._write("empty.json", " [ ] "))), [])
+
+        with self.assertRaises(ValueError):
+            list(iter_json_records(self._write("broken.json", '[{"a": 1}, {"b": ')))
+
+    def test_iter_batches(self):
+        """Los lotes respetan el tamaño máximo y no pierden elementos"""
+        batches = list(iter_batches(range(10), 4))
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+    def test_memory_bounded_on_large_file(self):
+        """La memoria máxima no crece con el tamaño del archivo"""
+        path = os.path.join(self.temp_dir.name, "large.json")
+        body = "<p>" + "Contenido de la publicación. " * 700 + "</p>"
+        record = json.dumps({"nid": [{"value": 0}], "title": [{"value": "Publicación"}],
+                             "body": [{"processed": body}]})
+
+        # Escribir el archivo sintético sin tenerlo entero en memoria
+        count = 0
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("[")
+            while file.tell() < LARGE_FILE_MB * 1024 * 1024:
+                file.write(("," if count else "") + record)
+                count += 1
+            file.write("]")
+
+        # Recorrer el archivo en un proceso aparte para medir su memoria máxima
+        script = (
+            "import resource, sys\n"
+            f"sys.path.insert(0, {str(project_root)!r})\n"
+            "from src.utils.json_stream import iter_json_records, iter_batches\n"
+            "baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "count = 0\n"
+            f"for batch in iter_batches(iter_json_records({path!r}), 256):\n"
+            "    count += len(batch)\n"
+            "peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "print(count, peak - baseline)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        seen, growth_kb = (int(value) for value in output.stdout.split())
+
+        self.assertEqual(seen, count)
+        # Un lote de 256 registros ocupa unos 6 MB; el archivo, cientos de MB
+        self.assertLess(growth_kb, 64 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
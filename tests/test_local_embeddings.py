@@ -0,0 +1,98 @@
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.local_embeddings import EncoderPool, encode_batch
+
+
+class FakeEncoder:
+    """
+    Modelo de prueba con la interfaz de SentenceTransformer. Cada vector
+    guarda el número del texto, cuántos textos llegaron en la llamada y el
+    tamaño de lote pedido, para comprobar el orden y el reparto.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append((len(texts), batch_size))
+        return np.array([[float(text.split()[1]), len(texts), batch_size] for text in texts], dtype=np.float32)
+
+
+def fake_loader(model_name, device):
+    """Carga del modelo en los procesos del pool (función de módulo para poder importarla)"""
+    return FakeEncoder()
+
+
+def _texts(count):
+    return [f"texto {i}" for i in range(count)]
+
+
+class TestEncodeBatch(unittest.TestCase):
+    """Codificación por lotes en el proceso actual"""
+
+    def test_single_pass_in_order(self):
+        """Todos los textos se codifican en una llamada, con el tamaño de lote indicado y en orden"""
+        encoder = FakeEncoder()
+
+        vectors = encode_batch(encoder, _texts(10), batch_size=4)
+
+        self.assertEqual(encoder.calls, [(10, 4)])
+        self.assertEqual(vectors[:, 0].tolist(), list(range(10)))
+
+    def test_empty_input(self):
+        """Sin textos se devuelve una matriz vacía con la dimensión del modelo"""
+        encoder = FakeEncoder()
+
+        vectors = encode_batch(encoder, [])
+
+        self.assertEqual(vectors.shape, (0, 3))
+        self.assertEqual(encoder.calls, [])
+
+
+class TestEncoderPool(unittest.TestCase):
+    """Reparto de la codificación entre procesos"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = EncoderPool("fake", workers=2, loader=fake_loader)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_order_and_chunking(self):
+        """Los vectores vuelven en el orden de entrada y cada proceso recibe fragmentos acotados"""
+        vectors = self.pool.encode(_texts(50), batch_size=4, chunk_size=7)
+
+        self.assertEqual(vectors.shape, (50, 3))
+        self.assertEqual(vectors[:, 0].tolist(), list(range(50)))
+        # Siete fragmentos de 7 y uno de 1, todos con el tamaño de lote pedido
+        self.assertEqual(vectors[:, 1].tolist(), [7.0] * 49 + [1.0])
+        self.assertTrue((vectors[:, 2] == 4).all())
+
+    def test_default_chunk_size(self):
+        """Sin chunk_size, cada fragmento tiene al menos un lote completo"""
+        vectors = self.pool.encode(_texts(20), batch_size=8)
+
+        self.assertEqual(vectors[:, 0].tolist(), list(range(20)))
+        self.assertEqual(vectors[:, 1].tolist(), [8.0] * 16 + [4.0] * 4)
+
+    def test_empty_input(self):
+        """Una lista vacía es un error"""
+        with self.assertRaises(ValueError):
+            self.pool.encode([])
+
+
+if __name__ == "__main__":
+    unittest.main()
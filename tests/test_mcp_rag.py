@@ -96,7 +96,23 @@ class TestMCPRagComponents(unittest.TestCase):
         
         # Verificar que el embedding tenga la dimensión correcta
         self.assertEqual(len(embedding), self.config["VECTOR_SIZE"])
-    
+
+    def test_model_component_batch_embeddings(self):
+        """Probar la generación de embeddings por lotes"""
+        model = self.rag_service.model
+
+        texts = ["Primer texto de prueba", "", "Tercer texto de prueba"]
+        embeddings = model.create_embeddings(texts)
+
+        # Un embedding por texto, en el mismo orden
+        self.assertEqual(len(embeddings), len(texts))
+        for embedding in embeddings:
+            self.assertEqual(len(embedding), self.config["VECTOR_SIZE"])
+
+        # El texto vacío produce un vector de ceros sin llamar al modelo
+        self.assertTrue(all(e == 0 for e in embeddings[1]))
+        self.assertFalse(all(e == 0 for e in embeddings[0]))
+
     def test_context_component_store_retrieve(self):
         """Probar el almacenamiento y recuperación de documentos"""
         # Acceder al componente Context
@@ -150,7 +166,22 @@ class TestMCPRagComponents(unittest.TestCase):
         self.assertEqual(extracted["title"], "Título de prueba")
         self.assertEqual(extracted["summary"], "Resumen de prueba")
         self.assertEqual(extracted["body"], "<p>Contenido procesado</p>")
-    
+
+    def test_protocol_component_chunk_document(self):
+        """Probar la división de un documento en fragmentos"""
+        protocol = self.rag_service.protocol
+
+        document = dict(self.test_doc, body="<p>" + "palabra " * 1000 + "</p>")
+        chunks = protocol.chunk_document(document)
+
+        # Un documento largo produce varios fragmentos con su documento padre
+        self.assertGreater(len(chunks), 1)
+        for i, chunk in enumerate(chunks):
+            self.assertEqual(chunk["parent_id"], self.test_doc["id"])
+            self.assertEqual(chunk["chunk_index"], i)
+            self.assertEqual(chunk["chunk_count"], len(chunks))
+            self.assertNotIn("<p>", chunk["text"])
+
     def test_protocol_component_process_file(self):
         """Probar el procesamiento de archivos locales"""
         # Acceder al componente Protocol
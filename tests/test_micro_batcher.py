@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+from openai import AsyncOpenAI
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.mcp_architecture import AsyncModelComponent
+from src.utils.micro_batcher import MicroBatcher
+from tests.stubs import StubOpenAIServer, fake_embedding
+
+
+class RecordingEncoder:
+    """Codificador de prueba: devuelve la longitud de cada texto y registra los lotes"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("modelo no disponible")
+        return [len(text) for text in texts]
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Agrupación de peticiones concurrentes en un solo lote"""
+
+    def test_concurrent_requests_share_one_batch(self):
+        """Cada petición recibe su propio vector de una única codificación"""
+        encoder = RecordingEncoder()
+        texts = ["a" * i for i in range(1, 11)]
+
+        async def run():
+            batcher = MicroBatcher(encoder, max_wait_ms=20, max_batch_size=32)
+            return await asyncio.gather(*(batcher.submit(text) for text in texts)), batcher.stats()
+
+        results, stats = asyncio.run(run())
+
+        self.assertEqual(results, list(range(1, 11)))
+        self.assertEqual(encoder.batches, [texts])
+        self.assertEqual(stats["batches"], 1)
+
+    def test_max_batch_size(self):
+        """Un lote lleno se codifica sin esperar al temporizador"""
+        encoder = RecordingEncoder()
+
+        async def run():
+            batcher = MicroBatcher(encoder, max_wait_ms=1000, max_batch_size=4)
+            start = asyncio.get_running_loop().time()
+            await asyncio.gather(*(batcher.submit(str(i)) for i in range(8)))
+            return asyncio.get_running_loop().time() - start
+
+        elapsed = asyncio.run(run())
+
+        self.assertEqual([len(batch) for batch in encoder.batches], [4, 4])
+        self.assertLess(elapsed, 0.5)
+
+    def test_errors_reach_every_caller(self):
+        """Si falla la codificación, todas las peticiones del lote reciben el error"""
+        encoder = RecordingEncoder(fail=True)
+
+        async def run():
+            batcher = MicroBatcher(encoder, max_wait_ms=5)
+            return await asyncio.gather(*(batcher.submit(str(i)) for i in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(encoder.batches), 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_wrong_number_of_vectors(self):
+        """Si la codificación devuelve menos vectores que textos, todas las peticiones fallan"""
+        async def short_encoder(texts):
+            return [len(text) for text in texts[:-1]]
+
+        async def run():
+            batcher = MicroBatcher(short_encoder, max_wait_ms=5)
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(str(i)) for i in range(3)), return_exceptions=True), 2
+            )
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_cancelled_batch_releases_callers(self):
+        """Si se cancela la codificación en curso, las peticiones terminan en lugar de esperar siempre"""
+        started = []
+
+        async def slow_encoder(texts):
+            started.append(texts)
+            await asyncio.sleep(10)
+
+        async def run():
+            batcher = MicroBatcher(slow_encoder, max_wait_ms=1)
+            calls = asyncio.gather(*(batcher.submit(str(i)) for i in range(3)), return_exceptions=True)
+            while not started:
+                await asyncio.sleep(0.001)
+            for task in list(batcher._running):
+                task.cancel()
+            return await asyncio.wait_for(calls, 2)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+
+
+class TestModelComponentMicroBatching(unittest.TestCase):
+    """Los embeddings de consultas concurrentes se piden en una sola petición"""
+
+    def test_concurrent_query_embeddings(self):
+        config = {
+            "EMBEDDING_MODEL": "stub-embeddings",
+            "VECTOR_SIZE": 8,
+            "EMBEDDING_MICROBATCH_ENABLED": True,
+            "EMBEDDING_MICROBATCH_MAX_WAIT_MS": 20,
+            "EMBEDDING_MICROBATCH_MAX_SIZE": 32,
+        }
+        queries = [f"consulta {i}" for i in range(10)]
+
+        with StubOpenAIServer(vector_size=8, latency=0.05) as server:
+            async def run():
+                client = AsyncOpenAI(api_key="stub", base_url=server.base_url)
+                try:
+                    model = AsyncModelComponent(client, config)
+                    # Descontar la petición de prueba que detecta la dimensión
+                    probes = server.embedding_requests
+                    vectors = await asyncio.gather(*(model.create_embedding(query) for query in queries))
+                    return vectors, server.embedding_requests - probes
+                finally:
+                    await client.close()
+
+            vectors, embedding_requests = asyncio.run(run())
+
+            self.assertEqual(embedding_requests, 1)
+            self.assertEqual(server.embedding_inputs, len(queries) + 1)
+
+        for query, vector in zip(queries, vectors):
+            self.assertEqual(vector, fake_embedding(query, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
+from qdrant_client import QdrantClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService, AsyncMCPRagService, NumpyContextComponent
+from src.utils.vector_index import NumpyVectorIndex
+from tests.stubs import StubOpenAIServer
+
+VECTOR_SIZE = 8
+
+
+def _document(i, words=300):
+    return {
+        "id": f"00000000-0000-4000-8000-{i:012d}",
+        "title": f"Documento {i}",
+        "summary": f"Resumen {i}",
+        "body": "<p>" + " ".join(f"palabra{i}_{n}" for n in range(words)) + "</p>",
+        "metadata": {"type": "report"},
+        "revision": {"changed": f"2025-01-{i + 1:02d}"},
+    }
+
+
+class TestNumpyVectorIndex(unittest.TestCase):
+    """Búsqueda exacta, escrituras, borrados y persistencia del índice NumPy"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((3000, VECTOR_SIZE)).astype(np.float32)
+        self.ids = [str(i) for i in range(len(self.vectors))]
+        self.payloads = [{"parent_id": f"p{i // 3}", "chunk_index": i % 3} for i in range(len(self.vectors))]
+
+    def _brute_force(self, query, rows, k):
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        scores = normalized[rows] @ (query / np.linalg.norm(query))
+        return [int(rows[i]) for i in np.argsort(-scores)[:k]]
+
+    def test_search_matches_brute_force(self):
+        """El top-k coincide con ordenar todas las similitudes"""
+        index = NumpyVectorIndex(VECTOR_SIZE)
+        index.upsert(self.ids, self.vectors, self.payloads)
+
+        query = self.vectors[42] + 0.1
+        found = [point_id for point_id, _, _ in index.search(query, 10)]
+        self.assertEqual(found, self._brute_force(query, np.arange(len(self.vectors)), 10))
+
+        # Sustituir un punto no añade filas
+        index.upsert(["42"], [self.vectors[0]], [{"parent_id": "nuevo"}])
+        self.assertEqual(len(index), len(self.vectors))
+        self.assertEqual(index.retrieve(["42"]), [(42, {"parent_id": "nuevo"})])
+
+    def test_delete_and_compact(self):
+        """Los puntos borrados no se devuelven, también tras compactar la matriz"""
+        index = NumpyVectorIndex(VECTOR_SIZE)
+        index.upsert(self.ids, self.vectors, self.payloads)
+
+        deleted = index.delete(self.ids[:1500])
+        self.assertEqual(deleted, 1500)
+        self.assertEqual(len(index), 1500)
+
+        query = self.vectors[10]
+        found = [point_id for point_id, _, _ in index.search(query, 5)]
+        self.assertEqual(found, self._brute_force(query, np.arange(1500, 3000), 5))
+
+        # Por documento padre, conservando los puntos indicados
+        index.delete_parents(["p600"], keep_ids=["1800"])
+        self.assertEqual([point_id for point_id, _ in index.retrieve(["1800", "1801", "1802"])], [1800])
+        self.assertEqual([payload["parent_id"] for _, payload in index.first_chunks(["p601"])], ["p601"])
+
+    def test_memory_mapped_persistence(self):
+        """Con `path` el índice se guarda en disco y se vuelve a abrir mapeado en memoria"""
+        with tempfile.TemporaryDirectory() as directory:
+            index = NumpyVectorIndex(VECTOR_SIZE, path=directory)
+            index.upsert(self.ids, self.vectors, self.payloads)
+            index.delete(["0"])
+            index.flush()
+            expected = index.search(self.vectors[7], 5)
+            del index
+
+            reopened = NumpyVectorIndex(VECTOR_SIZE, path=directory)
+            self.assertIsInstance(reopened._matrix, np.memmap)
+            self.assertEqual(len(reopened), len(self.vectors) - 1)
+            self.assertEqual(reopened.search(self.vectors[7], 5), expected)
+
+            with self.assertRaises(ValueError):
+                NumpyVectorIndex(VECTOR_SIZE * 2, path=directory)
+
+    def test_incremental_flush(self):
+        """Tras la primera vez, flush() solo añade los cambios al diario y al reabrir se aplican"""
+        with tempfile.TemporaryDirectory() as directory:
+            index = NumpyVectorIndex(VECTOR_SIZE, path=directory)
+            index.upsert(self.ids, self.vectors, self.payloads)
+            index.flush()
+            meta_mtime = os.stat(os.path.join(directory, "meta.pkl")).st_mtime_ns
+
+            index.upsert(["3000", "5"], [self.vectors[0], self.vectors[1]],
+                         [{"parent_id": "nuevo"}, {"parent_id": "p1", "chunk_index": 2, "v": 2}])
+            index.flush()
+            self.assertEqual(index.delete_documents(["p10", "p11", "no-existe"]), 2)
+            index.flush()
+            journal_size = os.path.getsize(os.path.join(directory, "journal.pkl"))
+            expected = index.search(self.vectors[0], 5)
+            del index
+
+            # meta.pkl no se reescribe y el diario solo contiene los cambios
+            self.assertEqual(os.stat(os.path.join(directory, "meta.pkl")).st_mtime_ns, meta_mtime)
+            self.assertLess(journal_size, 1024)
+
+            reopened = NumpyVectorIndex(VECTOR_SIZE, path=directory)
+            self.assertEqual(len(reopened), len(self.vectors) + 1 - 6)
+            self.assertEqual(reopened.retrieve(["5"]), [(5, {"parent_id": "p1", "chunk_index": 2, "v": 2})])
+            self.assertEqual(reopened.retrieve(["30", "33"]), [])
+            self.assertEqual(reopened.search(self.vectors[0], 5), expected)
+
+
+class TestNumpyContextBackend(unittest.TestCase):
+    """El servicio funciona igual con el backend en proceso que con Qdrant"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE).start()
+        self.config = load_config()
+        self.config.update({
+            "VECTOR_SIZE": VECTOR_SIZE,
+            "COLLECTION_NAME": "numpy_backend_test",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "HYBRID_SEARCH_ENABLED": False,
+        })
+        self.documents = [_document(i) for i in range(6)]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _service(self, backend):
+        config = dict(self.config, CONTEXT_BACKEND=backend)
+        return MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=QdrantClient(":memory:") if backend == "qdrant" else None
+        )
+
+    def test_same_results_as_qdrant(self):
+        """Mismos documentos, pasajes y orden que el backend de Qdrant"""
+        numpy_service = self._service("numpy")
+        qdrant_service = self._service("qdrant")
+        self.assertIsInstance(numpy_service.context, NumpyContextComponent)
+        self.assertIsNone(numpy_service.qdrant_client)
+
+        for service in (numpy_service, qdrant_service):
+            service._store_documents(self.documents)
+
+        query_vector = numpy_service.model.create_embedding("palabra3_20")
+        numpy_docs = numpy_service.context.retrieve_documents(query_vector, limit=4)
+        qdrant_docs = qdrant_service.context.retrieve_documents(query_vector, limit=4)
+
+        self.assertEqual([doc["id"] for doc in numpy_docs], [doc["id"] for doc in qdrant_docs])
+        self.assertEqual(
+            [[p["chunk_index"] for p in doc["passages"]] for doc in numpy_docs],
+            [[p["chunk_index"] for p in doc["passages"]] for doc in qdrant_docs]
+        )
+        for numpy_doc, qdrant_doc in zip(numpy_docs, qdrant_docs):
+            self.assertAlmostEqual(numpy_doc["score"], qdrant_doc["score"], places=4)
+
+    def test_store_get_delete_clear(self):
+        """Lectura por ID, revisiones, listado, borrado y vaciado"""
+        service = self._service("numpy")
+        service._store_documents(self.documents)
+        ids = [doc["id"] for doc in self.documents]
+
+        self.assertEqual(sorted(service.context.list_document_ids()), sorted(ids))
+        self.assertEqual(service.context.get_revisions([ids[2]]), {ids[2]: {"changed": "2025-01-03"}})
+        self.assertEqual(service.context.get_document_by_id(ids[1])["body"], self.documents[1]["body"])
+
+        # Reindexar un documento más corto elimina sus fragmentos sobrantes
+        points = len(service.context.index)
+        chunks = len(service.protocol.chunk_document(self.documents[0]))
+        self.assertGreater(chunks, 1)
+        service._store_documents([dict(self.documents[0], body="<p>corto</p>")])
+        self.assertEqual(len(service.context.index), points - chunks + 1)
+
+        self.assertEqual(service.context.delete_documents([ids[5], "00000000-0000-4000-8000-999999999999"]), 1)
+
+        self.assertTrue(service.context.delete_document(ids[1]))
+        self.assertIsNone(service.context.get_document_by_id(ids[1]))
+        self.assertEqual(len(service.context.list_document_ids()), 4)
+
+        self.assertTrue(service.reset_database())
+        self.assertEqual(service.context.list_document_ids(), [])
+
+    def test_async_service_shares_index(self):
+        """El servicio asíncrono consulta el mismo índice que el síncrono"""
+        service = self._service("numpy")
+        service._store_documents(self.documents)
+
+        async def run():
+            async_service = AsyncMCPRagService(
+                service.config,
+                openai_client=AsyncOpenAI(api_key="stub", base_url=self.server.base_url),
+                context=service.context
+            )
+            try:
+                result = await async_service.query("palabra4_7", limit=2)
+                document = await async_service.get_document(self.documents[4]["id"], ["title"])
+            finally:
+                await async_service.close()
+            return result, document
+
+        result, document = asyncio.run(run())
+        self.assertEqual(len(result["documents"]), 2)
+        self.assertTrue(result["answer"].startswith("Respuesta a:"))
+        self.assertEqual(document, {"id": self.documents[4]["id"], "title": "Documento 4"})
+
+
+if __name__ == "__main__":
+    unittest.main()
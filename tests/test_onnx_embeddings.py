@@ -0,0 +1,109 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.onnx_embeddings import export_dir, load_onnx_encoder
+
+HAS_ONNX = all(importlib.util.find_spec(name) for name in ("onnx", "onnxruntime", "sentence_transformers"))
+
+TEXTS = [
+    "agua potable",
+    "calidad del agua en zonas rurales y saneamiento básico",
+    "informe",
+    "presupuesto municipal de educación y salud pública para el próximo año",
+]
+
+# Con un modelo real (p. ej. ONNX_PARITY_MODEL=sentence-transformers/all-MiniLM-L6-v2)
+# se comprueba también la paridad con ese modelo
+PARITY_MODEL = os.getenv("ONNX_PARITY_MODEL")
+
+# Similitud coseno mínima frente a los vectores de PyTorch
+FP32_THRESHOLD = 0.9999
+INT8_THRESHOLD = 0.98
+
+
+def build_tiny_model(path: str) -> str:
+    """Modelo de SentenceTransformer pequeño con pesos aleatorios (sin descargas)"""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+
+    words = sorted({word for text in TEXTS for word in text.split()})
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as vocab:
+        vocab.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+
+    transformer_dir = os.path.join(path, "bert")
+    BertTokenizerFast(vocab_file=vocab_file, do_lower_case=True).save_pretrained(transformer_dir)
+    config = BertConfig(vocab_size=5 + len(words), hidden_size=64, num_hidden_layers=2,
+                        num_attention_heads=2, intermediate_size=128)
+    BertModel(config).save_pretrained(transformer_dir)
+
+    transformer = models.Transformer(transformer_dir, max_seq_length=64)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    model_dir = os.path.join(path, "st")
+    SentenceTransformer(modules=[transformer, pooling, models.Normalize()], device="cpu").save(model_dir)
+    return model_dir
+
+
+def cosine(a, b):
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+@unittest.skipUnless(HAS_ONNX, "Requiere onnx, onnxruntime y sentence-transformers")
+class TestOnnxEncoder(unittest.TestCase):
+    """Paridad de los vectores de ONNX Runtime (fp32 e int8) con los de PyTorch"""
+
+    @classmethod
+    def setUpClass(cls):
+        from sentence_transformers import SentenceTransformer
+
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model_name = PARITY_MODEL or build_tiny_model(cls.tmp.name)
+        cls.torch_model = SentenceTransformer(cls.model_name, device="cpu")
+        cls.reference = cls.torch_model.encode(TEXTS, convert_to_numpy=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _encoder(self, quantize):
+        return load_onnx_encoder(self.model_name, os.path.join(self.tmp.name, "onnx"), quantize=quantize,
+                                 intra_op_threads=1, inter_op_threads=1)
+
+    def test_fp32_parity(self):
+        encoder = self._encoder(quantize=False)
+        vectors = encoder.encode(TEXTS, batch_size=3)
+
+        self.assertEqual(vectors.shape, self.reference.shape)
+        self.assertGreaterEqual(cosine(vectors, self.reference).min(), FP32_THRESHOLD)
+
+    def test_int8_parity(self):
+        encoder = self._encoder(quantize=True)
+        vectors = encoder.encode(TEXTS)
+
+        self.assertTrue(encoder.model_path.endswith("int8.onnx"))
+        self.assertGreaterEqual(cosine(vectors, self.reference).min(), INT8_THRESHOLD)
+
+    def test_same_interface_as_sentence_transformer(self):
+        """Un texto da un vector, una lista vacía una matriz vacía; el modelo exportado se reutiliza"""
+        encoder = self._encoder(quantize=True)
+        model_dir = export_dir(os.path.join(self.tmp.name, "onnx"), self.model_name)
+        modified = os.path.getmtime(encoder.model_path)
+
+        self.assertEqual(encoder.encode(TEXTS[0]).shape, (encoder.get_sentence_embedding_dimension(),))
+        self.assertEqual(encoder.encode([]).shape, (0, encoder.get_sentence_embedding_dimension()))
+        self.assertEqual(os.path.getmtime(self._encoder(quantize=True).model_path), modified)
+        self.assertTrue(encoder.model_path.startswith(model_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
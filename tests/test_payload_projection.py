@@ -0,0 +1,104 @@
+import unittest
+import sys
+from pathlib import Path
+
+from openai import OpenAI
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from tests.stubs import StubOpenAIServer, fake_embedding
+
+VECTOR_SIZE = 8
+
+
+def _document(i, words=400):
+    return {
+        "id": f"00000000-0000-4000-8000-{i:012d}",
+        "title": f"Documento {i}",
+        "summary": f"Resumen {i}",
+        "body": "<p>" + " ".join(f"palabra{i}_{n}" for n in range(words)) + "</p>",
+        "metadata": {"type": "report"},
+    }
+
+
+class TestPayloadProjection(unittest.TestCase):
+    """Las búsquedas no leen el cuerpo completo; se carga bajo demanda por lotes"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE).start()
+        config = load_config()
+        config.update({"VECTOR_SIZE": VECTOR_SIZE, "COLLECTION_NAME": "projection_test", "EMBEDDING_CACHE_PATH": ""})
+        self.service = MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=QdrantClient(":memory:")
+        )
+        self.documents = [_document(i) for i in range(5)]
+        self.service._store_documents(self.documents)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_search_excludes_body(self):
+        """La búsqueda devuelve pasajes y metadatos pero no el cuerpo"""
+        query_vector = self.service.model.create_embedding("palabra2_10")
+        results = self.service.context.retrieve_documents(query_vector, limit=3)
+
+        self.assertEqual(len(results), 3)
+        for doc in results:
+            self.assertNotIn("body", doc)
+            self.assertTrue(doc["passages"])
+            self.assertEqual(doc["metadata"], {"type": "report"})
+
+        # Pidiendo el cuerpo explícitamente sí se lee
+        with_body = self.service.context.retrieve_documents(query_vector, limit=3, fields=["title", "body"])
+        self.assertTrue(any(doc.get("body") for doc in with_body))
+
+    def test_get_documents_batch(self):
+        """Los documentos se cargan en una lectura, en el orden pedido y sin los inexistentes"""
+        ids = [self.documents[3]["id"], "no-existe", self.documents[0]["id"]]
+        loaded = self.service.context.get_documents(ids)
+
+        self.assertEqual([doc["id"] for doc in loaded], [ids[0], ids[2]])
+        self.assertEqual(loaded[0]["body"], self.documents[3]["body"])
+
+        only_title = self.service.context.get_documents([ids[0]], fields=["title"])
+        self.assertEqual(only_title, [{"id": ids[0], "title": "Documento 3"}])
+
+    def test_unchunked_documents_load_body_lazily(self):
+        """Los documentos sin fragmentar reciben su cuerpo para el contexto del LLM"""
+        document = _document(9, words=20)
+        self.service.context.store_documents([document], [fake_embedding("legado", VECTOR_SIZE)])
+
+        results = self.service.context.retrieve_documents(fake_embedding("legado", VECTOR_SIZE), limit=1)
+        self.assertEqual(results[0]["id"], document["id"])
+        self.assertEqual(results[0]["passages"], [])
+        self.assertEqual(results[0]["body"], document["body"])
+
+    def test_chunking_replaces_unchunked_point(self):
+        """Al fragmentar un documento se elimina su punto anterior sin fragmentar (sin parent_id)"""
+        document = _document(7)
+        client = self.service.qdrant_client
+        collection_name = self.service.config["COLLECTION_NAME"]
+        client.upsert(collection_name=collection_name, points=[models.PointStruct(
+            id=document["id"],
+            vector=fake_embedding("legado", VECTOR_SIZE),
+            payload={"title": document["title"], "body": document["body"]}
+        )])
+
+        self.service._store_documents([document])
+
+        self.assertEqual(client.retrieve(collection_name, ids=[document["id"]]), [])
+        results = self.service.context.retrieve_documents(fake_embedding("legado", VECTOR_SIZE), limit=10)
+        self.assertEqual([doc["id"] for doc in results].count(document["id"]), 1)
+        self.assertTrue(all(doc.get("passages") for doc in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import time
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.pipeline import StagedPipeline, Stage
+
+
+def _sleeping(seconds, results=None, lock=None):
+    """Etapa que simula E/S durmiendo y opcionalmente registra los elementos"""
+    def fn(item):
+        time.sleep(seconds)
+        if results is not None:
+            with lock:
+                results.append(item)
+        return item
+    return fn
+
+
+class TestStagedPipeline(unittest.TestCase):
+    """Pruebas del motor de indexación por etapas"""
+
+    def _source(self, batches, delay=0.0):
+        for i in range(batches):
+            time.sleep(delay)
+            yield [i] * 10
+
+    def test_all_items_are_processed(self):
+        """Cada lote llega a la última etapa exactamente una vez"""
+        results, lock = [], threading.Lock()
+        pipeline = StagedPipeline(
+            self._source(50),
+            [Stage("a", _sleeping(0), workers=3), Stage("b", _sleeping(0, results, lock), workers=2)],
+            queue_size=2
+        )
+        stats = pipeline.run()
+
+        self.assertEqual(sorted(batch[0] for batch in results), list(range(50)))
+        self.assertEqual(stats["stages"]["source"]["records"], 500)
+        self.assertEqual(stats["stages"]["b"]["items"], 50)
+
+    def test_stages_overlap(self):
+        """El tiempo total se acerca al de la etapa más lenta, no a la suma"""
+        batches, delay = 10, 0.05
+        pipeline = StagedPipeline(
+            self._source(batches, delay),
+            [Stage("extract", _sleeping(delay)), Stage("embed", _sleeping(delay)), Stage("upsert", _sleeping(delay))]
+        )
+        stats = pipeline.run()
+
+        sequential = 4 * batches * delay
+        self.assertLess(stats["elapsed_seconds"], sequential * 0.6)
+        self.assertGreaterEqual(stats["stages"]["embed"]["busy_seconds"], batches * delay * 0.9)
+
+    def test_workers_speed_up_slow_stage(self):
+        """Más hilos en la etapa lenta aumentan el rendimiento"""
+        def run(workers):
+            pipeline = StagedPipeline(self._source(12), [Stage("embed", _sleeping(0.05), workers=workers)])
+            return pipeline.run()["elapsed_seconds"]
+
+        self.assertLess(run(4), run(1) * 0.5)
+
+    def test_backpressure_bounds_queues(self):
+        """Una fuente rápida no llena las colas por encima de su capacidad"""
+        consumed = []
+
+        def source():
+            for i in range(40):
+                consumed.append(i)
+                yield [i]
+
+        pipeline = StagedPipeline(source(), [Stage("slow", _sleeping(0.01))], queue_size=3)
+        stats = pipeline.run()
+
+        queue_stats = stats["queues"]["source->slow"]
+        self.assertEqual(queue_stats["capacity"], 3)
+        self.assertLessEqual(queue_stats["max_depth"], 3)
+        self.assertEqual(len(consumed), 40)
+
+    def test_errors_stop_the_pipeline(self):
+        """Un error en una etapa detiene las demás y se relanza"""
+        closed = []
+
+        def source():
+            try:
+                for i in range(1000):
+                    yield [i]
+            finally:
+                closed.append(True)
+
+        def failing(item):
+            if item[0] == 5:
+                raise ValueError("fallo en la etapa")
+            return item
+
+        pipeline = StagedPipeline(source(), [Stage("a", failing), Stage("b", _sleeping(0))])
+        with self.assertRaises(ValueError):
+            pipeline.run()
+        self.assertEqual(closed, [True])
+
+    def test_none_results_are_dropped(self):
+        """Un resultado None no pasa a la etapa siguiente"""
+        results, lock = [], threading.Lock()
+        pipeline = StagedPipeline(
+            self._source(6),
+            [Stage("filter", lambda batch: batch if batch[0] % 2 else None), Stage("sink", _sleeping(0, results, lock))]
+        )
+        stats = pipeline.run()
+
+        self.assertEqual(sorted(batch[0] for batch in results), [1, 3, 5])
+        self.assertEqual(stats["stages"]["sink"]["items"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
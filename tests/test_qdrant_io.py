@@ -0,0 +1,124 @@
+import time
+import threading
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.qdrant_io import upsert_points, bulk_load_mode
+
+
+class RecordingClient:
+    """Cliente mínimo que registra las peticiones de inserción y de configuración"""
+
+    def __init__(self, latency=0.0, indexing_threshold=10000, fail_on_batch=None):
+        self.latency = latency
+        self.indexing_threshold = indexing_threshold
+        self.fail_on_batch = fail_on_batch
+        self.batches = []
+        self.thresholds = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def upsert(self, collection_name, points, wait=True):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.batches.append(len(points))
+            batch_number = len(self.batches)
+        try:
+            time.sleep(self.latency)
+            if batch_number == self.fail_on_batch:
+                raise RuntimeError("fallo de inserción")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def get_collection(self, collection_name):
+        optimizer_config = SimpleNamespace(indexing_threshold=self.indexing_threshold)
+        return SimpleNamespace(config=SimpleNamespace(optimizer_config=optimizer_config))
+
+    def update_collection(self, collection_name, optimizers_config):
+        self.indexing_threshold = optimizers_config.indexing_threshold
+        self.thresholds.append(self.indexing_threshold)
+
+
+def _points(n, size=4):
+    return [models.PointStruct(id=i, vector=[float(i % 7 + 1)] * size, payload={"n": i}) for i in range(n)]
+
+
+class TestUpsertPoints(unittest.TestCase):
+    """Pruebas de la inserción por lotes en paralelo"""
+
+    def test_chunks_and_parallelism(self):
+        """Los puntos se envían en lotes acotados con varias peticiones en curso"""
+        client = RecordingClient(latency=0.02)
+        inserted = upsert_points(client, "c", _points(1000), batch_size=128, parallel=4)
+
+        self.assertEqual(inserted, 1000)
+        self.assertEqual(sum(client.batches), 1000)
+        self.assertLessEqual(max(client.batches), 128)
+        self.assertGreater(client.max_active, 1)
+        self.assertLessEqual(client.max_active, 4)
+
+    def test_errors_propagate(self):
+        """Un lote fallido hace fallar la inserción completa"""
+        client = RecordingClient(fail_on_batch=3)
+        with self.assertRaises(RuntimeError):
+            upsert_points(client, "c", _points(500), batch_size=50, parallel=3)
+
+    def test_local_qdrant(self):
+        """Con Qdrant en memoria (inserción en serie) se almacenan todos los puntos"""
+        client = QdrantClient(":memory:")
+        client.create_collection("c", vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE))
+        upsert_points(client, "c", _points(700), batch_size=100, parallel=3)
+
+        self.assertEqual(client.count("c").count, 700)
+
+
+class TestBulkLoadMode(unittest.TestCase):
+    """Pruebas del modo de carga masiva"""
+
+    def test_defers_and_restores_indexing(self):
+        """La indexación se desactiva durante la carga y se restaura después"""
+        client = RecordingClient(indexing_threshold=12345)
+        with bulk_load_mode(client, "c"):
+            self.assertEqual(client.indexing_threshold, 0)
+        self.assertEqual(client.thresholds, [0, 12345])
+
+    def test_restores_on_error(self):
+        """La configuración se restaura aunque la carga falle"""
+        client = RecordingClient(indexing_threshold=500)
+        with self.assertRaises(ValueError):
+            with bulk_load_mode(client, "c"):
+                raise ValueError("fallo")
+        self.assertEqual(client.indexing_threshold, 500)
+
+    def test_nested_loads_restore_once(self):
+        """Las cargas anidadas solo restauran al terminar la más externa"""
+        client = RecordingClient(indexing_threshold=800)
+        with bulk_load_mode(client, "c"):
+            with bulk_load_mode(client, "c"):
+                pass
+            self.assertEqual(client.indexing_threshold, 0)
+        self.assertEqual(client.thresholds, [0, 800])
+
+    def test_recovers_from_interrupted_load(self):
+        """Si otra carga murió con el umbral a 0, al terminar se restaura el configurado"""
+        for stale in (0, None):
+            client = RecordingClient(indexing_threshold=stale)
+            with bulk_load_mode(client, "c", default_threshold=20000):
+                self.assertEqual(client.indexing_threshold, 0)
+            self.assertEqual(client.indexing_threshold, 20000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import sys
+from pathlib import Path
+
+from openai import OpenAI
+from qdrant_client import QdrantClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from tests.stubs import StubOpenAIServer
+
+VECTOR_SIZE = 8
+
+
+def _documents(count):
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "title": f"Publicación {i}",
+            "summary": "",
+            "body": f"<p>Contenido número {i} sobre tema{i % 5} y desarrollo.</p>",
+            "metadata": {},
+        }
+        for i in range(count)
+    ]
+
+
+class TestQueryBatch(unittest.TestCase):
+    """Consultas por lotes: embeddings y búsquedas agrupados, LLM con concurrencia limitada"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE, chat_latency=0.1).start()
+        self.config = load_config()
+        self.config.update({
+            "VECTOR_SIZE": VECTOR_SIZE,
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "RERANK_ENABLED": False,
+            "QUERY_BATCH_LLM_CONCURRENCY": 3,
+        })
+        self.queries = [f"tema{i % 5} número {i}" for i in range(12)]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _service(self, **overrides):
+        config = dict(self.config, **overrides)
+        qdrant_client = QdrantClient(":memory:") if config["CONTEXT_BACKEND"] == "qdrant" else None
+        service = MCPRagService(
+            config,
+            openai_client=OpenAI(api_key="stub", base_url=self.server.base_url),
+            qdrant_client=qdrant_client
+        )
+        service._store_documents(_documents(30))
+        return service
+
+    def test_batch_search_matches_single_searches(self):
+        """Una sola búsqueda por lotes (densa + BM25) da los mismos documentos que una por consulta"""
+        service = self._service(CONTEXT_BACKEND="qdrant", COLLECTION_NAME="batch_test", HYBRID_SEARCH_ENABLED=True)
+        self.assertTrue(service.context.hybrid)
+        vectors = service.model.create_embeddings(self.queries)
+
+        batch = service.context.retrieve_documents_batch(vectors, limit=3, query_texts=self.queries)
+        single = [
+            service.context.retrieve_documents(vector, limit=3, query_text=query)
+            for vector, query in zip(vectors, self.queries)
+        ]
+
+        self.assertEqual([[doc["id"] for doc in docs] for docs in batch],
+                         [[doc["id"] for doc in docs] for docs in single])
+        self.assertEqual(batch[0][0]["sources"], single[0][0]["sources"])
+
+    def test_query_batch(self):
+        """Un resultado por consulta, un lote de embeddings y como mucho N llamadas simultáneas al LLM"""
+        service = self._service(CONTEXT_BACKEND="numpy")
+        embedding_requests = self.server.embedding_requests
+
+        results = service.query_batch(self.queries, limit=2)
+
+        self.assertEqual([result["query"] for result in results], self.queries)
+        self.assertEqual(self.server.embedding_requests - embedding_requests, 1)
+        self.assertEqual(self.server.chat_requests, len(self.queries))
+        self.assertLessEqual(self.server.chat_max_active, 3)
+        self.assertGreater(self.server.chat_max_active, 1)
+        for query, result in zip(self.queries, results):
+            self.assertIsNone(result["error"])
+            self.assertEqual(len(result["documents"]), 2)
+            self.assertIn(f"Consulta: {query}", result["answer"])
+
+    def test_per_item_errors(self):
+        """Si falla el LLM en una consulta, las demás conservan su respuesta"""
+        service = self._service(CONTEXT_BACKEND="numpy")
+        complete = service.model.complete
+
+        def failing_complete(query, context_docs):
+            if query == self.queries[4]:
+                raise RuntimeError("límite de peticiones")
+            return complete(query, context_docs)
+
+        service.model.complete = failing_complete
+        results = service.query_batch(self.queries, limit=2)
+
+        self.assertIsNone(results[4]["answer"])
+        self.assertIn("límite de peticiones", results[4]["error"])
+        self.assertEqual(sum(result["error"] is None for result in results), len(self.queries) - 1)
+
+    def test_embedding_errors(self):
+        """Las consultas cuyo embedding falla no se buscan ni llegan al LLM y llevan el error"""
+        service = self._service(CONTEXT_BACKEND="numpy", EMBEDDING_BATCH_SIZE=4)
+        embed = service.model.embedding_provider.embed
+
+        def failing_embed(texts):
+            if self.queries[4] in texts:
+                raise RuntimeError("servicio de embeddings no disponible")
+            return embed(texts)
+
+        service.model.embedding_provider.embed = failing_embed
+        results = service.query_batch(self.queries, limit=2)
+
+        # El lote con las consultas 4-7 falla; el resto se responde con normalidad
+        for i, result in enumerate(results):
+            if 4 <= i < 8:
+                self.assertIsNone(result["answer"])
+                self.assertEqual(result["documents"], [])
+                self.assertIn("embedding", result["error"])
+            else:
+                self.assertIsNone(result["error"])
+                self.assertEqual(len(result["documents"]), 2)
+        self.assertEqual(self.server.chat_requests, len(self.queries) - 4)
+
+    def test_empty_queries(self):
+        """Las consultas vacías llevan su propio error sin vectorizarse ni buscarse"""
+        service = self._service(CONTEXT_BACKEND="numpy")
+        queries = [self.queries[0], "", "   ", self.queries[1]]
+        inputs = self.server.embedding_inputs
+
+        results = service.query_batch(queries, limit=2)
+
+        for result in results[1:3]:
+            self.assertIsNone(result["answer"])
+            self.assertEqual(result["documents"], [])
+            self.assertIn("vacía", result["error"])
+        for result in (results[0], results[3]):
+            self.assertIsNone(result["error"])
+            self.assertEqual(len(result["documents"]), 2)
+        self.assertEqual(self.server.embedding_inputs - inputs, 2)
+        self.assertEqual(self.server.chat_requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.api as api
+from tests.stubs import StubOpenAIServer
+
+
+def _events(response):
+    """Eventos Server-Sent Events de la respuesta como pares (evento, datos)"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestQueryStreamEndpoint(unittest.TestCase):
+    """Endpoint /query/stream: documentos, tokens y errores como eventos SSE"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=8).start()
+        self.environ = mock.patch.dict(os.environ, {
+            "OPENAI_API_BASE": self.server.base_url,
+            "CONTEXT_BACKEND": "numpy",
+            "NUMPY_INDEX_PATH": "",
+            "VECTOR_SIZE": "8",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": "false",
+            "RERANK_ENABLED": "false",
+            "INDEX_JOBS_PATH": "",
+        })
+        self.environ.start()
+
+        self.client = TestClient(api.app)
+        self.client.__enter__()
+        deadline = time.monotonic() + 30
+        while self.client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        api.rag_service._store_documents([
+            {"id": f"00000000-0000-4000-8000-{i:012d}", "title": f"Documento {i}", "summary": "",
+             "body": f"<p>Contenido del documento {i} sobre agua</p>", "metadata": {}}
+            for i in range(3)
+        ])
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        # Dejar el módulo como recién importado para las demás pruebas de la API
+        api.rag_service = api.async_rag_service = api.index_jobs = None
+        self.environ.stop()
+        self.server.stop()
+
+    def test_stream_events(self):
+        """Primero los documentos, después los tokens de la respuesta y al final los tiempos"""
+        response = self.client.post("/query/stream", json={"query": "agua", "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = _events(response)
+        names = [name for name, _ in events]
+
+        self.assertEqual(names[0], "documents")
+        self.assertEqual(len(events[0][1]["documents"]), 2)
+        self.assertIn("token", names)
+        self.assertEqual(names[-1], "done")
+        self.assertNotIn("error", names)
+        answer = "".join(data["text"] for name, data in events if name == "token")
+        self.assertIn("Consulta: agua", answer)
+
+    def test_retrieval_error_event(self):
+        """Si falla la vectorización de la consulta se emite "error" en lugar de documentos vacíos"""
+        async def failing_aembed(texts):
+            raise RuntimeError("servicio de embeddings no disponible")
+
+        with mock.patch.object(api.async_rag_service.model.embedding_provider, "aembed", failing_aembed):
+            response = self.client.post("/query/stream", json={"query": "agua"})
+
+        self.assertEqual(response.status_code, 200)
+        events = _events(response)
+        self.assertEqual([name for name, _ in events], ["error", "done"])
+        self.assertIn("servicio de embeddings no disponible", events[0][1]["detail"])
+        self.assertEqual(self.server.chat_requests, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
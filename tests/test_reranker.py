@@ -0,0 +1,152 @@
+import time
+import unittest
+import sys
+from pathlib import Path
+
+from openai import OpenAI
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.mcp_architecture import MCPRagService
+from src.utils.reranker import Reranker
+from tests.stubs import StubOpenAIServer
+
+VECTOR_SIZE = 8
+
+
+class KeywordScorer:
+    """Cross-encoder de prueba: puntúa por palabras de la consulta presentes en el texto"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append((len(pairs), batch_size))
+        time.sleep(self.delay)
+        return [sum(word in text.lower() for word in query.lower().split()) for query, text in pairs]
+
+
+def _doc(i, text):
+    return {"id": str(i), "title": f"Documento {i}", "passages": [{"text": text, "chunk_index": 0, "score": 0.0}]}
+
+
+class TestReranker(unittest.TestCase):
+    """Reordenación en una pasada, caché de puntuaciones y presupuesto de latencia"""
+
+    def setUp(self):
+        self.documents = [
+            _doc(0, "informe anual de actividades"),
+            _doc(1, "agua potable y saneamiento rural"),
+            _doc(2, "calidad del agua en zonas rurales"),
+            _doc(3, "presupuesto municipal"),
+        ]
+
+    def test_rerank_in_one_pass(self):
+        """Todos los pares se puntúan en una sola llamada y se conservan los mejores"""
+        scorer = KeywordScorer()
+        reranker = Reranker("prueba", budget_ms=None, model=scorer)
+
+        result = reranker.rerank("agua rural saneamiento", list(self.documents), top_n=2)
+
+        self.assertEqual([doc["id"] for doc in result], ["1", "2"])
+        self.assertEqual(result[0]["rerank_score"], 3)
+        self.assertEqual(scorer.calls, [(4, 4)])
+
+    def test_score_cache(self):
+        """Los pares ya puntuados no vuelven a pasar por el modelo"""
+        scorer = KeywordScorer()
+        reranker = Reranker("prueba", budget_ms=None, model=scorer)
+
+        reranker.rerank("agua", list(self.documents), top_n=2)
+        reranker.rerank("agua", list(self.documents[:3]) + [_doc(4, "agua subterránea")], top_n=2)
+
+        self.assertEqual(scorer.calls, [(4, 4), (1, 1)])
+        self.assertEqual(reranker.stats()["cache_hits"], 3)
+
+    def test_budget_fallback(self):
+        """Si se agota el presupuesto se mantiene el orden vectorial y la caché se completa después"""
+        scorer = KeywordScorer(delay=0.3)
+        reranker = Reranker("prueba", budget_ms=50, model=scorer)
+
+        result = reranker.rerank("presupuesto", list(self.documents), top_n=2)
+        self.assertEqual([doc["id"] for doc in result], ["0", "1"])
+        self.assertEqual(reranker.stats()["fallbacks"], 1)
+
+        # La puntuación termina en segundo plano y la siguiente consulta usa la caché
+        time.sleep(0.5)
+        result = reranker.rerank("presupuesto", list(self.documents), top_n=1)
+        self.assertEqual([doc["id"] for doc in result], ["3"])
+        self.assertEqual(len(scorer.calls), 1)
+
+    def test_busy_model_skips_new_work(self):
+        """Con el modelo ocupado no se encola más trabajo: se usa el orden vectorial"""
+        scorer = KeywordScorer(delay=0.3)
+        reranker = Reranker("prueba", budget_ms=20, max_pending=1, model=scorer)
+
+        reranker.rerank("agua", list(self.documents), top_n=2)
+        result = reranker.rerank("presupuesto", list(self.documents), top_n=2)
+
+        self.assertEqual([doc["id"] for doc in result], ["0", "1"])
+        stats = reranker.stats()
+        self.assertEqual(stats["fallbacks"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        time.sleep(0.5)
+        self.assertEqual(len(scorer.calls), 1)
+
+    def test_model_error_fallback(self):
+        """Un error del modelo devuelve el orden vectorial en lugar de propagarse"""
+        class FailingScorer:
+            def predict(self, pairs, batch_size=32):
+                raise RuntimeError("sin memoria")
+
+        reranker = Reranker("prueba", budget_ms=None, model=FailingScorer())
+
+        result = reranker.rerank("agua", list(self.documents), top_n=2)
+
+        self.assertEqual([doc["id"] for doc in result], ["0", "1"])
+        self.assertEqual(reranker.stats()["errors"], 1)
+
+
+class TestServiceRerank(unittest.TestCase):
+    """El servicio recupera más candidatos y envía al LLM solo los reordenados"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=VECTOR_SIZE).start()
+        config = load_config()
+        config.update({
+            "VECTOR_SIZE": VECTOR_SIZE,
+            "CONTEXT_BACKEND": "numpy",
+            "EMBEDDING_CACHE_PATH": "",
+            "SEMANTIC_CACHE_ENABLED": False,
+            "RERANK_ENABLED": True,
+            "RERANK_CANDIDATES_FACTOR": 5,
+        })
+        self.service = MCPRagService(config, openai_client=OpenAI(api_key="stub", base_url=self.server.base_url))
+        self.scorer = KeywordScorer()
+        self.service.reranker = Reranker("prueba", budget_ms=None, model=self.scorer)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_query_reranks_candidates(self):
+        documents = [
+            {"id": str(i), "title": f"Documento {i}", "summary": "", "metadata": {},
+             "body": f"<p>texto genérico número {i}</p>"}
+            for i in range(10)
+        ]
+        documents[6]["body"] = "<p>acuíferos y gestión hídrica</p>"
+        self.service._store_documents(documents)
+
+        result = self.service.query("acuíferos", limit=2)
+
+        self.assertEqual(self.scorer.calls, [(10, 10)])
+        self.assertEqual(len(result["documents"]), 2)
+        self.assertEqual(result["documents"][0]["id"], "6")
+
+
+if __name__ == "__main__":
+    unittest.main()
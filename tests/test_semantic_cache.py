@@ -0,0 +1,139 @@
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+from openai import OpenAI
+from qdrant_client import QdrantClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.utils.semantic_cache import SemanticCache
+from src.mcp_architecture import MCPRagService
+from tests.stubs import StubOpenAIServer, StubPublicationsServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _near(vector, noise, seed=0):
+    """Vector ligeramente perturbado (paráfrasis de la misma consulta)"""
+    rng = np.random.default_rng(seed)
+    return (np.asarray(vector) + rng.normal(0, noise, len(vector))).tolist()
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Pruebas de la caché semántica de respuestas"""
+
+    def setUp(self):
+        self.vector = np.random.default_rng(42).normal(size=64).tolist()
+
+    def test_similar_query_hits(self):
+        """Una consulta parecida con los mismos documentos reutiliza la respuesta"""
+        cache = SemanticCache(threshold=0.95)
+        cache.store(self.vector, ["1", "2"], "respuesta", compute_seconds=1.5)
+
+        self.assertEqual(cache.lookup(_near(self.vector, 0.05), ["2", "1"]), "respuesta")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["latency_saved_seconds"], 1.5)
+
+    def test_different_documents_or_query_miss(self):
+        """Otros documentos o una consulta poco parecida no reutilizan la respuesta"""
+        cache = SemanticCache(threshold=0.95)
+        cache.store(self.vector, ["1", "2"], "respuesta")
+
+        self.assertIsNone(cache.lookup(self.vector, ["1", "3"]))
+        self.assertIsNone(cache.lookup(_near(self.vector, 1.0), ["1", "2"]))
+        self.assertEqual(cache.stats()["hit_rate"], 0.0)
+
+    def test_ttl_expiration(self):
+        """Las entradas caducan tras el TTL"""
+        clock = FakeClock()
+        cache = SemanticCache(ttl=10, clock=clock)
+        cache.store(self.vector, ["1"], "respuesta")
+
+        clock.now = 5
+        self.assertEqual(cache.lookup(self.vector, ["1"]), "respuesta")
+        clock.now = 16
+        self.assertIsNone(cache.lookup(self.vector, ["1"]))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_capacity_eviction(self):
+        """Al superar la capacidad se descarta la entrada usada hace más tiempo"""
+        cache = SemanticCache(max_entries=2)
+        vectors = [np.eye(8)[i].tolist() for i in range(3)]
+        cache.store(vectors[0], ["a"], "a")
+        cache.store(vectors[1], ["b"], "b")
+        cache.lookup(vectors[0], ["a"])
+        cache.store(vectors[2], ["c"], "c")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.lookup(vectors[0], ["a"]), "a")
+        self.assertIsNone(cache.lookup(vectors[1], ["b"]))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidation_discards_stale_results(self):
+        """Tras invalidar, no se guardan respuestas calculadas antes de la invalidación"""
+        cache = SemanticCache()
+        cache.store(self.vector, ["1"], "respuesta")
+        generation = cache.generation
+
+        cache.invalidate()
+        self.assertIsNone(cache.lookup(self.vector, ["1"]))
+
+        cache.store(self.vector, ["1"], "obsoleta", generation=generation)
+        self.assertEqual(len(cache), 0)
+
+
+class TestServiceSemanticCache(unittest.TestCase):
+    """La caché evita llamadas al LLM y se invalida al escribir en el índice"""
+
+    def test_repeated_query_skips_llm_until_index_changes(self):
+        with StubOpenAIServer(vector_size=8) as server, StubPublicationsServer(total=5) as api:
+            config = load_config()
+            config.update({
+                "VECTOR_SIZE": 8,
+                "COLLECTION_NAME": "semantic_cache_test",
+                "EMBEDDING_CACHE_PATH": "",
+                "API_ENDPOINT": api.base_url + "/api",
+            })
+            service = MCPRagService(
+                config,
+                openai_client=OpenAI(api_key="stub", base_url=server.base_url),
+                qdrant_client=QdrantClient(":memory:")
+            )
+            service.index_publications_from_api(limit=5)
+
+            first = service.query("Publicación 3", limit=2)
+            second = service.query("Publicación 3", limit=2)
+            self.assertFalse(first["cached"])
+            self.assertTrue(second["cached"])
+            self.assertEqual(first["answer"], second["answer"])
+            self.assertEqual(server.chat_requests, 1)
+
+            # Reindexar las mismas revisiones no escribe en el índice
+            service.index_publications_from_api(limit=5)
+            self.assertTrue(service.query("Publicación 3", limit=2)["cached"])
+
+            # Cualquier escritura en el índice invalida la caché
+            service.context.delete_documents([first["documents"][-1]["id"]])
+            third = service.query("Publicación 3", limit=2)
+            self.assertFalse(third["cached"])
+            self.assertEqual(server.chat_requests, 2)
+
+            stats = service.answer_cache.stats()
+            self.assertEqual(stats["hits"], 2)
+            self.assertGreaterEqual(stats["invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.stubs import StubOpenAIServer
+
+
+def _wait_ready(client, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200 or response.json()["status"] == "error":
+            return response
+        time.sleep(0.05)
+    return response
+
+
+class TestStartup(unittest.TestCase):
+    """Arranque diferido de la API: servicios en el ciclo de vida, calentamiento y /ready"""
+
+    def setUp(self):
+        self.server = StubOpenAIServer(vector_size=8, latency=0.2).start()
+        # La configuración se lee del entorno (las variables definidas tienen prioridad sobre .env)
+        self.environ = mock.patch.dict(os.environ, {
+            "OPENAI_API_BASE": self.server.base_url,
+            "CONTEXT_BACKEND": "numpy",
+            "NUMPY_INDEX_PATH": "",
+            "VECTOR_SIZE": "8",
+            "EMBEDDING_CACHE_PATH": "",
+            "RERANK_ENABLED": "false",
+            "INDEX_JOBS_PATH": "",
+        })
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.server.stop()
+
+    def test_services_created_on_startup(self):
+        """Importar la API no crea servicios; /health responde enseguida y /ready tras el calentamiento"""
+        import src.api as api
+        self.assertIsNone(api.rag_service)
+
+        with TestClient(api.app) as client:
+            self.assertEqual(client.get("/health").status_code, 200)
+            self.assertEqual(client.post("/query", json={"query": "hola"}).status_code, 503)
+
+            response = _wait_ready(client)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("context_ms", response.json()["timings"])
+            self.assertIn("embedding_ms", response.json()["timings"])
+            # Al arrancar: detección de la dimensión en cada servicio y vectorización de prueba
+            self.assertEqual(self.server.embedding_requests, 3)
+
+            self.assertEqual(client.post("/query", json={"query": "hola"}).status_code, 200)
+
+    def test_startup_error_reported(self):
+        """Si el arranque falla, /ready lo indica y las consultas siguen devolviendo 503"""
+        import src.api as api
+
+        with mock.patch.dict(os.environ, {"CONTEXT_BACKEND": "desconocido"}):
+            with TestClient(api.app) as client:
+                response = _wait_ready(client)
+
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response.json()["status"], "error")
+                self.assertEqual(client.post("/query", json={"query": "hola"}).status_code, 503)
+                self.assertEqual(client.get("/health").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()